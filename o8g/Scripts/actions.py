@@ -33,7 +33,7 @@ costModifiers = [] # used in reduceCost to store the cards that might hold poten
 
 DifficultyLevels = { }
 
-installedCount = {} # A dictionary which keeps track how many of each card type have been installed by the player.
+installedSlots = {} # A dictionary which keeps track which placement slots of each card type are taken by which of the player's cards. See placeCard()
 
 MemoryRequirements = {}
 InstallationCosts = {}
@@ -54,6 +54,67 @@ AfterRunInf = True # A warning to remind players that some actions have effects
 AfterTraceInf = True # Similar to above
 lastKnownNrClicks = 0 # A Variable keeping track of what the engine thinks our action counter should be, in case we change it manually.
 SuccessfulRun = False # Set by the runner when a run is successful, in order to avoid asking the player every time.
+AmbushTimeout = 3 # How many times we'll ask the runner to wait for the corp to acknowledge an ambush, before we offer to carry on without them.
+CompiledAccess = {} # For each card model, its onAccess scripts already split and checked for Reveal and ifInstalled. See accessHandlers()
+TempMarkedCards = set() # The IDs of the cards on which we've put temporary markers or highlights, so that clearAll() only needs to visit those.
+PlayedEvents = [] # The IDs of the events and operations we've played this turn, which clearAll() trashes in case they've been left on the table.
+MessageQueue = [] # The whispers waiting to be sent at the next checkpoint, after the action's notifys. See flushMessages()
+ActionDepth = 0 # How many checkpointed actions are currently running inside each other. See messageCheckpoint()
+AnnouncementLines = [] # The effect lines gathered so far for the announcement of the current action. See announce()
+AnnounceDepth = 0 # How many announcing functions are currently running inside each other. See groupAnnouncements()
+
+#---------------------------------------------------------------------------
+# Message Queue
+#---------------------------------------------------------------------------
+
+def queueMessage(text): # Buffers a whisper so that it's sent after everything the current action notifies, at the next checkpoint.
+# Notifys aren't queued: They're sent straight away by the code that makes them (or as one block by groupAnnouncements()), so they're already in order with each other.
+   MessageQueue.append(text)
+   if ActionDepth == 0: flushMessages() # If we're not inside a checkpointed action, nobody is going to flush it for us.
+
+def flushMessages(): 
+# Sends all the queued whispers in the order they were queued.
+# Whispers show up immediately, while notifys go through the server first. So a single round trip lets everything the action notified arrive first, instead of one per whisper.
+   global MessageQueue
+   if not MessageQueue: return
+   queuedMessages = MessageQueue
+   MessageQueue = []
+   waitFor(None, 1, label = 'flushMessages')
+   for text in queuedMessages: whisper(text)
+
+def messageCheckpoint(action): # A decorator for the actions players start themselves. When the outermost one is over, the messages queued during it are flushed.
+   def checkpointedAction(*args, **kwargs):
+      global ActionDepth
+      ActionDepth += 1
+      try: return action(*args, **kwargs)
+      finally:
+         ActionDepth -= 1
+         if ActionDepth == 0: flushMessages()
+   return checkpointedAction
+
+def announce(text): # Adds a line to the announcement being built for the current action, or notifies it straight away if there's none.
+   if AnnounceDepth: AnnouncementLines.append(text)
+   else: notify(text)
+
+def groupAnnouncements(action): 
+# A decorator for the functions which announce their effects line by line (titles, effects, warnings and separators).
+# The lines announced while the outermost of them is running are sent as one multi-line message when it's over, with the same wording as before.
+# We notify it directly instead of queueing it, so that it still shows up before whatever the calling action announces afterwards.
+   def announcingAction(*args, **kwargs):
+      global AnnounceDepth
+      AnnounceDepth += 1
+      try: return action(*args, **kwargs)
+      finally:
+         AnnounceDepth -= 1
+         if AnnounceDepth == 0: flushAnnouncements()
+   return announcingAction
+
+def flushAnnouncements(): # Sends the lines announced so far as one message. Called when the announcing action is over, and before anything which must be seen after them but can't wait (e.g. submitting the game result).
+   global AnnouncementLines
+   if not AnnouncementLines: return
+   announcement = '\n'.join(AnnouncementLines)
+   AnnouncementLines = []
+   notify(announcement)
 
 #---------------------------------------------------------------------------
 # Clicks indication
@@ -95,6 +156,7 @@ def modClicks(group,x=0,y=0):
 #---------------------------------------------------------------------------
 # Start/End of turn
 #---------------------------------------------------------------------------
+@messageCheckpoint
 def goToEndTurn(group, x = 0, y = 0):
    debugNotify(">>> goToEndTurn(){}".format(extraASDebug())) #Debug
    mute()
@@ -119,9 +181,7 @@ def goToEndTurn(group, x = 0, y = 0):
    endofturn = False
    newturn = False
    currClicks = 0
-   myCards = (card for card in table if card.controller == me and card.owner == me)
-   for card in myCards: # We refresh once-per-turn cards to be used on the opponent's turn as well (e.g. Net Shield)
-      if card._id in Stored_Type and fetchProperty(card, 'Type') != 'ICE': card.orientation &= ~Rot90
+   refreshExhaustedCards() # We refresh once-per-turn cards to be used on the opponent's turn as well (e.g. Net Shield)
    atTimedEffects('End')
    clearAll() # Just in case the player has forgotten to remove their temp markers.
    if ds == "corp": notify ("=> {} ({}) has reached CoB (Close of Business hours).".format(identName, me))
@@ -129,6 +189,34 @@ def goToEndTurn(group, x = 0, y = 0):
    opponent = ofwhom('onOpponent')
    opponent.setActivePlayer() # new in OCTGN 3.0.5.47
 
+def refreshExhaustedCards(): # Straightens the cards we control whose once-per-turn abilities have been used, as recorded by exhaustCard()
+   debugNotify(">>> refreshExhaustedCards()") #Debug
+# We look through the records of every player, as our opponent may have exhausted one of our cards for us, but we only ever write to our own record.
+   for player in players:
+      for cID in eval(player.getGlobalVariable('Exhausted Cards')):
+         card = cardHandle(cID)
+         if card.group != table: continue
+         if card.controller == me and card.owner == me:
+            if card._id in Stored_Type and fetchProperty(card, 'Type') != 'ICE': card.orientation &= ~Rot90
+   exhaustedCards = eval(me.getGlobalVariable('Exhausted Cards'))
+   remainingCards = [cID for cID in exhaustedCards
+                     if cardHandle(cID).group == table
+                     and cardHandle(cID).controller != me
+                     and cardHandle(cID).orientation == Rot90] # The opponent's cards we exhausted stay recorded until they've refreshed them. Our own and the ones which have left play are forgotten.
+   if remainingCards != exhaustedCards: me.setGlobalVariable('Exhausted Cards',str(remainingCards))
+   debugNotify("<<< refreshExhaustedCards()", 3) #Debug
+
+def refreshAllCards(group = table, x = 0, y = 0): # Refreshes all our cards by scanning the whole table, in case some of them were turned sideways by hand.
+   debugNotify(">>> refreshAllCards()") #Debug
+   mute()
+   myCards = (card for card in queryTable(controller = me) if card.owner == me)
+   for card in myCards:
+      if card._id in Stored_Type and fetchProperty(card, 'Type') != 'ICE': card.orientation &= ~Rot90
+   refreshExhaustedCards() # We also clear the records of our cards which have been refreshed.
+   notify("{} refreshes all their once-per-turn cards.".format(me))
+   debugNotify("<<< refreshAllCards()", 3) #Debug
+
+@messageCheckpoint
 def goToSot (group, x=0,y=0):
    debugNotify(">>> goToSot(){}".format(extraASDebug())) #Debug
    global newturn, endofturn, lastKnownNrClicks, currClicks, turn
@@ -154,11 +242,11 @@ def goToSot (group, x=0,y=0):
    else: extraTXT = ''
    me.Clicks = maxClicks - clicksReduce
    lastKnownNrClicks = me.Clicks
-   myCards = (card for card in table if card.controller == me and card.owner == me)
-   for card in myCards:
-      if card._id in Stored_Type and fetchProperty(card, 'Type') != 'ICE': card.orientation &= ~Rot90 # Refresh all cards which can be used once a turn.
-   remoteServers = (card for card in table if card.Name == 'Remote Server')
-   for card in remoteServers: card.setController(me) # At the start of each player's turn, we swap the ownership of all remote server, to allow them to double-click them (If they're a runner) or manipulate them (if they're a corp)
+   refreshExhaustedCards() # Refresh all cards which can be used once a turn.
+   for card in getRemoteServers(): # At the start of each player's turn, we swap the ownership of all remote server, to allow them to double-click them (If they're a runner) or manipulate them (if they're a corp)
+      if card.controller != me: 
+         card.setController(me)
+         indexCard(card, me)
    newturn = True
    turn += 1
    autoRez()
@@ -177,15 +265,58 @@ def goToSot (group, x=0,y=0):
 
 def autoRez():
    # A function which rezzes all cards which have been flagged to be auto-rezzed at the start of the turn.
+   # We rez them as one batch. Their costs are planned together with a single scan for cost modifiers, paid at once, and announced in one line.
+   # If we can't afford them all, we rez as many as we can in the order they were flagged, and keep the flags of the rest for next turn.
    debugNotify(">>> autoRez()") #Debug
    mute()
    global autoRezFlags
+   candidates = []
    for cID in autoRezFlags:
-      card = Card(cID)
-      delayed_whisper("--- Attempting to Auto Rez {}".format(fetchProperty(card, 'Name')))
-      if intRez(card, silentCost = True) == 'ABORT': delayed_whisper(":::WARNING::: Could not rez {} automatically. Ignoring".format(fetchProperty(card, 'Name')))
-   del autoRezFlags[:]
+      card = cardHandle(cID)
+      if card.group != table or card.isFaceUp or not isRezzable(card): 
+         delayed_whisper(":::WARNING::: Could not rez {} automatically. Ignoring".format(fetchProperty(card, 'Name')))
+         continue
+      candidates.append(card)
+   rezList, costPlans, totalCost = planRezBatch(candidates) # We find out what we can afford before anything is trashed or targeted.
+   unaffordable = candidates[len(rezList):]
+   confirmedList = [card for card in rezList if checkUnique(card) and chkTargeting(card) != 'ABORT']
+   if len(confirmedList) != len(rezList): rezList, costPlans, totalCost = planRezBatch(confirmedList) # Dropping cards can only make the rest cheaper, so they all stay affordable.
+   autoRezFlags = [card._id for card in unaffordable]
+   if len(unaffordable):
+      notify(":::WARNING::: {} cannot afford to auto-rez {} this turn. They remain flagged.".format(me,', '.join([fetchProperty(c, 'Name') for c in unaffordable])))
+   if len(rezList) == 0:
+      debugNotify("<<< autoRez() - Nothing to rez", 3) #Debug
+      return
+   for costPlan in costPlans: commitCostPlan(costPlan)
+   rc = payCost(totalCost, silentCost = True)
+   if rc == 'ABORT': return
+   elif rc != 0: rc = " for {}".format(rc)
+   else: rc = ''
+   for card in rezList: card.isFaceUp = True
+   notify("{} has auto-rezzed {}{}.".format(me, ', '.join(['{}'.format(c) for c in rezList]), rc))
+   waitFor(None, 1, label = 'autoRez') # One round trip so that the other players see the cards rezzed before their scripts react to them.
+   for card in rezList:
+      executePlayScripts(card,'REZ')
+      autoscriptOtherPlayers('CardRezzed',card)
    debugNotify("<<< autoRez()", 3) #Debug
+
+def planRezBatch(cards): 
+# Plans the rez costs of the cards in order, with a single scan for cost modifiers, and stops at the first card we can't afford on top of the previous ones.
+# Returns the cards we can afford, their cost plans and their total cost. Nothing is paid or changed yet.
+   global gatheredCardList
+   rezList = []
+   costPlans = []
+   totalCost = 0
+   for card in cards:
+      costPlan = planCost(card, 'REZ', num(fetchProperty(card, 'Cost')), costPlans)
+      gatheredCardList = True # We set this variable to True, so that the next cards' plans do not scan the table for cost modifiers again.
+      cardCost = num(fetchProperty(card, 'Cost')) - costPlan['reduction'] + findExtraCosts(card, 'REZ')
+      if totalCost + cardCost > me.Credits: break
+      costPlans.append(costPlan)
+      totalCost += cardCost
+      rezList.append(card)
+   gatheredCardList = False  # We set this variable to False, so that reduceCost() calls from other functions can start scanning the table again.
+   return (rezList, costPlans, totalCost)
 #------------------------------------------------------------------------------
 # Game Setup
 #------------------------------------------------------------------------------
@@ -243,6 +374,7 @@ def createStartingCards():
    except: notify("!!!ERROR!!! {} - In createStartingCards()\n!!! PLEASE INSTALL MARKERS SET FILE !!!".format(me))
 
 
+@messageCheckpoint
 def intJackin(group, x = 0, y = 0):
    debugNotify(">>> intJackin(){}".format(extraASDebug())) #Debug
    global ds, maxClicks, Identity
@@ -289,13 +421,13 @@ def intJackin(group, x = 0, y = 0):
    debugNotify("### Identity is: {}".format(Identity), 3)
    if ds == "corp":
       Identity.moveToTable(125, 240)
-      rnd(1,10) # Allow time for the ident to be recognised
+      waitFor(lambda: Identity.Type != '?', label = 'Identity') # Allow time for the ident to be recognised
       maxClicks = 3
       me.MU = 0
       notify("{} is the CEO of the {} Corporation".format(me,Identity))
    else:
       Identity.moveToTable(105, -345)
-      rnd(1,10)  # Allow time for the ident to be recognised
+      waitFor(lambda: Identity.Type != '?', label = 'Identity')  # Allow time for the ident to be recognised
       maxClicks = 4
       me.MU = 4
       BL = num(Identity.Cost)
@@ -335,8 +467,9 @@ def checkDeckNoLimit(group):
    agendasCount = 0
    trash = me.piles['Archives(Hidden)'] # We use the hidden archives so that the opponent can't see the cards as we check them
    debugNotify("### About to move cards into trash", 5) #Debug
-   for card in group: card.moveTo(trash)
-   if len(players) > 1: random = rnd(1,100) # Fix for multiplayer only. Makes Singleplayer setup very slow otherwise.
+   deckCards = list(group)
+   for card in deckCards: card.moveTo(trash)
+   if len(players) > 1 and len(deckCards): waitFor(lambda: deckCards[-1].Type != '?', label = 'checkDeckNoLimit') # Fix for multiplayer only. Makes Singleplayer setup very slow otherwise.
    debugNotify("### About to check each card in the deck", 5) #Debug
    for card in trash:
       #if ok == False: continue # If we've already found illegal cards, no sense in checking anymore. Will activate this after checking
@@ -361,7 +494,7 @@ def checkDeckNoLimit(group):
          elif card.Faction != identity.Faction and card.Faction != 'Neutral':
             notify(":::ERROR::: Faction-restricted card ({}) found in {}'s {}.".format(fetchProperty(card, 'name'), me, pileName(group)))
             ok = False
-   if len(players) > 1: random = rnd(1,100) # Fix for multiplayer only. Makes Singleplayer setup very slow otherwise.
+   if len(players) > 1: waitFor(None, 1, label = 'checkDeckNoLimit') # Fix for multiplayer only. Makes Singleplayer setup very slow otherwise.
    for card in trash: card.moveToBottom(group) # We use a second loop because we do not want to pause after each check
    if ds == 'corp' and loAP/loDeckCount < 2.0/5.0:
       notify(":::ERROR::: Only {} Agenda Points in {}'s R&D.".format(loAP/1,me))
@@ -380,6 +513,17 @@ def createRemoteServer(group,x=0,y=0):
    debugNotify(">>> createSDF(){}".format(extraASDebug())) #Debug
    Server = table.create("d59fc50c-c727-4b69-83eb-36c475d60dcb", x, y - (40 * playerside), 1, False)
    placeCard(Server,'INSTALL')
+   remoteServers = eval(getGlobalVariable('Remote Servers'))
+   remoteServers.append(Server._id) # We register the new server so that nobody needs to look for it on the table later.
+   setGlobalVariable('Remote Servers',str(remoteServers))
+
+def getRemoteServers(): # Returns the remote servers currently on the table, as registered by createRemoteServer()
+   remoteIDs = eval(getGlobalVariable('Remote Servers'))
+   remoteServers = [Card(serverID) for serverID in remoteIDs]
+   existingServers = [server for server in remoteServers if server.group == table]
+   if len(existingServers) != len(remoteServers): # If any of the servers has been trashed, we remove it from the registry.
+      setGlobalVariable('Remote Servers',str([server._id for server in existingServers]))
+   return existingServers
 
 #------------------------------------------------------------------------------
 # Run...
@@ -415,9 +559,11 @@ def intRun(aCost = 1, Name = 'R&D', silent = False):
    debugNotify("Painting run Arrow", 2)
    if Name != 'Remote': targetServer = getSpecial(Name,enemyIdent.controller)
    else:
-      targetRemote = findTarget("Targeted-atRemote Server-isMutedTarget") # We try to see if the player had a remote targeted, if so we make it the target.
-      if len(targetRemote) > 0: targetServer = targetRemote[0] # If there's no remote targeted, we paint no arrow.
-      else: abortArrow = True # If we cannot figure out which remote the runner is running on,
+      remoteServers = getRemoteServers()
+      targetRemote = [server for server in remoteServers if server.targetedBy and server.targetedBy == me] # We try to see if the player had a remote targeted, if so we make it the target.
+      if len(targetRemote) > 0: targetServer = targetRemote[0]
+      elif len(remoteServers) == 1: targetServer = remoteServers[0] # If there's only one remote, that's the one the runner is running on.
+      else: abortArrow = True # If we cannot figure out which remote the runner is running on, we paint no arrow.
    if not abortArrow:
       targetServer.target(False)
       myIdent.arrow(targetServer, True)
@@ -440,6 +586,7 @@ def runServer(group, x=0,y=0):
    debugNotify(">>> runSDF(){}".format(extraASDebug())) #Debug
    intRun(1, "Remote")
 
+@messageCheckpoint
 def jackOut(group=table,x=0,y=0, silent = False):
    mute()
    debugNotify(">>> jackOut(). Current status:{}".format(getGlobalVariable('status'))) #Debug
@@ -558,6 +705,7 @@ def addPlusOne(card, x = 0, y = 0):
       card.markers[mdict['MinusOne']] -= 1
    else:
       card.markers[mdict['PlusOne']] += 1
+   trackTempCard(card)
    notify("{} adds one +1 marker on {}.".format(me,card))
 
 def addMinusOne(card, x = 0, y = 0):
@@ -567,6 +715,7 @@ def addMinusOne(card, x = 0, y = 0):
       card.markers[mdict['PlusOne']] -= 1
    else:
       card.markers[mdict['MinusOne']] += 1
+   trackTempCard(card)
    notify("{} adds one -1 marker on {}.".format(me,card))
 
 def addPlusOnePerm(card, x = 0, y = 0):
@@ -582,6 +731,7 @@ def addMarker(cards, x = 0, y = 0): # A simple function to manually add any of t
    if quantity == 0: return
    for card in cards: # Then go through their cards and add those markers to each.
       card.markers[marker] += quantity
+      if marker == mdict['PlusOne'] or marker == mdict['MinusOne'] or marker == mdict['BaseLink']: trackTempCard(card)
       notify("{} adds {} {} counter to {}.".format(me, quantity, marker[0], card))
 
 def addVirusCounter(card, x = 0, y = 0):
@@ -641,7 +791,7 @@ def advanceCardM(card, x = 0, y = 0):
 # Tracing...
 #----------------------
 
-def inputTraceValue (card, x=0,y=0, limit = 0, silent = False):
+def inputTraceValue (card, x=0,y=0, limit = 0, silent = False, record = None):
    debugNotify(">>> inputTraceValue(){}".format(extraASDebug())) #Debug
    mute()
    limitText = ''
@@ -662,12 +812,15 @@ def inputTraceValue (card, x=0,y=0, limit = 0, silent = False):
       if TraceValue == None:
          whisper(":::Warning::: Trace attempt aborted by player.")
          return 'ABORT'
-   while TraceValue - reduceCost(card, 'TRACE', TraceValue, dryRun = True) > me.Credits and not confirm("You do not seem to have enough bits to increase your Trace Strength by this amount. Continue anyway?"):
+   costPlan = planCost(card, 'TRACE', TraceValue)
+   while TraceValue - costPlan['reduction'] > me.Credits and not confirm("You do not seem to have enough bits to increase your Trace Strength by this amount. Continue anyway?"):
       TraceValue = askInteger("Increase {} Strength by how much?{}".format(traceTXT, limitText), 0)
       if TraceValue == None:
          whisper(":::Warning::: Trace attempt aborted by player.")
          return 'ABORT'
-   reduction = reduceCost(card, 'TRACE', TraceValue)
+      costPlan = planCost(card, 'TRACE', TraceValue)
+   commitCostPlan(costPlan) # We use the same plan we've shown the player, so that we don't need to evaluate the modifiers again.
+   reduction = costPlan['reduction']
    if reduction > 0: extraText = " (Cost reduced by {})".format(uniCredit(reduction))
    elif reduction < 0: extraText = " (Cost increased by {})".format(uniCredit(abs(reduction)))
    else: extraText = ''
@@ -675,30 +828,27 @@ def inputTraceValue (card, x=0,y=0, limit = 0, silent = False):
    #card.markers[mdict['Credits']] = TraceValue
    if ds == 'corp':
       if not silent: notify("{} starts a trace with a base strength of 0 reinforced by {}{}.".format(me,TraceValue,extraText))
-      setGlobalVariable('CorpTraceValue',str(TraceValue))
+      if not record: record = traceRecord() # A trace started by hand has no base strength or effects.
+      record['bid'] = TraceValue
+      setGlobalVariable('Trace',str(record)) # We share the whole trace in one go, so that the runner has everything they need to resolve it.
       OpponentTrace = getSpecial('Tracing',ofwhom('ofOpponent'))
       OpponentTrace.highlight = EmergencyColor
+      trackTempCard(OpponentTrace)
    else:
       if not silent: notify("{} reinforces their {} by {} for a total of {}{}.".format(me,uniLink(),TraceValue, TraceValue + me.counters['Base Link'].value,extraText))
-      CorpTraceValue = num(getGlobalVariable('CorpTraceValue'))
-      currentTraceEffectTuple = eval(getGlobalVariable('CurrentTraceEffect'))
-      debugNotify("currentTraceEffectTuple = {}".format(currentTraceEffectTuple), 2)
-      if CorpTraceValue > TraceValue  + me.counters['Base Link'].value:
+      record = eval(getGlobalVariable('Trace'))
+      if not record: record = traceRecord() # If the corp hasn't started a trace, there's nothing to beat.
+      debugNotify("Trace record = {}".format(record), 2)
+      if traceSucceeds(record, TraceValue + me.counters['Base Link'].value):
          notify("-- {} has been traced".format(identName))
          autoscriptOtherPlayers('UnavoidedTrace', card)
-         try:
-            if currentTraceEffectTuple[1] != 'None':
-               executeTraceEffects(Card(currentTraceEffectTuple[0]),currentTraceEffectTuple[1]) # We sent this function the card which triggered the trace, and the effect which was triggered.
-         except: pass # If it's an exception it means our tuple does not exist, so there's no current trace effects. Manual use of the trace card?
+         traceEffects = record['success']
       else:
          notify("-- {} has eluded the trace".format(identName))
          autoscriptOtherPlayers('EludedTrace', card)
-         try:
-            if currentTraceEffectTuple[2] != 'None':
-               executeTraceEffects(Card(currentTraceEffectTuple[0]),currentTraceEffectTuple[2]) # We sent this function the card which triggered the trace, and the effect which was triggered.
-         except: pass # If it's an exception it means our tuple does not exist, so there's no current trace effects. Manual use of the trace card?
-      setGlobalVariable('CurrentTraceEffect','None') # Once we're done with the current effects of the trace, we clear the CurrentTraceEffect global variable
-      setGlobalVariable('CorpTraceValue','None') # And the corp's trace value
+         traceEffects = record['failure']
+      if record['card'] != None and traceEffects: executeTraceEffects(cardHandle(record['card']),traceEffects) # We sent this function the card which triggered the trace, and the effect which was triggered. Manual traces have neither.
+      setGlobalVariable('Trace','None') # Once we're done with the current effects of the trace, we clear it.
       card.highlight = None
    return TraceValue
 
@@ -728,8 +878,8 @@ def inputTraceValue (card, x=0,y=0, limit = 0, silent = False):
 def cancelTrace ( card, x=0,y=0):
    debugNotify(">>> cancelTrace(){}".format(extraASDebug())) #Debug
    mute()
-   TraceValue = 0
    card.markers[mdict['Credits']] = 0
+   setGlobalVariable('Trace','None')
    notify ("{} cancels the Trace.".format(me) )
 
 #------------------------------------------------------------------------------
@@ -763,12 +913,26 @@ def findExtraCosts(card, action = 'REZ'):
    return increase
 
 
-def reduceCost(card, action = 'REZ', fullCost = 0, dryRun = False):
+def reduceCost(card, action = 'REZ', fullCost = 0, dryRun = False): # Returns by how much the cost of an action is reduced. Unless it's a dry run, it also uses up whatever the reduction consumes.
+   costPlan = planCost(card, action, fullCost)
+   if not dryRun: commitCostPlan(costPlan)
+   return costPlan['reduction']
+
+def planCost(card, action = 'REZ', fullCost = 0, priorPlans = None):
+# Function which figures out all the modifiers that apply to the cost of an action, without consuming anything.
+# It returns a cost plan dictionary which can be shown to the player and then passed to commitCostPlan(), so that we don't have to evaluate everything a second time.
+# When planning several costs before committing any of them, we pass the plans made so far as priorPlans, so that we don't count the same credits or once-per-turn effects twice.
+   if priorPlans is None: priorPlans = []
    type = action.capitalize()
-   debugNotify(">>> reduceCost(). Action is: {}. FullCost = {}".format(type,fullCost)) #Debug
+   debugNotify(">>> planCost(). Action is: {}. FullCost = {}".format(type,fullCost)) #Debug
    #if fullCost == 0: return 0 # Not used as we now have actions which also increase costs
    fullCost = abs(fullCost)
    reduction = 0
+   costPlan = {'reduction'  : 0,    # The total reduction (or increase if negative) of the cost.
+               'notices'    : [],   # The announcements of innate cost reductions.
+               'badPub'     : None, # A tuple of (identity card, bad publicity credits spent)
+               'markers'    : [],   # A list of (card, credit markers used) tuples.
+               'onlyOnce'   : []}   # The cards whose once-per-turn cost modifiers are used.
    status = getGlobalVariable('status')
    costReducers = []
    debugNotify("### Status: {}".format(status), 3)
@@ -792,16 +956,16 @@ def reduceCost(card, action = 'REZ', fullCost = 0, dryRun = False):
          multiplier = per(autoS, card, 0, targetCards)
          reduction += (count * multiplier)
          fullCost -= (count * multiplier)
-         if count * multiplier > 0 and not dryRun: notify("-- {}'s full cost is reduced by {}".format(card,count * multiplier))
+         if count * multiplier > 0: costPlan['notices'].append("-- {}'s full cost is reduced by {}".format(card,count * multiplier))
    else:
       debugNotify("### No self-reducing autoscripts found!", 2)
    ### Now we check if we're in a run and we have bad publicity credits to spend
    if re.search(r'running',status) and fullCost > 0:
       if type == 'Force': myIdent = getSpecial('Identity',ofwhom('-ofOpponent'))
       else: myIdent = getSpecial('Identity',me)
-      if myIdent.markers[mdict['BadPublicity']]:
+      BPcount = myIdent.markers[mdict['BadPublicity']] - sum([plan['badPub'][1] for plan in priorPlans if plan['badPub']])
+      if BPcount > 0:
          usedBP = 0
-         BPcount = myIdent.markers[mdict['BadPublicity']]
          debugNotify("### BPcount = {}".format(BPcount), 2)
          while fullCost > 0 and BPcount > 0:
             reduction += 1
@@ -809,17 +973,12 @@ def reduceCost(card, action = 'REZ', fullCost = 0, dryRun = False):
             usedBP += 1
             BPcount -= 1
             if fullCost == 0: break
-         if not dryRun and usedBP != 0:
-            myIdent.markers[mdict['BadPublicity']] -= usedBP
-            notify(" -- {} spends {} Bad Publicity credits".format(myIdent,usedBP))
+         if usedBP != 0: costPlan['badPub'] = (myIdent,usedBP)
    ### Finally we go through the table and see if there's any cards providing cost reduction
    if not gatheredCardList: # A global variable that stores if we've scanned the tables for cards which reduce costs, so that we don't have to do it again.
       global costModifiers
       del costModifiers[:]
-      RC_cardList = sortPriority([c for c in table
-                              if c.isFaceUp
-                              and c.highlight != RevealedColor
-                              and c.highlight != InactiveColor])
+      RC_cardList = sortPriority(queryTable(rezzed = True, active = True))
       reductionRegex = re.compile(r'(Reduce|Increase)([0-9#X]+)Cost({}|All)-for([A-Z][A-Za-z ]+)(-not[A-Za-z_& ]+)?'.format(type)) # Doing this now, to reduce load.
       for c in RC_cardList: # Then check if there's other cards in the table that reduce its costs.
          Autoscripts = CardsAS.get(c.model,'').split('||')
@@ -856,12 +1015,11 @@ def reduceCost(card, action = 'REZ', fullCost = 0, dryRun = False):
       if reductionSearch.group(4) == 'All' or checkCardRestrictions(gatherCardProperties(card), prepareRestrictions(autoS)):
          debugNotify(" ### Search match! Reduction Value is {}".format(reductionSearch.group(2)), 3) # Debug
          if re.search(r'onlyOnce',autoS):
-            if dryRun: # For dry Runs we do not want to add the "Activated" token on the card.
-               if oncePerTurn(c, act = 'dryRun') == 'ABORT': continue
-            else:
-               if oncePerTurn(c, act = 'automatic') == 'ABORT': continue # if the card's effect has already been used, check the next one
+            if oncePerTurn(c, act = 'dryRun') == 'ABORT': continue # if the card's effect has already been used, check the next one. We only mark it as used when committing the plan.
+            if c._id in [oc._id for plan in priorPlans for oc in plan['onlyOnce']]: continue # Or if one of the plans we haven't committed yet is already using it.
+            costPlan['onlyOnce'].append(c)
          if reductionSearch.group(2) == '#':
-            markersCount = c.markers[mdict['Credits']]
+            markersCount = c.markers[mdict['Credits']] - sum([used for plan in priorPlans for mc, used in plan['markers'] if mc._id == c._id])
             markersRemoved = 0
             while markersCount > 0:
                debugNotify("### Reducing Cost with and Markers from {}".format(c), 2) # Debug
@@ -877,9 +1035,7 @@ def reduceCost(card, action = 'REZ', fullCost = 0, dryRun = False):
                   fullCost += 1
                   markersCount -= 1
                   markersRemoved += 1
-            if not dryRun and markersRemoved != 0:
-               c.markers[mdict['Credits']] -= markersRemoved # If we have a dryRun, we don't remove any tokens.
-               notify(" -- {} credits are used from {}".format(markersRemoved,c))
+            if markersRemoved != 0: costPlan['markers'].append((c,markersRemoved))
          elif reductionSearch.group(2) == 'X':
             markerName = re.search(r'-perMarker{([\w ]+)}', autoS)
             try:
@@ -903,7 +1059,22 @@ def reduceCost(card, action = 'REZ', fullCost = 0, dryRun = False):
                else:
                   reduction -= 1
                   fullCost += 1
-   return reduction
+   costPlan['reduction'] = reduction
+   debugNotify("<<< planCost() with reduction: {}".format(reduction), 3) #Debug
+   return costPlan
+
+def commitCostPlan(costPlan): # Consumes everything a cost plan from planCost() has used for its reduction.
+   debugNotify(">>> commitCostPlan()") #Debug
+   for notice in costPlan['notices']: notify(notice)
+   if costPlan['badPub']:
+      myIdent, usedBP = costPlan['badPub']
+      myIdent.markers[mdict['BadPublicity']] -= usedBP
+      notify(" -- {} spends {} Bad Publicity credits".format(myIdent,usedBP))
+   for c in costPlan['onlyOnce']: oncePerTurn(c, act = 'automatic')
+   for c, markersRemoved in costPlan['markers']:
+      c.markers[mdict['Credits']] -= markersRemoved
+      notify(" -- {} credits are used from {}".format(markersRemoved,c))
+   debugNotify("<<< commitCostPlan()", 3) #Debug
 
 def intdamageDiscard(group,x=0,y=0):
    debugNotify(">>> intdamageDiscard(){}".format(extraASDebug())) #Debug
@@ -912,7 +1083,7 @@ def intdamageDiscard(group,x=0,y=0):
       notify ("{} has flatlined.".format(me))
       reportGame('Flatlined')
    else:
-      card = group.random()
+      card = sampleCards(group, 1)[0]
       if ds == 'corp': card.moveTo(me.piles['Archives(Hidden)'])
       else: card.moveTo(me.piles['Heap/Archives(Face-up)'])
       notify("{} discards {} at random.".format(me,card))
@@ -927,10 +1098,10 @@ def addBrainDmg(group, x = 0, y = 0):
       notify ("{} suffers 1 Brain Damage.".format(me) )
       intdamageDiscard(me.hand)
 
-def applyBrainDmg(player = me):
+def applyBrainDmg(player = me, count = 1):
    debugNotify(">>> applyBrainDmg(){}".format(extraASDebug())) #Debug
    specialCard = getSpecial('Identity', player)
-   specialCard.markers[mdict['BrainDMG']] += 1
+   specialCard.markers[mdict['BrainDMG']] += count
 
 def addMeatDmg(group, x = 0, y = 0):
    mute()
@@ -963,70 +1134,88 @@ def getCredit(group, x = 0, y = 0):
 def findDMGProtection(DMGdone, DMGtype, targetPL): # Find out if the player has any card preventing damage
    debugNotify(">>> findDMGProtection(){}".format(extraASDebug())) #Debug
    if not Automations['Damage Prevention']: return 0
-   protectionFound = 0
-   protectionType = 'protection{}DMG'.format(DMGtype) # This is the string key that we use in the mdict{} dictionary
-   for card in table: # First we check if we have some emergency protection cards.
-      if card.controller == targetPL and re.search(r'onDamage', CardsAS.get(card.model,'')):
+   for card in queryTable(controller = targetPL): # First we check if we have some emergency protection cards.
+      if re.search(r'onDamage', CardsAS.get(card.model,'')):
          if re.search(r'{}DMG'.format(DMGtype), CardsAS.get(card.model,'')):
             if re.search(r'onlyOnce',CardsAS.get(card.model,'')) and card.orientation == Rot90: continue # If the card has a once per-turn ability which has been used, ignore it
             if re.search(r'excludeDummy',CardsAS.get(card.model,'')) and card.highlight == DummyColor: continue
             if targetPL == me:
                if confirm("You control a {} which can prevent some of the damage you're about to suffer. Do you want to activate it now?".format(fetchProperty(card, 'name'))):
                   executePlayScripts(card, 'DAMAGE')
-                  if re.search(r'onlyOnce',CardsAS.get(card.model,'')): card.orientation = Rot90
+                  if re.search(r'onlyOnce',CardsAS.get(card.model,'')): exhaustCard(card)
             else:
                if confirm("{} controls a {} which can prevent some of the damage you're about to inflict to them. Do they wish you to activate their card for them automatically?".format(targetPL.name,fetchProperty(card, 'name'))):
                   executePlayScripts(card, 'DAMAGE')
-                  if re.search(r'onlyOnce',CardsAS.get(card.model,'')): card.orientation = Rot90
-   cardList = sortPriority([c for c in table
-               if c.controller == targetPL
-               and c.markers])
-   for card in cardList: # First we check for complete damage protection (i.e. protection from all types), which is always temporary.
-      if card.markers[mdict['protectionAllDMG']]:
-         if card.markers[mdict['protectionAllDMG']] == 100: # If we have 100 markers of damage prevention, the card is trying to prevent all Damage.
-            protectionFound += DMGdone
-            DMGdone = 0
-            card.markers[mdict['protectionAllDMG']] = 0
-         else:
-            while DMGdone > 0 and card.markers[mdict['protectionAllDMG']] > 0:
-               protectionFound += 1
-               DMGdone -= 1
-               card.markers[mdict['protectionAllDMG']] -= 1
-         if re.search(r'trashCost',CardsAS.get(card.model,'')):
-            debugNotify("### {} has with trashCost".format(card), 3)
-            ModifyStatus('TrashMyself', targetPL.name, card, notification = 'Quick') # If the modulator -trashCost is there, the card trashes itself in order to use it's damage prevention ability
-         if DMGdone == 0: break
-   for card in cardList:
-      if card.markers[mdict[protectionType]]:
-         if card.markers[mdict[protectionType]] == 100: # If we have 100 markers of damage prevention, the card is trying to prevent all Damage.
-            protectionFound += DMGdone
-            DMGdone = 0
-            card.markers[mdict[protectionType]] = 0
-         else:
-            while DMGdone > 0 and card.markers[mdict[protectionType]] > 0: # For each point of damage we do.
-               protectionFound += 1 # We increase the protection found by 1
-               DMGdone -= 1 # We reduce how much damage we still need to prevent by 1
-               card.markers[mdict[protectionType]] -= 1 # We reduce the card's damage protection counters by 1
-         if re.search(r'trashCost',CardsAS.get(card.model,'')): ModifyStatus('TrashMyself', targetPL.name, card, notification = 'Quick') # If the modulator -trashCost is there, the card trashes itself in order to use it's damage prevention ability
-         if DMGdone == 0: break # If we've found enough protection to alleviate all damage, stop the search.
-   if DMGtype == 'Net' or DMGtype == 'Brain': altprotectionType = 'protectionNetBrainDMG' # To check for the combined Net & Brain protection counter as well.
-   else: altprotectionType = None
-   for card in cardList: # We check for the combined protections after we use the single protectors.
-      if altprotectionType and card.markers[mdict[altprotectionType]]:
-         if card.markers[mdict[altprotectionType]] == 100: # If we have 100 markers of damage prevention, the card is trying to prevent all Damage.
-            protectionFound += DMGdone
-            DMGdone = 0
-            card.markers[mdict[altprotectionType]] = 0
-         else:
-            while DMGdone > 0 and card.markers[mdict[altprotectionType]] > 0:
-               protectionFound += 1 #
-               DMGdone -= 1
-               card.markers[mdict[altprotectionType]] -= 1
-         if re.search(r'trashCost',CardsAS.get(card.model,'')): ModifyStatus('TrashMyself', targetPL.name, card, notification = 'Quick') # If the modulator -trashCost is there, the card trashes itself in order to use it's damage prevention ability
-         if DMGdone == 0: break
+                  if re.search(r'onlyOnce',CardsAS.get(card.model,'')): exhaustCard(card)
+   protectionFound, protectionUsed = planDMGProtection(DMGdone, protectionPool(DMGtype, targetPL))
+   for card, protectionType, remaining, trashCost in protectionUsed: # Now that we know how much each card prevents, we take the markers off all of them in one go...
+      card.markers[mdict[protectionType]] = remaining
+   trashedCards = []
+   for card, protectionType, remaining, trashCost in protectionUsed: # ...and then we trash the ones which are used up by preventing damage.
+      if trashCost and card not in trashedCards:
+         debugNotify("### {} has with trashCost".format(card), 3)
+         ModifyStatus('TrashMyself', targetPL.name, card, notification = 'Quick') # If the modulator -trashCost is there, the card trashes itself in order to use it's damage prevention ability
+         trashedCards.append(card)
    debugNotify("<<< findDMGProtection() by returning: {}".format(protectionFound), 3)
    return protectionFound
 
+def protectionPool(DMGtype, targetPL): 
+# Gathers all the damage protection markers the player has on the table for a type of damage, in a single pass.
+# Returns a list of (card, marker type, markers, trashCost) in the order they're used up: Complete protection first (which is always temporary), then the protection for this damage type, then the combined Net & Brain protection.
+   debugNotify(">>> protectionPool(){}".format(extraASDebug())) #Debug
+   protectionTypes = ['protectionAllDMG', 'protection{}DMG'.format(DMGtype)] # These are the string keys that we use in the mdict{} dictionary
+   if DMGtype == 'Net' or DMGtype == 'Brain': protectionTypes.append('protectionNetBrainDMG') # To check for the combined Net & Brain protection counter as well.
+   pool = dict([(protectionType,[]) for protectionType in protectionTypes])
+   for card in sortPriority(queryTable(controller = targetPL, marked = True)):
+      trashCost = re.search(r'trashCost',CardsAS.get(card.model,'')) != None
+      for protectionType in protectionTypes:
+         if card.markers[mdict[protectionType]]: pool[protectionType].append((card, protectionType, card.markers[mdict[protectionType]], trashCost))
+   sortedPool = []
+   for protectionType in protectionTypes: sortedPool.extend(pool[protectionType])
+   debugNotify("<<< protectionPool() with {} sources".format(len(sortedPool)), 3)
+   return sortedPool
+
+def planDMGProtection(DMGdone, pool): 
+# Works out how much of DMGdone the protection pool prevents, without touching any card yet.
+# Returns the damage prevented, and the (card, marker type, markers left, trashCost) of each protection source we used.
+   protectionFound = 0
+   protectionUsed = []
+   trashedSources = [] # Cards which are trashed to provide their protection can only do so once, whatever protection types they have.
+   for card, protectionType, markers, trashCost in pool:
+      if DMGdone == 0: break # If we've found enough protection to alleviate all damage, stop the search.
+      if card in trashedSources: continue
+      if trashCost: trashedSources.append(card)
+      if markers == 100: prevented = DMGdone # If we have 100 markers of damage prevention, the card is trying to prevent all Damage.
+      else: prevented = min(DMGdone, markers)
+      protectionFound += prevented
+      DMGdone -= prevented
+      if markers == 100: protectionUsed.append((card, protectionType, 0, trashCost))
+      else: protectionUsed.append((card, protectionType, markers - prevented, trashCost))
+   return (protectionFound, protectionUsed)
+
+@groupAnnouncements
+def resolveDamage(DMG, DMGtype, targetPL, preventable = True): 
+# Resolves DMG damage of a type against a player: First the damage their protection prevents, then all the random discards in one batch.
+# Returns a tuple with how much damage they suffered and how much they prevented.
+   debugNotify(">>> resolveDamage(){}".format(extraASDebug())) #Debug
+   if preventable: DMGprevented = findDMGProtection(DMG, DMGtype, targetPL)
+   else: DMGprevented = 0
+   DMG -= DMGprevented
+   if currentHandSize(targetPL) <= 0: discardLimit = 0 # They flatline as soon as they run out of cards in their hand, or out of hand size.
+   elif DMGtype == 'Brain': discardLimit = min(len(targetPL.hand), currentHandSize(targetPL)) # Each Brain damage also reduces their hand size by one.
+   else: discardLimit = len(targetPL.hand)
+   discardedCards = sampleCards(targetPL.hand, min(DMG, discardLimit))
+   if targetPL.getGlobalVariable('ds') == 'corp': moveCards(discardedCards, targetPL.piles['Archives(Hidden)']) # If they're a corp, move them to the hidden archive
+   else: moveCards(discardedCards, targetPL.piles['Heap/Archives(Face-up)']) #If they're a runner, move them to trash.
+   for DMGcard in discardedCards: announce("--DMG: {} discarded".format(DMGcard))
+   if DMGtype == 'Brain' and len(discardedCards): applyBrainDmg(targetPL, len(discardedCards))
+   if DMG > discardLimit:
+      announce(":::Warning:::{} has flatlined!".format(targetPL)) #If the target does not have any more cards in their hand, inform they've flatlined.
+      if targetPL != me: reportGame('FlatlineVictory') # In case of an effect like the Jinteki's ability
+      else: reportGame('Flatlined')
+   debugNotify("<<< resolveDamage() with return: {}".format((DMG,DMGprevented)), 3)
+   return (DMG,DMGprevented)
+
 def findEnhancements(Autoscript): #Find out if the player has any cards increasing damage dealt.
    debugNotify(">>> findEnhancements(){}".format(extraASDebug())) #Debug
    enhancer = 0
@@ -1063,9 +1252,7 @@ def findCounterPrevention(count, counter, targetPL): # Find out if the player ha
    forfeit = None
    preventionType = 'preventCounter:{}'.format(counter)
    forfeitType = 'forfeitCounter:{}'.format(counter)
-   cardList = [c for c in table
-               if c.controller == targetPL
-               and c.markers]
+   cardList = queryTable(controller = targetPL, marked = True)
    for card in sortPriority(cardList):
       foundMarker = findMarker(card, preventionType)
       if not foundMarker: foundMarker = findMarker(card, forfeitType)
@@ -1092,7 +1279,7 @@ def scrAgenda(card, x = 0, y = 0,silent = False):
       return
    if ds == 'runner' and card.Type != "Agenda" and not card.isFaceUp:
       card.isFaceUp = True
-      random = rnd(100,1000) # Hack Workaround
+      waitFor(lambda: card.Type != '?', label = 'scrAgenda') # We wait until the card we turned face up can be read.
       if card.Type != "Agenda":
          whisper ("You can only score Agendas")
          card.isFaceUp = False
@@ -1109,7 +1296,7 @@ def scrAgenda(card, x = 0, y = 0,silent = False):
       card.isFaceUp = True
       if agendaTxt == 'SCORE' and chkTargeting(card) == 'ABORT':
          card.isFaceUp = False
-         notify("{} cancels their action".format(me))
+         announce("{} cancels their action".format(me))
          return
       ap = num(fetchProperty(card,'Stat'))
       card.markers[mdict['Scored']] += 1
@@ -1122,16 +1309,17 @@ def scrAgenda(card, x = 0, y = 0,silent = False):
       #if ds == 'corp': card.moveToTable(495 + (scoredAgendas * 15), 8, False) # Location of the Agenda Scoring point for the Corp.
       #else: card.moveToTable(336 + (scoredAgendas * 15), -206, False) # Location of the Agenda Scoring point for the Runner.
       #scoredAgendas += 1
-      notify("{} {}s {} and receives {} agenda point(s){}".format(me, agendaTxt.lower(), card, ap - apReduce,extraTXT))
-      if cheapAgenda: notify(":::Warning:::{} did not have enough advance tokens ({} out of {})! ".format(card,currentAdv,card.Cost))
+      announce("{} {}s {} and receives {} agenda point(s){}".format(me, agendaTxt.lower(), card, ap - apReduce,extraTXT))
+      if cheapAgenda: announce(":::Warning:::{} did not have enough advance tokens ({} out of {})! ".format(card,currentAdv,card.Cost))
       executePlayScripts(card,agendaTxt)
       autoscriptOtherPlayers('Agenda'+agendaTxt.capitalize()+'d',card) # The autoscripts triggered by this effect are using AgendaLiberated and AgendaScored as the hook
       if me.counters['Agenda Points'].value >= 7 :
-         notify("{} wins the game!".format(me))
+         announce("{} wins the game!".format(me))
          reportGame()
       card.highlight = None # In case the card was highlighted as revealed, we remove that now.
       card.markers[mdict['Advancement']] = 0 # We only want to clear the advance counters after the automations, as they may still be used.
       card.setController(me) # Taking control of the agenda for the one that scored it.
+      indexCard(card, me)
    else:
       whisper ("You can't score this card")
 
@@ -1146,14 +1334,136 @@ def scrTargetAgenda(group = table, x = 0, y = 0):
             return
    notify("You need to target an unscored agenda in order to use this action")
 
-def accessTarget(group = table, x = 0, y = 0):
-   debugNotify(">>> accessTarget()") #Debug
-   mute()
-   targetPL = ofwhom('-ofOpponent')
-   cardList = [c for c in table
+# Every kind of access goes through accessCards(), which takes the accessed cards one by one from one of the generators below.
+# Each generator sets up its source (covers, flipping cards face up etc), yields a (card, home) tuple for each accessed card, and cleans up after the runner has dealt with it.
+# home is the (pile, index) an ambush revealed on the table has to go back to, or None if it can stay where it was revealed.
+
+def accessHandlers(card): # Returns the onAccess scripts of a card as a list of (isReveal, isIfInstalled, autoS) tuples. We only parse each card model once.
+   if not CompiledAccess.has_key(card.model):
+      accessRegex = re.search(r'onAccess:([^|]+)',CardsAS.get(card.model,''))
+      if accessRegex: CompiledAccess[card.model] = [(bool(re.search(r'Reveal',autoS)), bool(re.search(r'ifInstalled',autoS)), autoS) for autoS in accessRegex.group(1).split('$$')]
+      else: CompiledAccess[card.model] = []
+      debugNotify("### Compiled onAccess for {}: {}".format(card,CompiledAccess[card.model]), 3)
+   return CompiledAccess[card.model]
+
+def ambushWait(card, activationTXT): 
+# Holds the runner back until the corp has decided whether to use the ambush they just accessed.
+# The corp answers through the 'Ambush' shared variable by pressing their OK or Wait! button, so we only check it whenever the runner comes back to the dialog, instead of pinging on every try.
+   debugNotify(">>> ambushWait() for {}".format(card)) #Debug
+   setGlobalVariable('Ambush',str(card._id))
+   notify(":::NOTICE::: {} has stumbled into {}. {} can press OK when they've decided whether to use it, or Wait! if they need more time.".format(me,card,card.owner))
+   checks = 0
+   while getGlobalVariable('Ambush') != 'OK':
+      if getGlobalVariable('Ambush') == 'Wait': waitTXT = "\n\nThe corporation has asked you to wait while they react."
+      else: waitTXT = ''
+      checks += 1
+      if checks > AmbushTimeout: # If the corp doesn't answer, we don't want to keep the runner stuck forever.
+         if confirm("The corporation still hasn't acknowledged your access to {}.{}\n\nDo you want to carry on without waiting any longer?".format(card.name,waitTXT)): 
+            notify(":::NOTICE::: {} carries on without {}'s acknowledgement of {}".format(me,card.owner,card))
+            break
+      else: 
+         information("Ambush! You have stumbled into a {}\
+             \n({})\
+           \n\nYour blunder has already triggered the alarms. Please wait until corporate OpSec has decided whether to use its effects or not.\
+           \n\nThe corporation will press their OK button once they have decided. Press OK here when they have.{}\
+            ".format(card.name,activationTXT,waitTXT))
+      if getGlobalVariable('Ambush') != 'OK' and checks == AmbushTimeout: notify(":::NOTICE::: {} is still waiting for {} to decide whether to use {} or not".format(me,card.owner,card))
+   setGlobalVariable('Ambush','None')
+   debugNotify("<<< ambushWait()", 3) #Debug
+
+def runAccessScripts(card, source, home = None): # Triggers the onAccess effects of a card accessed from the source ('R&D', 'HQ' or 'Installed')
+   handlers = accessHandlers(card)
+   if not handlers: return
+   debugNotify(">>> runAccessScripts() for {} from {}".format(card,source)) #Debug
+   installed = source == 'Installed'
+   if installed or not [autoS for isReveal, ifInstalled, autoS in handlers if ifInstalled]: notify("{} has just accessed a {}!".format(me,card))
+   X = 0
+   for isReveal, ifInstalled, autoS in handlers:
+      if isReveal:
+         if installed: ambushWait(card, "This card activates even when inactive.")
+         elif not ifInstalled:
+            card.moveToTable(0, 0 + yaxisMove(card), False)
+            card.highlight = RevealedColor
+            ambushWait(card, "This card activates even on access from {}.".format(source))
+      else: X = redirect(autoS, card, 'Quick', X)
+   if home and card.group == table: card.moveTo(home[0],home[1]) # Once the ambush is over, we put it back where we found it.
+   debugNotify("<<< runAccessScripts()", 3) #Debug
+
+def accessStatText(cType, cStat): # The line describing the stat of an accessed card, which depends on its type.
+   if cType == 'ICE': return '\nStrength: {}.'.format(cStat)
+   elif cType == 'Asset' or cType == 'Upgrade': return '\nTrash Cost: {}.'.format(cStat)
+   elif cType == 'Agenda': return '\nAgenda Points: {}.'.format(cStat)
+   else: return ''
+
+def accessCard(card, targetPL): # Shows the runner the card they're accessing and carries out what they chose to do with it. Returns 'Trashed', 'Liberated' or 'Left'
+   debugNotify(">>> accessCard() for {}".format(card)) #Debug
+   global gatheredCardList
+   storeProperties(card) # Otherwise trying to trash the card will crash because of reduceCost()
+   cType = fetchProperty(card, 'Type')
+   cStat = fetchProperty(card, 'Stat')
+   title = "Card: {}.\
+          \nType: {}.\
+          \nKeywords: {}.\
+          \nCost: {}.\
+            {}\n\nCard Text: {}\
+        \n\nWhat do you want to do with this card?".format(fetchProperty(card, 'name'),cType,fetchProperty(card, 'Keywords'),fetchProperty(card, 'Cost'),accessStatText(cType, cStat),fetchProperty(card, 'Rules'))
+   if cType == 'Agenda' or cType == 'Asset' or cType == 'Upgrade':
+      if cType == 'Agenda': action1TXT = 'Liberate for {} Agenda Points.'.format(cStat)
+      else:
+         costPlan = planCost(card, 'TRASH', num(cStat))
+         reduction = costPlan['reduction']
+         gatheredCardList = True # We set this variable to True, to tell the next accessed cards' plans not to scan the table a second time.
+         if reduction > 0:
+            extraText = " ({} - {})".format(cStat,reduction)
+            extraText2 = " (reduced by {})".format(uniCredit(reduction))
+         elif reduction < 0:
+            extraText = " ({} + {})".format(cStat,abs(reduction))
+            extraText2 = " (increased by {})".format(uniCredit(abs(reduction)))
+         else:
+            extraText = ''
+            extraText2 = ''
+         action1TXT = 'Pay {}{} to Trash.'.format(num(cStat) - reduction,extraText)
+      options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)",action1TXT]
+   else:                    
+      options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)"]
+   choice = SingleChoice(title, options, 'button')
+   if choice == None: choice = 0
+   result = 'Left'
+   if choice == 1:
+      card.moveTo(targetPL.piles['Heap/Archives(Face-up)'])
+      loopChk(card,'Type')
+      notify("{} {} {} at no cost".format(me,uniTrash(),card))
+      result = 'Trashed'
+   elif choice == 2:
+      if cType == 'Agenda':
+         if card.group != table: card.moveToTable(0,0)
+         card.highlight = RevealedColor
+         scrAgenda(card,silent = True)
+         result = 'Liberated'
+      else:
+         commitCostPlan(costPlan)
+         rc = payCost(num(cStat) - reduction, "not free")
+         if rc != "ABORT": # If the player couldn't pay to trash the card, we leave it where it is.
+            card.moveTo(targetPL.piles['Heap/Archives(Face-up)'])
+            loopChk(card,'Type')
+            notify("{} paid {}{} to {} {}".format(me,uniCredit(num(cStat) - reduction),extraText2,uniTrash(),card))
+            result = 'Trashed'
+   debugNotify("<<< accessCard() with result {}".format(result), 3) #Debug
+   return result
+
+def accessCards(accessedCards, targetPL, source): # Runs each card yielded by one of the access generators through its onAccess effects and the runner's choice, one card at a time.
+   debugNotify(">>> accessCards() from {}".format(source)) #Debug
+   global gatheredCardList
+   for card, home in accessedCards:
+      runAccessScripts(card, source, home)
+      accessCard(card, targetPL)
+   gatheredCardList = False  # We set this variable to False, so that reduceCost() calls from other functions can start scanning the table again.
+   debugNotify("<<< accessCards()", 3) #Debug
+
+def installedAccessCards(targetPL): # Yields the opponent's installed cards we've targeted, turning them face up while we access them.
+   cardList = [c for c in queryTable(controller = targetPL)
                if c.targetedBy
                and c.targetedBy == me
-               and c.controller == targetPL
                and not c.markers[mdict['Scored']]
                and c.Type != 'Server'
                and c.Type != 'Remote Server']
@@ -1161,215 +1471,85 @@ def accessTarget(group = table, x = 0, y = 0):
       cFaceD = False
       if not card.isFaceUp:
          card.isFaceUp = True
-         rnd(1,100) # Bigger delay, in case the lag makes the card take too long to read.
+         waitFor(lambda: card.Type != '?', 10, 2, label = 'accessTarget') # Bigger delay, in case the lag makes the card take too long to read.
          cFaceD = True
          card.highlight = InactiveColor
-      storeProperties(card)
-      accessRegex = re.search(r'onAccess:([^|]+)',CardsAS.get(card.model,''))
-      if accessRegex:
-         debugNotify("#### accessRegex found! {}".format(accessRegex.group(1)), 2)
-         notify("{} has just accessed a {}!".format(me,card))
-         Autoscripts = accessRegex.group(1).split('$$')
-         X = 0
-         for autoS in Autoscripts:
-            if re.search(r'Reveal',autoS):
-               while not confirm("Ambush! You have stumbled into a {}\
-                         \n(This card activates even when inactive.)\
-                       \n\nYour blunder has already triggered the alarms. Please wait until corporate OpSec has decided whether to use its effects or not, before pressing any button\
-                       \n\nHas the corporation decided whether or not to the effects of this ambush?\
-                         \n(Pressing 'No' will send a ping to the corporation player to remind him to take action)\
-                        ".format(card.name)):
-                  rnd(1,1000)
-                  notify(":::NOTICE::: {} is still waiting for {} to decide whether to use {} or not".format(me,card.owner,card))
-            else: X = redirect(autoS, card, 'Quick', X)
-      if card.Type == 'ICE':
-         cStatTXT = '\nStrength: {}.'.format(card.Stat)
-      elif card.Type == 'Asset' or card.Type == 'Upgrade':
-         cStatTXT = '\nTrash Cost: {}.'.format(card.Stat)
-      elif card.Type == 'Agenda':
-         cStatTXT = '\nAgenda Points: {}.'.format(card.Stat)
-      else: cStatTXT = ''
-      title = "Card: {}.\
-             \nType: {}.\
-             \nKeywords: {}.\
-             \nCost: {}.\
-               {}\n\nCard Text: {}\
-           \n\nWhat do you want to do with this card?".format(fetchProperty(card, 'name'),fetchProperty(card, 'Type'),fetchProperty(card, 'Keywords'),fetchProperty(card, 'Cost'),cStatTXT,fetchProperty(card, 'Rules'))
-      if card.Type == 'Agenda' or card.Type == 'Asset' or card.Type == 'Upgrade':
-         if card.Type == 'Agenda': action1TXT = 'Liberate for {} Agenda Points.'.format(card.Stat)
-         else:
-            reduction = reduceCost(card, 'TRASH', num(card.Stat), dryRun = True)
-            if reduction > 0:
-               extraText = " ({} - {})".format(card.Stat,reduction)
-               extraText2 = " (reduced by {})".format(uniCredit(reduction))
-            elif reduction < 0:
-               extraText = " ({} + {})".format(card.Stat,abs(reduction))
-               extraText2 = " (increased by {})".format(uniCredit(abs(reduction)))
-            else:
-               extraText = ''
-               extraText2 = '' # I only set this here, even though it's used in line 1190 later, because to reach that part, it will have to pass through this if clause always.
-            action1TXT = 'Pay {}{} to Trash.'.format(num(card.Stat) - reduction,extraText)
-         options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)",action1TXT]
-      else:                    
-         options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)"]
-      choice = SingleChoice(title, options, 'button')
-      if choice == None: choice = 0
-      if choice == 1:
-         card.moveTo(targetPL.piles['Heap/Archives(Face-up)'])
-         notify("{} {} {} at no cost".format(me,uniTrash(),card))
-      elif choice == 2:
-         if card.Type == 'Agenda':
-            scrAgenda(card,silent = True)
-         else:
-            reduction = reduceCost(card, 'TRASH', num(card.Stat))
-            rc = payCost(num(card.Stat) - reduction, "not free")
-            if rc == "ABORT": pass # If the player couldn't pay to trash the card, we leave it where it is.
-            card.moveTo(targetPL.piles['Heap/Archives(Face-up)'])
-            notify("{} paid {}{} to {} {}".format(me,uniCredit(num(card.Stat) - reduction),extraText2,uniTrash(),card))
-      else: pass
+      yield (card, None)
       if cFaceD and card.group == table and not card.markers[mdict['Scored']]: card.isFaceUp = False
       card.highlight = None
 
-def RDaccessX(group = table, x = 0, y = 0): # A function which looks at the top X cards of the corp's deck and then asks the runner what to do with each one.
-   debugNotify(">>> RDaccessX(){}".format(extraASDebug())) #Debug
-   mute()
-   global gatheredCardList
-   RDtop = []
-   removedCards = 0
-   if ds == 'corp':
-      whisper("This action is only for the use of the runner. Use the 'Look at top X cards' function on your R&D's context manu to access your own deck")
-      return
-   count = askInteger("How many files are you able to access from the corporation's R&D?",1)
-   if count == None: return
-   targetPL = ofwhom('-ofOpponent')
-   debugNotify("### Found opponent. Storing the top {} as a list".format(count), 3) #Debug
-   RDtop = list(targetPL.piles['R&D/Stack'].top(count))
+def RDaccessCards(targetPL, count): # Yields the top cards of R&D, turning them face up where they are under a cover card, instead of moving them out of the pile.
+   RDpile = targetPL.piles['R&D/Stack']
+   RDtop = list(RDpile.top(count))
    if len(RDtop) == 0:
       whisper("Corp's R&D is empty. You cannot take this action")
       return
-   if debugVerbosity >= 4:
-      for card in RDtop: notify("#### Card: {}".format(card))
    notify("{} is accessing the top {} cards of {}'s R&D".format(me,count,targetPL))
-   cover = table.create("ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b",0,0,1,True) # Creating a dummy card to cover that player's archives in case they're empty
-   cover.moveTo(targetPL.piles['Heap/Archives(Face-up)']) # Moving that dummy card on top of their archives
+   cover = getCover(pile = RDpile) # Putting a dummy card on top of R&D, so that nobody sees the cards we turn face up.
+   for c in RDtop: c.isFaceUp = True
+   loopChk(RDtop[-1],'Type') # A small delay to allow OCTGN to read the properties of the cards we just turned over.
+   removedCards = 0
    for iter in range(len(RDtop)):
-      debugNotify("### Moving card {}".format(iter), 3) #Debug
       notify(" -- {} is now accessing the {} card".format(me,numOrder(iter)))
-      RDtop[iter].moveToBottom(targetPL.piles['Heap/Archives(Face-up)'])
-      debugNotify("#### Looping...", 4)
-      loopChk(RDtop[iter],'Type')
-      accessRegex = re.search(r'onAccess:([^|]+)',CardsAS.get(RDtop[iter].model,''))
-      if accessRegex:
-         debugNotify("#### accessRegex found! {}".format(accessRegex.group(1)), 2)
-         if not re.search(r'ifInstalled',accessRegex.group(1)): notify("{} has just accessed a {}!".format(me,RDtop[iter]))
-         Autoscripts = accessRegex.group(1).split('$$')
-         X = 0
-         for autoS in Autoscripts:
-            if re.search(r'Reveal',autoS):
-               if not re.search(r'ifInstalled',autoS):
-                  RDtop[iter].moveToTable(0, 0 + yaxisMove(RDtop[iter]), False)
-                  RDtop[iter].highlight = RevealedColor
-                  while not confirm("Ambush! You have stumbled into a {}\
-                            \n(This card activates even on access from R&D.)\
-                          \n\nYour blunder has already triggered the alarms. Please wait until corporate OpSec has decided whether to use its effects or not.\
-                          \n\nHas the corporation decided whether or not to the effects of this ambush?\
-                            \n(Pressing 'No' will send a ping to the corporation player to remind him to take action)\
-                           ".format(RDtop[iter].name)):
-                     rnd(1,1000)
-                     notify(":::NOTICE::: {} is still waiting for {} to decide whether to use {} or not".format(me,RDtop[iter].owner,RDtop[iter]))
-            else: X = redirect(autoS, RDtop[iter], 'Quick', X)
-      debugNotify("#### Storing...", 4)
-      storeProperties(RDtop[iter]) # Otherwise trying to trash the card will crash because of reduceCost()
-      cType = RDtop[iter].Type
-      cKeywords = RDtop[iter].Keywords
-      cStat = RDtop[iter].Stat
-      cCost = RDtop[iter].Cost
-      cName = RDtop[iter].name
-      cRules = RDtop[iter].Rules
-      debugNotify("#### Finished Storing. About to move back...", 4)
-      RDtop[iter].moveTo(targetPL.piles['R&D/Stack'],iter - removedCards)
-      debugNotify("### Stored properties. Checking type...", 3) #Debug
-      if cType == 'ICE':
-         cStatTXT = '\nStrength: {}.'.format(cStat)
-      elif cType == 'Asset' or cType == 'Upgrade':
-         cStatTXT = '\nTrash Cost: {}.'.format(cStat)
-      elif cType == 'Agenda':
-         cStatTXT = '\nAgenda Points: {}.'.format(cStat)
-      else: cStatTXT = ''
-      title = "Card: {}.\
-             \nType: {}.\
-             \nKeywords: {}.\
-             \nCost: {}.\
-               {}\n\nCard Text: {}\
-           \n\nWhat do you want to do with this card?".format(cName,cType,cKeywords,cCost,cStatTXT,cRules)
-      if cType == 'Agenda' or cType == 'Asset' or cType == 'Upgrade':
-         if cType == 'Agenda': action1TXT = 'Liberate for {} Agenda Points.'.format(cStat)
-         else:
-            reduction = reduceCost(RDtop[iter], 'TRASH', num(cStat), dryRun = True)
-            gatheredCardList = True # We set this variable to True, to tell future reducecosts in this execution, not to scan the table a second time.
-            if reduction > 0:
-               extraText = " ({} - {})".format(cStat,reduction)
-               extraText2 = " (reduced by {})".format(uniCredit(reduction))
-            elif reduction < 0:
-               extraText = " ({} + {})".format(cStat,abs(reduction))
-               extraText2 = " (increased by {})".format(uniCredit(reduction))
-            else:
-               extraText = ''
-               extraText2 = ''
-            action1TXT = 'Pay {}{} to Trash.'.format(num(cStat) - reduction,extraText)
-         options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)",action1TXT]
-      else:                    
-         options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)"]
-      choice = SingleChoice(title, options, 'button')
-      if choice == None: choice = 0
-      if choice == 1:
-         RDtop[iter].moveTo(targetPL.piles['Heap/Archives(Face-up)'])
-         loopChk(RDtop[iter],'Type')
-         notify("{} {} {} at no cost".format(me,uniTrash(),RDtop[iter]))
-         removedCards += 1
-      elif choice == 2:
-         if cType == 'Agenda':
-            RDtop[iter].moveToTable(0,0)
-            RDtop[iter].highlight = RevealedColor
-            scrAgenda(RDtop[iter],silent = True)
-            removedCards += 1
-         else:
-            reduction = reduceCost(RDtop[iter], 'TRASH', num(cStat))
-            rc = payCost(num(cStat) - reduction, "not free")
-            if rc == "ABORT": continue # If the player couldn't pay to trash the card, we leave it where it is.
-            RDtop[iter].moveTo(targetPL.piles['Heap/Archives(Face-up)'])
-            loopChk(RDtop[iter],'Type')
-            notify("{} paid {}{} to {} {}".format(me,uniCredit(num(cStat) - reduction),extraText2,uniTrash(),RDtop[iter]))
-            removedCards += 1
-      else: continue
-   cover.moveTo(shared.exile) # now putting the cover card to the exile deck that nobody looks at.
+      yield (RDtop[iter], (RDpile, iter - removedCards + 1)) # The index is one deeper, because the first card is the cover.
+      if RDtop[iter].group != RDpile: removedCards += 1
+   for c in RDtop: 
+      if c.group == RDpile: c.isFaceUp = False # We hide again the cards we left in R&D.
+   releaseCover(cover) # now putting the cover card back in our pool.
    notify("{} has finished accessing {}'s R&D".format(me,targetPL))
-   gatheredCardList = False  # We set this variable to False, so that reduceCost() calls from other functions can start scanning the table again.
-   debugNotify("<<< RDaccessX()", 3)
 
-def ARCscore(group=table, x=0,y=0):
-   mute()
-   debugNotify(">>> ARCscore(){}".format(extraASDebug())) #Debug
-   removedCards = 0
-   ARCHcards = []
-   if ds == 'corp':
-      whisper("This action is only for the use of the runner.")
-      return
-   targetPL = ofwhom('-ofOpponent')
-   debugNotify("### Found opponent.", 3) #Debug
+def HQaccessCards(targetPL, count): # Yields random cards from HQ. Each one is revealed on the table over the covered ones, and goes back to HQ unless it was trashed or liberated.
+   for revealedCard in showatrandom(count = count, targetPL = targetPL, covered = True):
+      loopChk(revealedCard)
+      revealedCard.sendToFront() # We send our currently accessed card to the front, so that the corp can see it. The rest are covered up.
+      yield (revealedCard, None)
+      revealedCard.highlight = None
+      if revealedCard.group == table and not revealedCard.markers[mdict['Scored']]: revealedCard.moveTo(targetPL.hand)
+   clearCovers() # Finally we clear any remaining cover cards.
+
+def ARCaccessCards(targetPL): # Yields the agendas in Archives, after turning the hidden archives face up.
    ARC = targetPL.piles['Heap/Archives(Face-up)']
    for card in targetPL.piles['Archives(Hidden)']: card.moveTo(ARC) # When the runner accesses the archives, all  cards of the face up archives.
    if len(ARC) == 0:
       whisper("Corp's Archives are empty. You cannot take this action")
       return
-   rnd(10,100) # A small pause
-   for card in ARC:
+   waitFor(lambda: ARC.top().Type != '?', label = 'ARCaccessCards') # A small pause until the moved cards can be read
+   for card in list(ARC):
       debugNotify("### Checking: {}.".format(card), 3) #Debug
       if card.Type == 'Agenda':
          card.moveToTable(0,0)
          card.highlight = RevealedColor
-         scrAgenda(card) # We don't want it silent, as it needs to ask the runner to score, in case of agendas like Fetal AI for which they have to pay as well.
+         yield (card, None)
          if card.highlight == RevealedColor: card.moveTo(ARC) # If the runner opted not to score the agenda, put it back into the deck.
+
+def accessTarget(group = table, x = 0, y = 0):
+   debugNotify(">>> accessTarget()") #Debug
+   mute()
+   targetPL = ofwhom('-ofOpponent')
+   accessCards(installedAccessCards(targetPL), targetPL, 'Installed')
+   debugNotify("<<< accessTarget()", 3)
+
+def RDaccessX(group = table, x = 0, y = 0): # A function which looks at the top X cards of the corp's deck and then asks the runner what to do with each one.
+   debugNotify(">>> RDaccessX(){}".format(extraASDebug())) #Debug
+   mute()
+   if ds == 'corp':
+      whisper("This action is only for the use of the runner. Use the 'Look at top X cards' function on your R&D's context manu to access your own deck")
+      return
+   count = askInteger("How many files are you able to access from the corporation's R&D?",1)
+   if count == None: return
+   targetPL = ofwhom('-ofOpponent')
+   accessCards(RDaccessCards(targetPL, count), targetPL, 'R&D')
+   debugNotify("<<< RDaccessX()", 3)
+
+def ARCscore(group=table, x=0,y=0):
+   mute()
+   debugNotify(">>> ARCscore(){}".format(extraASDebug())) #Debug
+   if ds == 'corp':
+      whisper("This action is only for the use of the runner.")
+      return
+   targetPL = ofwhom('-ofOpponent')
+   for card, home in ARCaccessCards(targetPL):
+      scrAgenda(card) # We don't want it silent, as it needs to ask the runner to score, in case of agendas like Fetal AI for which they have to pay as well.
    debugNotify("<<< ARCscore()", 3)
 
 def HQaccess(group=table, x=0,y=0, silent = False):
@@ -1384,84 +1564,7 @@ def HQaccess(group=table, x=0,y=0, silent = False):
    count = askInteger("How many files are you able to access from the corporation's HQ?",1)
    if count == None: return
    targetPL = ofwhom('-ofOpponent')
-   debugNotify("### Found opponent.", 3) #Debug
-   revealedCards = showatrandom(count = count, targetPL = targetPL, covered = True)
-   for revealedCard in revealedCards:
-      loopChk(revealedCard)
-      #storeProperties(revealedCard) # So as not to crash reduceCost() later
-      revealedCard.sendToFront() # We send our currently accessed card to the front, so that the corp can see it. The rest are covered up.
-      accessRegex = re.search(r'onAccess:([^|]+)',CardsAS.get(revealedCard.model,''))
-      if accessRegex:
-         debugNotify("#### accessRegex found! {}".format(accessRegex.group(1)), 2)
-         notify("{} has just accessed a {}!".format(me,revealedCard))
-         Autoscripts = accessRegex.group(1).split('$$')
-         X = 0
-         for autoS in Autoscripts:
-            if re.search(r'Reveal',autoS):
-               if not re.search(r'ifInstalled',autoS):
-                  revealedCard.moveToTable(0, 0 + yaxisMove(revealedCard), False)
-                  revealedCard.highlight = RevealedColor
-                  while not confirm("Ambush! You have stumbled into a {}\
-                            \n(This card activates even on access from HQ.)\
-                          \n\nYour blunder has already triggered the alarms. Please wait until corporate OpSec has decided whether to use its effects or not, before pressing any button.\
-                          \n\nHas the corporation decided whether or not to the effects of this ambush?\
-                            \n(Pressing 'No' will send a ping to the corporation player to remind him to take action)\
-                           ".format(revealedCard.name)):
-                     rnd(1,1000) # We put a hacky delay if the player presses 'No'
-                     notify(":::NOTICE::: {} is still waiting for {} to decide whether to use {} or not".format(me,revealedCard.owner,revealedCard))
-            else: X = redirect(autoS, revealedCard, 'Quick', X)
-      debugNotify("### Not a Trap.", 2) #Debug
-      if revealedCard.Type == 'ICE':
-         cStatTXT = '\nStrength: {}.'.format(revealedCard.Stat)
-      elif revealedCard.Type == 'Asset' or revealedCard.Type == 'Upgrade':
-         cStatTXT = '\nTrash Cost: {}.'.format(revealedCard.Stat)
-      elif revealedCard.Type == 'Agenda':
-         cStatTXT = '\nAgenda Points: {}.'.format(revealedCard.Stat)
-      else: cStatTXT = ''
-      debugNotify("### Crafting Title", 2) #Debug
-      title = "Card: {}.\
-             \nType: {}.\
-             \nKeywords: {}.\
-             \nCost: {}.\
-               {}\n\nCard Text: {}\
-           \n\nWhat do you want to do with this card?".format(revealedCard.Name,revealedCard.Type,revealedCard.Keywords,revealedCard.Cost,cStatTXT,revealedCard.Rules)
-      if revealedCard.Type == 'Agenda' or revealedCard.Type == 'Asset' or revealedCard.Type == 'Upgrade':
-         if revealedCard.Type == 'Agenda': action1TXT = 'Liberate for {} Agenda Points.'.format(revealedCard.Stat)
-         else:
-            reduction = reduceCost(revealedCard, 'TRASH', num(revealedCard.Stat), dryRun = True)
-            if reduction > 0:
-               extraText = " ({} - {})".format(revealedCard.Stat,reduction)
-               extraText2 = " (reduced by {})".format(uniCredit(reduction))
-            elif reduction < 0:
-               extraText = " ({} + {})".format(revealedCard.Stat,abs(reduction))
-               extraText2 = " (increased by {})".format(uniCredit(abs(reduction)))
-            else:
-               extraText = ''
-               extraText2 = ''
-            action1TXT = 'Pay {}{} to Trash.'.format(num(revealedCard.Stat) - reduction,extraText)
-         options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)",action1TXT]
-      else:                    
-         options = ["Leave where it is.","Force trash at no cost.\n(Only through card effects)"]
-      debugNotify("### Opening Choice Window", 2) #Debug
-      choice = SingleChoice(title, options, 'button')
-      if choice == None: choice = 0
-      revealedCard.highlight = None
-      if choice == 1:
-         revealedCard.moveTo(targetPL.piles['Heap/Archives(Face-up)'])
-         loopChk(revealedCard,'Type')
-         notify("{} {} {} at no cost".format(me,uniTrash(),revealedCard))
-      elif choice == 2:
-         if revealedCard.Type == 'Agenda':
-            scrAgenda(revealedCard,silent = True)
-         else:
-            reduction = reduceCost(revealedCard, 'TRASH', num(revealedCard.Stat))
-            rc = payCost(num(revealedCard.Stat) - reduction, "not free")
-            if rc == "ABORT": revealedCard.moveTo(targetPL.hand) # If the player couldn't pay to trash the card, we leave it where it is.
-            revealedCard.moveTo(targetPL.piles['Heap/Archives(Face-up)'])
-            loopChk(revealedCard,'Type')
-            notify("{} paid {}{} to {} {}".format(me,uniCredit(num(revealedCard.Stat) - reduction),extraText2,uniTrash(),revealedCard))
-      else: revealedCard.moveTo(targetPL.hand)
-   clearCovers() # Finally we clear any remaining cover cards.
+   accessCards(HQaccessCards(targetPL, count), targetPL, 'HQ')
    debugNotify("<<< HQAccess()", 3)
 
 def isRezzable (card):
@@ -1484,7 +1587,7 @@ def intRez (card, x=0, y=0, cost = 'not free', silent = False, silentCost = Fals
       return 'ABORT'
    if not checkUnique(card): return 'ABORT' #If the player has the unique card rezzed and opted not to trash it, do nothing.
    if chkTargeting(card) == 'ABORT':
-      notify("{} cancels their action".format(me))
+      announce("{} cancels their action".format(me))
       return 'ABORT'
    if cost != 'free': reduction = reduceCost(card, 'REZ', num(fetchProperty(card, 'Cost')))
    else: reduction = 0
@@ -1499,10 +1602,10 @@ def intRez (card, x=0, y=0, cost = 'not free', silent = False, silentCost = Fals
    else: rc = ''
    card.isFaceUp = True
    if not silent:
-      if card.Type == 'ICE': notify("{} has rezzed {} {}{}.".format(me, card, rc, extraText))
-      if card.Type == 'Asset': notify("{} has acquired {} {}{}.".format(me, card, rc, extraText))
-      if card.Type == 'Upgrade': notify("{} has installed {} {}{}.".format(me, card, rc, extraText))
-   random = rnd(10,100) # Bug workaround.
+      if card.Type == 'ICE': announce("{} has rezzed {} {}{}.".format(me, card, rc, extraText))
+      if card.Type == 'Asset': announce("{} has acquired {} {}{}.".format(me, card, rc, extraText))
+      if card.Type == 'Upgrade': announce("{} has installed {} {}{}.".format(me, card, rc, extraText))
+   waitFor(None, 1, label = 'intRez') # One round trip so that the other players see the card rezzed before their scripts react to it.
    executePlayScripts(card,'REZ')
    autoscriptOtherPlayers('CardRezzed',card)
 
@@ -1569,6 +1672,7 @@ def rolld6(group = table, x = 0, y = 0, silent = False):
 def selectAsTarget (card, x = 0, y = 0):
    debugNotify(">>> selectAsTarget(){}".format(extraASDebug())) #Debug
    card.target(True)
+   trackTempCard(card)
 
 def clear(card, x = 0, y = 0, silent = False):
    debugNotify(">>> clear() card: {}".format(card), ) #Debug
@@ -1581,22 +1685,44 @@ def clear(card, x = 0, y = 0, silent = False):
    card.target(False)
    debugNotify("<<< clear()", 3)
 
+def trackTempCard(card): # Remembers a card which has received temporary markers or highlights, so that clearAll() will clear it.
+   TempMarkedCards.add(card._id)
+
 def clearAll(markersOnly = False, allPlayers = False): # Just clears all the player's cards.
    debugNotify(">>> clearAll()") #Debug
-   for card in table:
-      if allPlayers: clear(card,silent = True)
-      if card.name == 'Trace': card.highlight = None # We clear the card in case a tracing is pending that was not done.
-      elif card.controller == me: clear(card,silent = True)
-      if not markersOnly:
-         hostCards = eval(getGlobalVariable('Host Cards'))
-         if card.isFaceUp and (card.Type == 'Operation' or card.Type == 'Event') and card.highlight != DummyColor and card.highlight != RevealedColor and card.highlight != InactiveColor and not card.markers[mdict['Scored']] and not hostCards.has_key(card._id): # We do not trash "scored" events (e.g. see Notoriety) or cards hosted on others card (e.g. see Oversight AI)
+   global PlayedEvents
+   clearIDs = set(TempMarkedCards)
+   if allPlayers: # When a run ends we also pick up the targets, highlights and temporary markers which were put by hand or by the opponent's scripts, as those are not tracked by us.
+      for card in queryTable():
+         if card._id in clearIDs: continue
+         if (card.targetedBy
+             or (card.highlight and card.highlight != DummyColor and card.highlight != RevealedColor and card.highlight != InactiveColor)
+             or (card.markers and (card.markers[mdict['PlusOne']] or card.markers[mdict['MinusOne']] or card.markers[mdict['BaseLink']]))): clearIDs.add(card._id)
+   for cardID in clearIDs:
+      card = cardHandle(cardID)
+      if card.group != table: TempMarkedCards.discard(cardID) # The card has left play, so there's nothing left to clear.
+      elif card.name == 'Trace': 
+         card.highlight = None # We clear the card in case a tracing is pending that was not done.
+         TempMarkedCards.discard(cardID)
+      elif allPlayers or card.controller == me: 
+         clear(card,silent = True)
+         TempMarkedCards.discard(cardID)
+   myTrace = getSpecial('Tracing',me)
+   if myTrace and myTrace.highlight: myTrace.highlight = None # The opponent might have highlighted our trace card for us to reinforce it.
+   if not markersOnly:
+      hostCards = eval(getGlobalVariable('Host Cards'))
+      for cardID in PlayedEvents:
+         card = cardHandle(cardID)
+         if card.group == table and card.isFaceUp and card.highlight != DummyColor and card.highlight != RevealedColor and card.highlight != InactiveColor and not card.markers[mdict['Scored']] and not hostCards.has_key(card._id): # We do not trash "scored" events (e.g. see Notoriety) or cards hosted on others card (e.g. see Oversight AI)
             intTrashCard(card,0,"free") # Clearing all Events and operations for players who keep forgeting to clear them.
-      if card.owner == me and card.Type == 'Identity' and Stored_Type.get(card._id,'NULL') == 'NULL':
-         delayed_whisper(":::DEBUG::: Identity was NULL. Re-storing as an attempt to fix")
-         storeProperties(card, True)
-
+      PlayedEvents = []
+      for card in queryTable(type = 'Identity'):
+         if card.owner == me and Stored_Type.get(card._id,'NULL') == 'NULL':
+            delayed_whisper(":::DEBUG::: Identity was NULL. Re-storing as an attempt to fix")
+            storeProperties(card, True)
    debugNotify("<<< clearAll()", 3)
 
+@groupAnnouncements
 def intTrashCard(card, stat, cost = "not free",  ClickCost = '', silent = False):
    debugNotify(">>> intTrashCard(){}".format(extraASDebug())) #Debug
    global trashEasterEggIDX, DummyTrashWarn
@@ -1642,12 +1768,12 @@ def intTrashCard(card, stat, cost = "not free",  ClickCost = '', silent = False)
       MUtext = chkRAM(card, 'UNINSTALL')
       if rc == "free" and not silent:
          debugNotify("About to trash card for free. Cost = {}".format(cost), 2)
-         if cost == "host removed": notify("{} {} {} because its host has been removed from play{}.".format(card.owner, uniTrash(), card, MUtext))
-         else: notify("{} {} {} at no cost{}.".format(me, uniTrash(), card, MUtext))
-      elif not silent: notify("{} {}{} {}{}{}.".format(ClickCost, uniTrash(), goodGrammar, card, extraText, MUtext))
+         if cost == "host removed": announce("{} {} {} because its host has been removed from play{}.".format(card.owner, uniTrash(), card, MUtext))
+         else: announce("{} {} {} at no cost{}.".format(me, uniTrash(), card, MUtext))
+      elif not silent: announce("{} {}{} {}{}{}.".format(ClickCost, uniTrash(), goodGrammar, card, extraText, MUtext))
       if card.Type == 'Agenda' and card.markers[mdict['Scored']]:
          me.counters['Agenda Points'].value -= num(card.Stat) # Trashing Agendas for any reason, now takes they value away as well.
-         notify("--> {} loses {} Agenda Points".format(me, card.Stat))
+         announce("--> {} loses {} Agenda Points".format(me, card.Stat))
       if card.highlight != RevealedColor:
          executePlayScripts(card,'TRASH') # We don't want to run automations on simply revealed cards.
          autoscriptOtherPlayers('CardTrashed',card)
@@ -1658,14 +1784,16 @@ def intTrashCard(card, stat, cost = "not free",  ClickCost = '', silent = False)
       clearAttachLinks(card)
       card.moveTo(cardowner.piles['Heap/Archives(Face-up)'])
       if rc == "free" and not silent:
-         if card.highlight == DummyColor: notify ("{} clears {}'s lingering effects.".format(me, card)) # In case the card is a dummy card, we change the notification slightly.
-         else: notify ("{} {} {}{} at no cost.".format(me, uniTrash(), card))
-      elif not silent: notify("{} {}{} {}{}.".format(ClickCost, uniTrash() , goodGrammar, card, extraText))
+         if card.highlight == DummyColor: announce("{} clears {}'s lingering effects.".format(me, card)) # In case the card is a dummy card, we change the notification slightly.
+         else: announce("{} {} {}{} at no cost.".format(me, uniTrash(), card))
+      elif not silent: announce("{} {}{} {}{}.".format(ClickCost, uniTrash() , goodGrammar, card, extraText))
    else: #I'm the corp and I trash my own hidden cards or the runner and trash a hidden corp card without cost (e.g. randomly picking one from their hand)
       clearAttachLinks(card)
       card.moveTo(cardowner.piles['Archives(Hidden)'])
-      if rc == "free" and not silent: notify("{} {} a hidden card at no cost.".format(me, uniTrash()))
-      elif not silent: notify("{} {}{} a hidden card.".format(ClickCost, uniTrash(), goodGrammar))
+      if rc == "free" and not silent: announce("{} {} a hidden card at no cost.".format(me, uniTrash()))
+      elif not silent: announce("{} {}{} a hidden card.".format(ClickCost, uniTrash(), goodGrammar))
+   unindexCard(card)
+   releaseSlot(card)
    debugNotify("<<< intTrashCard()", 3)
 
 def trashCard (card, x = 0, y = 0):
@@ -1777,7 +1905,7 @@ def possess(daemonCard, programCard, silent = False, force = False):
       delayed_whisper(":::ERROR::: {} has already hosted the maximum amount of programs it can hold.".format(daemonCard))
       return 'ABORT'
    elif hostCards.has_key(programCard._id):
-      delayed_whisper(":::ERROR::: {} is already hosted in {}.".format(programCard,Card(hostCards[programCard._id])))
+      delayed_whisper(":::ERROR::: {} is already hosted in {}.".format(programCard,cardHandle(hostCards[programCard._id])))
       return 'ABORT'
    else:
       debugNotify("### We have a valid daemon host", 2) #Debug
@@ -1800,6 +1928,7 @@ def useCard(card,x=0,y=0):
    debugNotify(">>> useCard(){}".format(extraASDebug())) #Debug
    if card.highlight == None:
       card.highlight = SelectColor
+      trackTempCard(card)
       notify ( "{} uses the ability of {}.".format(me,card) )
    else:
       if card.highlight == DummyColor:
@@ -1815,6 +1944,7 @@ def prioritize(card,x=0,y=0):
    global PriorityInform
    if card.highlight == None:
       card.highlight = PriorityColor
+      trackTempCard(card)
       notify ("{} prioritizes {} for using counters automatically.".format(me,card))
       if PriorityInform:
          information("This action prioritizes a card for when selecting which card will use its counters from automated effects\
@@ -1899,6 +2029,7 @@ def currentHandSize(player = me):
    else: currHandSize = player.counters['Hand Size'].value
    return currHandSize
 
+@messageCheckpoint
 def intPlay(card, cost = 'not free'):
    debugNotify(">>> intPlay(){}".format(extraASDebug())) #Debug
    extraText = '' # We set this here, because the if clause that may modify this variable will not be reached in all cases. So we need to set it to null here to avoid a python error later.
@@ -1906,7 +2037,7 @@ def intPlay(card, cost = 'not free'):
    chooseSide() # Just in case...
    whisper("+++ Processing. Please Hold...")
    storeProperties(card)
-   random = rnd(10,100)
+   waitFor(lambda: card.Type != '?', label = 'intPlay') # storeProperties() has already waited for anything it had to peek at, so this only waits if the card still can't be read.
    if not checkNotHardwareConsole(card): return	#If player already has a Console in play and doesnt want to play that card, do nothing.
    if card.Type != 'ICE' and card.Type != 'Agenda' and card.Type != 'Upgrade' and card.Type != 'Asset': # We only check for uniqueness on install, against cards that install face-up
       if not checkUnique(card): return #If the player has the unique card and opted not to trash it, do nothing.
@@ -1985,6 +2116,7 @@ def intPlay(card, cost = 'not free'):
       placeCard(card, action)
       if card.Type == 'Operation': notify("{}{} to initiate {}{}.".format(ClickCost, rc, card, extraText))
       else: notify("{}{} to play {}{}.".format(ClickCost, rc, card, extraText))
+   if action == 'PLAY': PlayedEvents.append(card._id) # We remember it so that clearAll() can clean it up at the end of the turn.
    executePlayScripts(card,action)
    autoscriptOtherPlayers('Card'+action.capitalize(),card) # we tell the autoscriptotherplayers that we installed/played a card. (e.g. See Haas-Bioroid ability)
    if debugVerbosity >= 3: notify("<<< intPlay().action: {}\nAutoscriptedothers: {}".format(action,'Card'+action.capitalize())) #Debug
@@ -2041,8 +2173,8 @@ def checkNotHardwareConsole (card):
    debugNotify(">>> checkNotHardwareConsole(){}".format(extraASDebug())) #Debug
    mute()
    if card.Type != "Hardware" or not re.search(r'Console', getKeywords(card)): return True
-   ExistingConsoles = [ c for c in table
-         if c.owner == me and c.isFaceUp and re.search(r'Console', getKeywords(c)) ]
+   ExistingConsoles = [ c for c in queryTable(type = 'Hardware', rezzed = True)
+         if c.owner == me and re.search(r'Console', getKeywords(c)) ]
    if len(ExistingConsoles) != 0 and not confirm("You already have at least one console in play. Are you sure you want to install {}?\n\n(If you do, your installed Consoles will be automatically trashed at no cost)".format(fetchProperty(card, 'name'))): return False
    else:
       for HWDeck in ExistingConsoles: trashForFree(HWDeck)
@@ -2101,6 +2233,7 @@ def handDiscard(card):
             notify("{} has now discarded down to their max handsize of {}".format(me, currentHandSize()))
       else: notify("{} discards a card.".format(me))
 
+@groupAnnouncements
 def handRandomDiscard(group, count = None, player = None, destination = None, silent = False):
    debugNotify(">>> handRandomDiscard(){}".format(extraASDebug())) #Debug
    mute()
@@ -2115,14 +2248,12 @@ def handRandomDiscard(group, count = None, player = None, destination = None, si
    if count > SSize :
       count = SSize
       whisper("You do not have enough cards in your hand to complete this action. Will discard as many as possible")
-   for iter in range(count):
-      debugNotify("#### : handRandomDiscard() iter: {}".format(iter + 1), 3) # Debug
-      card = group.random()
-      if card == None: return iter + 1 # If we have no more cards, then return how many we managed to discard.
-      card.moveTo(destination)
-      if not silent: notify("{} discards {} at random.".format(player,card))
-   debugNotify("<<< handRandomDiscard() with return {}".format(iter + 1), 2) #Debug
-   return iter + 1 #We need to increase the iter by 1 because it starts iterating from 0
+   discardedCards = sampleCards(group, count)
+   moveCards(discardedCards, destination)
+   if not silent:
+      for card in discardedCards: announce("{} discards {} at random.".format(player,card))
+   debugNotify("<<< handRandomDiscard() with return {}".format(len(discardedCards)), 2) #Debug
+   return len(discardedCards)
 
 def showatrandom(group = None, count = 1, targetPL = None, silent = False, covered = False):
    debugNotify(">>> showatrandom(){}".format(extraASDebug())) #Debug
@@ -2138,17 +2269,13 @@ def showatrandom(group = None, count = 1, targetPL = None, silent = False, cover
    elif count > len(group):
       whisper(":::WARNING::: {} has only {} cards in their hand.".format(targetPL,len(group)))
       count = len(group)
-   for iter in range(count):
-      card = group.random()
-      if card.controller != me: # If we're revealing a card from another player's hand, we grab its properties before we put it on the table, as as not to give away if we're scanning it right now or not.
-         card.isFaceUp = True
-         storeProperties(card, forced = False)
-      if card == None:
-         notify(":::Info:::{} has no more cards in their hand to reveal".format(targetPL))
-         break
+   revealedCards = sampleCards(group, count)
+   if targetPL != me: # If we're revealing cards from another player's hand, we grab their properties before we put them on the table, as as not to give away if we're scanning them right now or not.
+      for card in revealedCards: card.isFaceUp = True
+      storePileProperties(revealedCards)
+   for iter, card in enumerate(revealedCards):
       if covered:
-         cover = table.create("ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b",playerside * side * iter * cwidth(card) - (count * cwidth(card) / 2), 0 - yaxisMove(card) * side,1,False)
-         cover.moveToTable(playerside * side * iter * cwidth(card) - (count * cwidth(card) / 2), 0 - yaxisMove(card) * side,False)
+         getCover(playerside * side * iter * cwidth(card) - (count * cwidth(card) / 2), 0 - yaxisMove(card) * side)
       card.moveToTable(playerside * side * iter * cwidth(card) - (count * cwidth(card) / 2), 0 - yaxisMove(card) * side, False)
       card.highlight = RevealedColor
       card.sendToBack()
@@ -2162,8 +2289,7 @@ def groupToDeck (group = me.hand, player = me, silent = False):
    debugNotify(">>> groupToDeck(){}".format(extraASDebug())) #Debug
    mute()
    deck = player.piles['R&D/Stack']
-   count = len(group)
-   for c in group: c.moveTo(deck)
+   count = moveCards(group, deck)
    if not silent: notify ("{} moves their whole {} to their {}.".format(player,pileName(group),pileName(deck)))
    if debugVerbosity >= 3: notify("<<< groupToDeck() with return:\n{}\n{}\n{}".format(pileName(group),pileName(deck),count)) #Debug
    else: return(pileName(group),pileName(deck),count) # Return a tuple with the names of the groups.
@@ -2176,7 +2302,7 @@ def mulligan(group):
    resetAll()
    for i in range(2):
       shuffle(me.piles['R&D/Stack']) # We do a good shuffle this time.
-      rnd(1,10)
+      waitFor(None, 1, label = 'mulligan') # We let each shuffle go through before the next.
       whisper("Shuffling...")
    drawMany(me.piles['R&D/Stack'], 5)
    executePlayScripts(Identity,'MULLIGAN')
@@ -2185,6 +2311,18 @@ def mulligan(group):
 #------------------------------------------------------------------------------
 # Pile Actions
 #------------------------------------------------------------------------------
+def moveCards(cards, destination, toBottom = False): # Moves a batch of cards to another group and returns how many were moved.
+# OCTGN has no call to move many cards at once, so we make exactly one move per card and nothing else. 
+# We work on a snapshot of the cards, so that emptying a group while we go through it doesn't make us skip any.
+   debugNotify(">>> moveCards(){}".format(extraASDebug())) #Debug
+   cards = list(cards)
+   if toBottom:
+      for c in cards: c.moveToBottom(destination)
+   else:
+      for c in cards: c.moveTo(destination)
+   debugNotify("<<< moveCards() with return: {}".format(len(cards)), 3)
+   return len(cards)
+
 def shuffle(group):
    debugNotify(">>> shuffle(){}".format(extraASDebug())) #Debug
    group.shuffle()
@@ -2195,7 +2333,7 @@ def draw(group):
    mute()
    if len(group) == 0:
       if ds == 'corp':
-         notify(":::ATTENTION::: {} cannot draw another card. {} loses the game!".format(me,me))
+         announce(":::ATTENTION::: {} cannot draw another card. {} loses the game!".format(me,me))
          reportGame('DeckDefeat')
       else:
          whisper(":::ERROR::: No more cards in your stack")
@@ -2203,15 +2341,16 @@ def draw(group):
    card = group.top()
    if ds == 'corp' and newturn:
       card.moveTo(me.hand)
-      notify("--> {} performs the turn's mandatory draw.".format(me))
+      announce("--> {} performs the turn's mandatory draw.".format(me))
       newturn = False
    else:
       ClickCost = useClick()
       if ClickCost == 'ABORT': return
       card.moveTo(me.hand)
-      notify("{} to draw a card.".format(ClickCost))
+      announce("{} to draw a card.".format(ClickCost))
    storeProperties(card)
 
+@groupAnnouncements
 def drawMany(group, count = None, destination = None, silent = False):
    debugNotify(">>> drawMany(){}".format(extraASDebug())) #Debug
    debugNotify("source: {}".format(group.name), 2)
@@ -2225,17 +2364,18 @@ def drawMany(group, count = None, destination = None, silent = False):
    if count > SSize :
       count = SSize
       whisper("You do not have enough cards in your deck to complete this action. Will draw as many as possible")
-   for c in group.top(count):
-      c.moveTo(destination)
-      if debugVerbosity >= 1:
+   drawnCards = group.top(count)
+   moveCards(drawnCards, destination)
+   storePileProperties(drawnCards)
+   if debugVerbosity >= 1:
+      for c in drawnCards:
          if Stored_Type.get(c._id,None): notify("++++ Stored Type: {}".format(fetchProperty(c, 'Type')))
          else: notify("++++ No Stored Type Found for {}".format(c))
          if Stored_Keywords.get(c._id,None): notify("++++ Stored Keywords: {}".format(fetchProperty(c, 'Keywords')))
          else: notify("++++ No Stored Keywords Found for {}".format(c))
          if Stored_Cost.get(c._id,None): notify("++++ Stored Cost: {}".format(fetchProperty(c, 'Cost')))
          else: notify("++++ No Stored Cost Found for {}".format(c))
-      storeProperties(c)
-   if not silent: notify("{} draws {} cards.".format(me, count))
+   if not silent: announce("{} draws {} cards.".format(me, count))
    debugNotify("<<< drawMany() with return: {}".format(count), 3)
    return count
 
@@ -2243,7 +2383,7 @@ def toarchives(group = me.piles['Archives(Hidden)']):
    debugNotify(">>> toarchives(){}".format(extraASDebug())) #Debug
    mute()
    Archives = me.piles['Heap/Archives(Face-up)']
-   for c in group: c.moveTo(Archives)
+   moveCards(group, Archives)
    #Archives.shuffle()
    notify ("{} moves Hidden Archives to their Face-Up Archives.".format(me))
 
@@ -2251,7 +2391,7 @@ def archivestoStack(group, silent = False):
    debugNotify(">>> archivestoStack(){}".format(extraASDebug())) #Debug
    mute()
    deck = me.piles['R&D/Stack']
-   for c in group: c.moveTo(deck)
+   moveCards(group, deck)
    #Archives.shuffle()
    if not silent: notify ("{} moves their {} to {}.".format(me,pileName(group),pileName(deck)))
    else: return(pileName(group),pileName(deck))
@@ -2264,7 +2404,7 @@ def mill(group):
    if count == None: return
    if ds == "runner": destination = me.piles['Heap/Archives(Face-up)']
    else: destination = me.piles['Archives(Hidden)']
-   for c in group.top(count): c.moveTo(destination)
+   count = moveCards(group.top(count), destination)
    notify("{} mills the top {} cards from their {} to {}.".format(me, count,pileName(group),pileName(destination)))
 
 def moveXtopCardtoBottomStack(group):
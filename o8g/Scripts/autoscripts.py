@@ -30,12 +30,17 @@ import re
 secretCred = None # Used to allow the player to spend credits in secret for some card abilities (e.g. Snowflake)
 failedRequirement = True # A Global boolean that we set in case an Autoscript cost cannot be paid, so that we know to abort the rest of the script.
 reversePlayerChk = False
+CompiledPer = {} # A dictionary holding the parsed per<Something> modulators of each script, so that per() doesn't need to use any regex after the first time.
+CompiledIfHave = {} # As above, for the ifHave clauses
+CompiledPlayerChk = {} # As above, for the byOpponent/byMe checks of chkPlayer(). Keyed by (script, targetChk)
+CompiledTargeting = {} # As above, for the targeting restrictions used by findTarget()
 
 
 #------------------------------------------------------------------------------
 # Play/Score/Rez/Trash trigger
 #------------------------------------------------------------------------------
 
+@groupAnnouncements
 def executePlayScripts(card, action):
    action = action.upper() # Just in case we passed the wrong case
    debugNotify(">>> executePlayScripts() with action: {}".format(action)) #Debug
@@ -69,7 +74,7 @@ def executePlayScripts(card, action):
       elif re.search(r'excludeDummy', autoS) and card.highlight == DummyColor: Autoscripts.remove(autoS)
       elif re.search(r'onlyforDummy', autoS) and card.highlight != DummyColor: Autoscripts.remove(autoS)
       elif re.search(r'CustomScript', autoS):
-         CustomScript(card,action)
+         if (card.model, action) in CustomScripts: CustomScript(card,action) # We only call the custom script if the card has one registered for this action.
          Autoscripts.remove(autoS)
    if len(Autoscripts) == 0: return
    if debugVerbosity >= 2: notify ('### Looking for multiple choice options') # Debug
@@ -117,9 +122,9 @@ def executePlayScripts(card, action):
           (effectType.group(1) == 'onDerez' and action != 'DEREZ')): continue
       if re.search(r'-isOptional', AutoS):
          if not confirm("This card has an optional ability you can activate at this point. Do you want to do so?"):
-            notify("{} opts not to activate {}'s optional ability".format(me,card))
+            announce("{} opts not to activate {}'s optional ability".format(me,card))
             return 'ABORT'
-         else: notify("{} activates {}'s optional ability".format(me,card))
+         else: announce("{} activates {}'s optional ability".format(me,card))
       selectedAutoscripts = AutoS.split('$$')
       if debugVerbosity >= 2: notify ('### selectedAutoscripts: {}'.format(selectedAutoscripts)) # Debug
       for activeAutoscript in selectedAutoscripts:
@@ -199,6 +204,7 @@ def executePlayScripts(card, action):
 # Card Use trigger
 #------------------------------------------------------------------------------
 
+@messageCheckpoint
 def useAbility(card, x = 0, y = 0): # The start of autoscript activation.
    debugNotify(">>> useAbility(){}".format(extraASDebug())) #Debug
    mute()
@@ -242,7 +248,7 @@ def useAbility(card, x = 0, y = 0): # The start of autoscript activation.
       useCard(card) # If card is face up but has no autoscripts, or automation is disabled just notify that we're using it.
       return
    debugNotify("+++ Automations active. Checking for CustomScript...", 5)
-   if re.search(r'CustomScript', fetchProperty(card, 'AutoActions')):
+   if (card.model, 'USE') in CustomScripts: # Cards with a registered custom use script skip the generic framework entirely.
       if chkTargeting(card) == 'ABORT': return
       CustomScript(card,'USE') # Some cards just have a fairly unique effect and there's no use in trying to make them work in the generic framework.
       return
@@ -270,63 +276,7 @@ def useAbility(card, x = 0, y = 0): # The start of autoscript activation.
       cardInstructions = card.Instructions.split('||')
       if len(cardInstructions) > 1: choices = cardInstructions
       else:
-         choices = []
-         for idx in range(len(Autoscripts)): # If a card has multiple abilities, we go through each of them to create a nicely written option for the player.
-            debugNotify("Autoscripts {}".format(Autoscripts), 2) # Debug
-            abilRegex = re.search(r"A([0-9]+)B([0-9]+)G([0-9]+)T([0-9]+):([A-Z][A-Za-z ]+)([0-9]*)([A-Za-z ]*)-?(.*)", Autoscripts[idx]) # This regexp returns 3-4 groups, which we then reformat and put in the confirm dialogue in a better readable format.
-            debugNotify("### Choice Regex is {}".format(abilRegex.groups()), 2) # Debug
-            if abilRegex.group(1) != '0': abilCost = 'Use {} Clicks'.format(abilRegex.group(1))
-            else: abilCost = ''
-            if abilRegex.group(2) != '0':
-               if abilCost != '':
-                  if abilRegex.group(3) != '0' or abilRegex.group(4) != '0': abilCost += ', '
-                  else: abilCost += ' and '
-               abilCost += 'Pay {} Credits'.format(abilRegex.group(2))
-            if abilRegex.group(3) != '0':
-               if abilCost != '':
-                  if abilRegex.group(4) != '0': abilCost += ', '
-                  else: abilCost += ' and '
-               abilCost += 'Lose {} Agenda Points'.format(abilRegex.group(3))
-            if abilRegex.group(4) != '0':
-               if abilCost != '': abilCost += ' and '
-               if abilRegex.group(4) == '1': abilCost += 'Trash this card'
-               else: abilCost += 'Use (Once per turn)'
-            if abilRegex.group(1) == '0' and abilRegex.group(2) == '0' and abilRegex.group(3) == '0' and abilRegex.group(4) == '0':
-               if not re.search(r'-isCost', Autoscripts[idx]):
-                  abilCost = 'Activate'
-                  connectTXT = ' to '
-               else:
-                  abilCost = '' # If the ability claims to be a cost, then we need to put it as part of it, before the "to"
-                  connectTXT = ''
-            else:
-               if not re.search(r'-isCost', Autoscripts[idx]): connectTXT = ' to ' # If there isn't an extra cost, then we connect with a "to" clause
-               else: connectTXT = 'and '
-            if abilRegex.group(6):
-               if abilRegex.group(6) == '999': abilX = 'all'
-               else: abilX = abilRegex.group(6)
-            else: abilX = abilRegex.group(6)
-            if re.search(r'-isSubroutine', Autoscripts[idx]):
-               if abilCost == 'Activate':  # IF there's no extra costs to the subroutine, we just use the "enter" glyph
-                  abilCost = uniSubroutine()
-                  connectTXT = ''
-               else: abilCost = '{} '.format(uniSubroutine()) + abilCost # If there's extra costs to the subroutine, we prepend the "enter" glyph to the rest of the costs.
-            #abilConcat += '{}: {}{}{} {} {}'.format(idx, abilCost, connectTXT, abilRegex.group(5), abilX, abilRegex.group(7)) # We add the first three groups to the concat. Those groups are always Gain/Hoard/Prod ## Favo/Solaris/Spice
-            choices.insert(idx,'{}{}{} {} {}'.format(abilCost, connectTXT, abilRegex.group(5), abilX, abilRegex.group(7)))
-            if abilRegex.group(5) == 'Put' or abilRegex.group(5) == 'Remove' or abilRegex.group(5) == 'Refill': choices[idx] += ' counter' # If it's putting a counter, we clarify that.
-            debugNotify("### About to check rest of choice regex", 3)
-            if abilRegex.group(8): # If the autoscript has an 8th group, then it means it has subconditions. Such as "per Marker" or "is Subroutine"
-               subconditions = abilRegex.group(8).split('$$') # These subconditions are always separated by dashes "-", so we use them to split the string
-               for idx2 in range(len(subconditions)):
-                  debugNotify("#### Checking subcondition {}:{}".format(idx2,subconditions[idx2]), 4)
-                  if re.search(r'isCost', Autoscripts[idx]) and idx2 == 1: choices[idx] += ' to' # The extra costs of an action are always at the first part (i.e. before the $$)
-                  elif idx2 > 0: choices[idx] += ' and'
-                  subadditions = subconditions[idx2].split('-')
-                  for idx3 in range(len(subadditions)):
-                     debugNotify("#### Checking subaddition {}-{}:{}".format(idx2,idx3,subadditions[idx3]), 4)
-                     if re.search(r'warn[A-Z][A-Za-z0-9 ]+', subadditions[idx3]): continue # Don't mention warnings.
-                     if subadditions[idx3] in IgnoredModulators: continue # We ignore modulators which are internal to the engine.
-                     choices[idx] += ' {}'.format(subadditions[idx3]) #  Then we iterate through each distinct subcondition and display it without the dashes between them. (In the future I may also add whitespaces between the distinct words)
-            #abilConcat += '\n' # Finally add a newline at the concatenated string for the next ability to be listed.
+         choices = [abilityLabel(autoS) for autoS in Autoscripts] # The labels are normally already built when the card scripts are fetched, so we just look them up.
       abilChoice = multiChoice(ChoiceTXT, choices,card) # We use the ability concatenation we crafted before to give the player a choice of the abilities on the card.
       if abilChoice == [] or abilChoice == 'ABORT' or abilChoice == None: return # If the player closed the window, or pressed Cancel, abort.
       #choiceStr = str(abilChoice) # We convert our number into a string
@@ -553,6 +503,7 @@ def autoscriptOtherPlayers(lookup, origin_card = Identity, count = 1): # Functio
 # Start/End of Turn/Run trigger
 #------------------------------------------------------------------------------
 
+@groupAnnouncements
 def atTimedEffects(Time = 'Start'): # Function which triggers card effects at the start or end of the turn.
    mute()
    debugNotify(">>> atTimedEffects() at time: {}".format(Time)) #Debug
@@ -612,7 +563,7 @@ def atTimedEffects(Time = 'Start'): # Function which triggers card effects at th
          if re.search(r'isAlternativeRunResult', effect.group(2)): AlternativeRunResultUsed = True # If the card has an alternative result to the normal access for a run, mark that we've used it.
          if re.search(r'onlyOnce',autoS) and oncePerTurn(card, silent = True, act = 'automatic') == 'ABORT': continue
          targetC = findTarget(effect.group(2))
-         if re.search(r'Targeted', effect.group(2)) and findTarget(effect.group(2)) == []: continue # If our script requires a target and we can't find any, do nothing.
+         if re.search(r'Targeted', effect.group(2)) and targetC == []: continue # If our script requires a target and we can't find any, do nothing.
          splitAutoscripts = effect.group(2).split('$$')
          for passedScript in splitAutoscripts:
             if not TitleDone:
@@ -620,7 +571,7 @@ def atTimedEffects(Time = 'Start'): # Function which triggers card effects at th
                elif Time == 'JackOut': title = "{}'s Jack-Out Effects".format(me)
                elif Time == 'SuccessfulRun': title = "{}'s Successful Run Effects".format(me)
                else: title = "{}'s {}-of-Turn Effects".format(me,effect.group(1))
-               notify("{:=^36}".format(title))
+               announce("{:=^36}".format(title))
             TitleDone = True
             debugNotify("### passedScript: {}".format(passedScript), 2)
             if card.highlight == DummyColor: announceText = "{}'s lingering effects:".format(card)
@@ -660,10 +611,10 @@ def atTimedEffects(Time = 'Start'): # Function which triggers card effects at th
             if failedRequirement: break # If one of the Autoscripts was a cost that couldn't be paid, stop everything else.
    markerEffects(Time)
    if me.counters['Credits'].value < 0:
-      if Time == 'Run': notify(":::Warning::: {}'s Start-of-run effects cost more Credits than {} had in their Credit Pool!".format(me,me))
-      elif Time == 'JackOut': notify(":::Warning::: {}'s Jacking-Out effects cost more Credits than {} had in their Credit Pool!".format(me,me))
-      elif Time == 'SuccessfulRun': notify(":::Warning::: {}'s Successful Run effects cost more Credits than {} had in their Credit Pool!".format(me,me))
-      else: notify(":::Warning::: {}'s {}-of-turn effects cost more Credits than {} had in their Credit Pool!".format(me,Time,me))
+      if Time == 'Run': announce(":::Warning::: {}'s Start-of-run effects cost more Credits than {} had in their Credit Pool!".format(me,me))
+      elif Time == 'JackOut': announce(":::Warning::: {}'s Jacking-Out effects cost more Credits than {} had in their Credit Pool!".format(me,me))
+      elif Time == 'SuccessfulRun': announce(":::Warning::: {}'s Successful Run effects cost more Credits than {} had in their Credit Pool!".format(me,me))
+      else: announce(":::Warning::: {}'s {}-of-turn effects cost more Credits than {} had in their Credit Pool!".format(me,Time,me))
    if ds == 'corp' and Time =='Start': draw(me.piles['R&D/Stack'])
    if Time == 'SuccessfulRun' and not AlternativeRunResultUsed: # If we have a successful Run and no alternative effect was used, we ask the user if they want to automatically use one of the standard ones.
       if getGlobalVariable('feintTarget') != 'None': currentRunTarget = getGlobalVariable('feintTarget')
@@ -688,7 +639,7 @@ def atTimedEffects(Time = 'Start'): # Function which triggers card effects at th
                                                 \n\n============================\
                                                   \nRetrieve Archives? Y/n:"):
          ARCscore()
-   if TitleDone: notify(":::{:=^30}:::".format('='))
+   if TitleDone: announce(":::{:=^30}:::".format('='))
    debugNotify("<<< atTimedEffects()", 3) # Debug
 
 def markerEffects(Time = 'Start'):
@@ -732,7 +683,7 @@ def markerEffects(Time = 'Start'):
 #      if marker == mdict['virusButcherBoy'] and Time == 'Start':
 #         GainX('Gain1Credits-onOpponent-perMarker{virusButcherBoy}-div2', "Opponent's Butcher Boy virus:", OpponentCounterHold, notification = 'Automatic')
    ### Checking triggers from markers the rest of our cards.
-   cardList = [c for c in table if c.markers]
+   cardList = queryTable(marked = True)
    for card in cardList:
       for marker in card.markers:
          if re.search(r'Tinkering',marker[0]) and Time == 'End':
@@ -740,14 +691,14 @@ def markerEffects(Time = 'Start'):
             TokensX('Remove1Keyword:Sentry-isSilent', "Tinkering:", card)
             TokensX('Remove1Keyword:Barrier-isSilent', "Tinkering:", card)
             TokensX('Remove1Tinkering', "Tinkering:", card)
-            notify("--> {} removes tinkering effect from {}".format(me,card))
+            announce("--> {} removes tinkering effect from {}".format(me,card))
          if re.search(r'Cortez Chip',marker[0]) and Time == 'End':
             TokensX('Remove1Cortez Chip-isSilent', "Cortez Chip:", card)
-            notify("--> {} removes Cortez Chip effect from {}".format(me,card))
+            announce("--> {} removes Cortez Chip effect from {}".format(me,card))
          if re.search(r'Joshua Enhancement',marker[0]) and Time == 'End': # We put Joshua's effect here, in case the runner trashes the card with Aesop's after using it
             TokensX('Remove1Joshua Enhancement-isSilent', "Joshua Enhancement:", card)
             GainX('Gain1Tags', "Joshua's Enhancements:".format(me), card)
-            notify("--> Joshua's Enhancements give {} a tag".format(identName))
+            announce("--> Joshua's Enhancements give {} a tag".format(identName))
 
 def markerScripts(card, action = 'USE'):
    debugNotify(">>> markerScripts() with action: {}".format(action)) #Debug
@@ -767,11 +718,12 @@ def markerScripts(card, action = 'USE'):
             except: extraTXT = ' on {}'.format(host) # If the card requires a valid host and we found one, we will mention it later.
          else: extraTXT = ''
          hostCards = eval(getGlobalVariable('Host Cards'))
-         hostCard = Card(hostCards[card._id])
-         reduction = reduceCost(hostCard, 'USE', count, dryRun = True)
+         hostCard = cardHandle(hostCards[card._id])
+         costPlan = planCost(hostCard, 'USE', count)
+         reduction = costPlan['reduction']
          rc = payCost(count - reduction, "not free")
          if rc == 'ABORT': return foundSpecial # If the cost couldn't be paid, we don't proceed.
-         reduceCost(hostCard, 'USE', count) # If the cost could be paid, we finally take the credits out from cost reducing cards.
+         commitCostPlan(costPlan) # If the cost could be paid, we finally take the credits out from cost reducing cards.
          card.markers[mdict['Power']] -= count
          if reduction: reduceTXT = ' (reduced by {})'.format(reduction)
          else: reduceTXT = ''
@@ -795,14 +747,12 @@ def markerScripts(card, action = 'USE'):
 # Post-Trace Trigger
 #------------------------------------------------------------------------------
 
-def executeTraceEffects(card,Autoscript):
-   debugNotify(">>> executeTraceEffects(){}".format(extraASDebug(Autoscript))) #Debug
+def executeTraceEffects(card,traceEffects): # traceEffects are the script chains precompiled by compileTraceEffects()
+   debugNotify(">>> executeTraceEffects(){}".format(extraASDebug())) #Debug
    global failedRequirement
    failedRequirement = False
    X = 0
-   Autoscripts = Autoscript.split('||')
-   for autoS in Autoscripts:
-      selectedAutoscripts = autoS.split('++')
+   for selectedAutoscripts in traceEffects:
       if debugVerbosity >= 2: notify ('### selectedAutoscripts: {}'.format(selectedAutoscripts)) # Debug
       for passedScript in selectedAutoscripts: X = redirect(passedScript, card, "{}'s trace succeeds to".format(card), 'Quick', X)
       if failedRequirement: break # If one of the Autoscripts was a cost that couldn't be paid, stop everything else.
@@ -862,6 +812,7 @@ def redirect(Autoscript, card, announceText = None, notificationType = 'Quick',
 # Core Commands
 #------------------------------------------------------------------------------
 
+@groupAnnouncements
 def GainX(Autoscript, announceText, card, targetCards = None, notification = None, n = 0, actionType = 'USE'): # Core Command for modifying counters or global variables
    debugNotify(">>> GainX(){}".format(extraASDebug(Autoscript))) #Debug
    debugNotify("### notification = {}".format(notification), 3)
@@ -912,7 +863,7 @@ def GainX(Autoscript, announceText, card, targetCards = None, notification = Non
          if reduction > 0: extraText = ' (Reduced by {})'.format(uniCredit(reduction))
          elif reduction < 0: extraText = " (increased by {})".format(uniCredit(abs(reduction)))
       if targetPL.counters['Credits'].value < 0:
-         if re.search(r'isCost', Autoscript): notify(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
+         if re.search(r'isCost', Autoscript): announce(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
          elif re.search(r'isPenalty', Autoscript): pass #If an action is marked as penalty, it means that the value can go negative and the player will have to recover that amount.
          else: targetPL.counters['Credits'].value = 0
    elif re.match(r'Agenda Points', action.group(3)):
@@ -920,10 +871,10 @@ def GainX(Autoscript, announceText, card, targetCards = None, notification = Non
       if gain == -999: targetPL.counters['Agenda Points'].value = 0
       else: targetPL.counters['Agenda Points'].value += (gain * multiplier) - gainReduce
       if me.counters['Agenda Points'].value >= 7:
-         notify("{} wins the game!".format(me))
+         announce("{} wins the game!".format(me))
          reportGame()
       if targetPL.counters['Agenda Points'].value < 0:
-         if re.search(r'isCost', Autoscript): notify(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
+         if re.search(r'isCost', Autoscript): announce(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
          elif re.search(r'isPenalty', Autoscript): pass #If an action is marked as penalty, it means that the value can go negative and the player will have to recover that amount.
          else: targetPL.counters['Agenda Points'].value = 0
    elif re.match(r'Clicks', action.group(3)):
@@ -940,14 +891,14 @@ def GainX(Autoscript, announceText, card, targetCards = None, notification = Non
       if action.group(1) == 'SetTo': targetPL.MU = 0 # If we're setting to a specific value, we wipe what it's currently.
       else: targetPL.MU += (gain * multiplier) - gainReduce
       if targetPL.MU < 0:
-         if re.search(r'isCost', Autoscript): notify(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
+         if re.search(r'isCost', Autoscript): announce(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
          elif re.search(r'isPenalty', Autoscript): pass #If an action is marked as penalty, it means that the value can go negative and the player will have to recover that amount.
          else: targetPL.MU = 0
    elif re.match(r'Base Link', action.group(3)):
       if action.group(1) == 'SetTo': targetPL.counters['Base Link'].value = 0 # If we're setting to a specific value, we wipe what it's currently.
       else: targetPL.counters['Base Link'].value += (gain * multiplier) - gainReduce
       if targetPL.counters['Base Link'].value < 0:
-         if re.search(r'isCost', Autoscript): notify(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
+         if re.search(r'isCost', Autoscript): announce(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
          elif re.search(r'isPenalty', Autoscript): pass #If an action is marked as penalty, it means that the value can go negative and the player will have to recover that amount.
          else: targetPL.counters['Base Link'].value = 0
       chkCloud() # After we modify player link, we check for enabled cloud connections.
@@ -956,7 +907,7 @@ def GainX(Autoscript, announceText, card, targetCards = None, notification = Non
       if gain == -999: targetPL.counters['Bad Publicity'].value = 0
       else: targetPL.counters['Bad Publicity'].value += (gain * multiplier) - gainReduce
       if targetPL.counters['Bad Publicity'].value < 0:
-         if re.search(r'isCost', Autoscript): notify(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
+         if re.search(r'isCost', Autoscript): announce(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
          elif re.search(r'isPenalty', Autoscript): pass #If an action is marked as penalty, it means that the value can go negative and the player will have to recover that amount.
          else: targetPL.counters['Bad Publicity'].value = 0
    elif re.match(r'Tags', action.group(3)):
@@ -964,7 +915,7 @@ def GainX(Autoscript, announceText, card, targetCards = None, notification = Non
       if gain == -999: targetPL.Tags = 0
       else: targetPL.Tags += (gain * multiplier) - gainReduce
       if targetPL.Tags < 0:
-         if re.search(r'isCost', Autoscript): notify(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
+         if re.search(r'isCost', Autoscript): announce(":::Warning:::{} did not have enough {} to pay the cost of this action".format(targetPL,action.group(3)))
          elif re.search(r'isPenalty', Autoscript): pass #If an action is marked as penalty, it means that the value can go negative and the player will have to recover that amount.
          else: targetPL.Tags = 0
       chkTags() # At the end we check and put the tag markers on the identity as well, if it's tagged.
@@ -972,12 +923,12 @@ def GainX(Autoscript, announceText, card, targetCards = None, notification = Non
       if targetPL == me:
          if action.group(1) == 'SetTo': maxClicks = 0 # If we're setting to a specific value, we wipe what it's currently.
          maxClicks += gain * multiplier
-      else: notify("--> {} loses {} clicks maximum. They must make this modification manually".format(targetPL,gain * multiplier))
+      else: announce("--> {} loses {} clicks maximum. They must make this modification manually".format(targetPL,gain * multiplier))
    elif re.match(r'Hand Size', action.group(3)):
       if action.group(1) == 'SetTo': targetPL.counters['Hand Size'].value = 0 # If we're setting to a specific value, we wipe what it's currently.
       targetPL.counters['Hand Size'].value += gain * multiplier
       if targetPL.counters['Hand Size'].value < 0:
-         if re.search(r'isCost', Autoscript): notify(":::Warning:::{} did not have enough {} to pay the cost of this action".format(action.group(3)))
+         if re.search(r'isCost', Autoscript): announce(":::Warning:::{} did not have enough {} to pay the cost of this action".format(action.group(3)))
          else: targetPL.counters['Hand Size'].value = 0
    else:
       whisper("Gain what?! (Bad autoscript)")
@@ -999,7 +950,7 @@ def GainX(Autoscript, announceText, card, targetCards = None, notification = Non
    if notification == 'Quick': announceString = "{}{} {} {}{}".format(announceText, otherTXT, verb, closureTXT,extraText)
    else: announceString = "{}{} {} {}{}".format(announceText, otherTXT, verb, closureTXT,extraText)
    debugNotify("notification = {}".format(notification), 4)
-   if notification and multiplier > 0: notify('--> {}.'.format(announceString))
+   if notification and multiplier > 0: announce('--> {}.'.format(announceString))
    debugNotify("<<< Gain() total: {}".format(total), 3)
    return (announceString,total)
 
@@ -1053,10 +1004,11 @@ def TransferX(Autoscript, announceText, card, targetCards = None, notification =
    if notification == 'Quick': announceString = "{} takes {}{}".format(announceText, closureTXT, reduceTXT)
    elif notification == 'Automatic': announceString = "{} Transfer {} to {}{}".format(announceText, closureTXT, me, reduceTXT)
    else: announceString = "{} take {} from {}{}".format(announceText, closureTXT, targetCardlist,reduceTXT)
-   if notification: notify('--> {}.'.format(announceString))
+   if notification: announce('--> {}.'.format(announceString))
    debugNotify("<<< TransferX()", 3)
    return announceString
 
+@groupAnnouncements
 def TokensX(Autoscript, announceText, card, targetCards = None, notification = None, n = 0): # Core Command for adding tokens to cards
    debugNotify(">>> TokensX(){}".format(extraASDebug(Autoscript))) #Debug
    if targetCards is None: targetCards = []
@@ -1134,7 +1086,10 @@ def TokensX(Autoscript, announceText, card, targetCards = None, notification = N
       targetCard.markers[token] += modtokens # Finally we apply the marker modification
    if abs(num(action.group(2))) == abs(999): total = 'all'
    else: total = abs(modtokens)
-   if re.search(r'isPriority', Autoscript): card.highlight = PriorityColor
+   if token == mdict['PlusOne'] or token == mdict['MinusOne'] or token == mdict['BaseLink']: trackTempCard(targetCard)
+   if re.search(r'isPriority', Autoscript): 
+      card.highlight = PriorityColor
+      trackTempCard(card)
    if action.group(1) == 'Refill':
       if token[0] == 'Credit':
          announceString = "{} {} to {}".format(announceText, action.group(1), uniRecurring(count)) # We need a special announcement for refill, since it always needs to point out the max.
@@ -1145,7 +1100,7 @@ def TokensX(Autoscript, announceText, card, targetCards = None, notification = N
       if not victim or victim == me: announceString = '{} forfeit their next {} {}'.format(announceText,total,counter.group(1)) # If we're putting on forfeit counters, we don't announce it as an infection.
       else: announceString = '{} force {} to forfeit their next {} {}'.format(announceText, victim, total,counter.group(1))
    else: announceString = "{} {}{} {} {} counters{}{}".format(announceText, action.group(1).lower(),infectTXT, total, token[0],targetCardlist,preventTXT)
-   if notification and modtokens != 0 and not re.search(r'isSilent', Autoscript): notify('--> {}.'.format(announceString))
+   if notification and modtokens != 0 and not re.search(r'isSilent', Autoscript): announce('--> {}.'.format(announceString))
    debugNotify("### TokensX() String: {}".format(announceString), 2) #Debug
    debugNotify("<<< TokensX()", 3)
    if re.search(r'isSilent', Autoscript): return announceText # If it's a silent marker, we don't want to announce anything. Returning the original announceText will be processed by any receiving function as having done nothing.
@@ -1190,7 +1145,7 @@ def DrawX(Autoscript, announceText, card, targetCards = None, notification = Non
    if notification == 'Quick': announceString = "{} draws {} cards".format(announceText, count)
    elif targetPL == me: announceString = "{} {} {} cards from their {}{}".format(announceText, destiVerb, count, pileName(source), destPath)
    else: announceString = "{} {} {} cards from {}'s {}".format(announceText, destiVerb, count, targetPL, pileName(source), destPath)
-   if notification and multiplier > 0: notify('--> {}.'.format(announceString))
+   if notification and multiplier > 0: announce('--> {}.'.format(announceString))
    debugNotify("<<< DrawX()", 3)
    return announceString
 
@@ -1214,7 +1169,7 @@ def DiscardX(Autoscript, announceText, card, targetCards = None, notification =
    if count == 0: return (announceText,count) # If there are no cards, then we effectively did nothing, so we don't change the notification.
    if notification == 'Quick': announceString = "{} discards {} cards".format(announceText, count)
    else: announceString = "{}{} discard {} cards from their hand".format(announceText,otherTXT, count)
-   if notification and multiplier > 0: notify('--> {}.'.format(announceString))
+   if notification and multiplier > 0: announce('--> {}.'.format(announceString))
    debugNotify("<<< DiscardX()", 3)
    return (announceString,count)
 
@@ -1238,7 +1193,7 @@ def ReshuffleX(Autoscript, announceText, card, targetCards = None, notification
    shuffle(targetPL.piles['R&D/Stack'])
    if notification == 'Quick': announceString = "{} shuffles their {} into their {}".format(announceText, namestuple[0], namestuple[1])
    else: announceString = "{} shuffle their {} into their {}".format(announceText, namestuple[0], namestuple[1])
-   if notification: notify('--> {}.'.format(announceString))
+   if notification: announce('--> {}.'.format(announceString))
    debugNotify("<<< ReshuffleX() return with X = {}".format(X), 3)
    return (announceString, X)
 
@@ -1251,12 +1206,12 @@ def ShuffleX(Autoscript, announceText, card, targetCards = None, notification =
    if action.group(1) == 'Trash' or action.group(1) == 'Archives': pile = targetPL.piles['Heap/Archives(Face-up)']
    elif action.group(1) == 'Stack' or action.group(1) == 'R&D': pile = targetPL.piles['R&D/Stack']
    elif action.group(1) == 'Hidden Archives': pile = targetPL.piles['Archives(Hidden)']
-   random = rnd(10,100) # Small wait (bug workaround) to make sure all animations are done.
+   waitFor(None, 1, label = 'ShuffleX') # One round trip so that the cards our earlier scripts moved into the pile are there on the server before it's shuffled.
    shuffle(pile)
    if notification == 'Quick': announceString = "{} shuffles their {}".format(announceText, pile.name)
    elif targetPL == me: announceString = "{} shuffle their {}".format(announceText, pile.name)
    else: announceString = "{} shuffle {}' {}".format(announceText, targetPL, pile.name)
-   if notification: notify('--> {}.'.format(announceString))
+   if notification: announce('--> {}.'.format(announceString))
    debugNotify("<<< ShuffleX()", 3)
    return announceString
 
@@ -1280,7 +1235,7 @@ def RollX(Autoscript, announceText, card, targetCards = None, notification = Non
       debugNotify("### iter:{} with roll {} and total result: {}".format(d,d6,result), 2)
    if notification == 'Quick': announceString = "{} rolls {} on {} dice".format(announceText, d6list, count)
    else: announceString = "{} roll {} dice with the following results: {}".format(announceText,count, d6list)
-   if notification: notify('--> {}.'.format(announceString))
+   if notification: announce('--> {}.'.format(announceString))
    debugNotify("<<< RollX() with result: {}".format(result), 3)
    return (announceString, result)
 
@@ -1355,7 +1310,9 @@ def RunX(Autoscript, announceText, card, targetCards = None, notification = None
             else: targetServer = targets[0].name
       else:
          targetServer = action.group(1)
-         if targetServer == 'Remote' and card.name == 'Remote Server': card.target(True) # If the player double clicked the remote server to start a run, then we target it, in order to allow an arrow to be painted.
+         if targetServer == 'Remote' and card.name == 'Remote Server':
+            card.target(True) # If the player double clicked the remote server to start a run, then we target it, in order to allow an arrow to be painted.
+            trackTempCard(card)
       feint = re.search(r'-feintTo([A-Za-z&]+)', Autoscript)
       if feint:
          setGlobalVariable('feintTarget',feint.group(1)) # If the card script is feinting to a different fort, set a shared variable so that the corp knows it.
@@ -1363,7 +1320,7 @@ def RunX(Autoscript, announceText, card, targetCards = None, notification = None
       intRun(0,targetServer,True)
       if notification == 'Quick': announceString = "{} starts a run{}".format(announceText, runTarget)
       else: announceString = "{} start a run{}".format(announceText, runTarget)
-   if notification and not re.search(r'isSilent', Autoscript): notify('--> {}.'.format(announceString))
+   if notification and not re.search(r'isSilent', Autoscript): announce('--> {}.'.format(announceString))
    debugNotify("<<< RunX()", 3)
    if re.search(r'isSilent', Autoscript): return announceText
    else: return announceString
@@ -1378,7 +1335,7 @@ def SimplyAnnounce(Autoscript, announceText, card, targetCards = None, notificat
    if re.search(r'break',Autoscript) and re.search(r'subroutine',Autoscript): penaltyNoisy(card)
    if notification == 'Quick': announceString = "{} {}".format(announceText, action.group(1))
    else: announceString = "{} {}".format(announceText, action.group(1))
-   if notification: notify('--> {}.'.format(announceString))
+   if notification: announce('--> {}.'.format(announceString))
    debugNotify("<<< SimplyAnnounce()", 3)
    return announceString
 
@@ -1449,7 +1406,7 @@ def ChooseKeyword(Autoscript, announceText, card, targetCards = None, notificati
       else: TokensX('Put1Keyword:{}'.format(keywords[choice]), '', targetCard)
    if notification == 'Quick': announceString = "{} marks {} as being {} now".format(announceText, targetCardlist, keywords[choice])
    else: announceString = "{} mark {} as being {} now".format(announceText, targetCardlist, keywords[choice])
-   if notification: notify('--> {}.'.format(announceString))
+   if notification: announce('--> {}.'.format(announceString))
    debugNotify("<<< ChooseKeyword()", 3)
    return announceString
 
@@ -1459,20 +1416,13 @@ def TraceX(Autoscript, announceText, card, targetCards = None, notification = No
    action = re.search(r'\bTrace([0-9]+)', Autoscript)
    multiplier = per(Autoscript, card, n, targetCards)
    TraceStrength = num(action.group(1)) * multiplier
-   reinforcement = inputTraceValue(card,silent = True)
+   reinforcement = inputTraceValue(card,silent = True, record = traceRecord(card._id, TraceStrength, Autoscript)) # The record is shared once the corp has placed their bid.
    if reinforcement == 'ABORT': return 'ABORT'
    if reinforcement: reinforceTXT =  "and reinforced by {} (Total: {})".format(uniCredit(reinforcement),TraceStrength + reinforcement)
    else: reinforceTXT = "(Not reinforced)"
-   setGlobalVariable('CorpTraceValue',str(TraceStrength + reinforcement))
-   traceEffects = re.search(r'-traceEffects<(.*?),(.*?)>', Autoscript)
-   debugNotify("### Checking for Trace Effects", 2) #Debug
-   if traceEffects:
-      traceEffectTuple = (card._id,traceEffects.group(1),traceEffects.group(2))
-      debugNotify("### TraceEffectsTuple: {}".format(traceEffectTuple), 2) #Debug
-      setGlobalVariable('CurrentTraceEffect',str(traceEffectTuple))
    if notification == 'Quick': announceString = "{} starts a Trace with a base strength of {} {}".format(announceText, TraceStrength, reinforceTXT)
    else: announceString = "{} start a trace with a base strength of {} {}".format(announceText, TraceStrength, reinforceTXT)
-   if notification: notify('--> {}.'.format(announceString))
+   if notification: announce('--> {}.'.format(announceString))
    debugNotify("<<< TraceX()", 3)
    return announceString
 
@@ -1518,7 +1468,7 @@ def ModifyStatus(Autoscript, announceText, card, targetCards = None, notificatio
       if action.group(2) != 'Multi': break # If we're not doing a multi-targeting, abort after the first run.
    if notification == 'Quick': announceString = "{} {}es {}{}".format(announceText, action.group(1), targetCardlist,extraText)
    else: announceString = "{} {} {}{}".format(announceText, action.group(1), targetCardlist, extraText)
-   if notification and not re.search(r'isSilent', Autoscript): notify('--> {}.'.format(announceString))
+   if notification and not re.search(r'isSilent', Autoscript): announce('--> {}.'.format(announceString))
    debugNotify("<<< ModifyStatus()", 3)
    if re.search(r'isSilent', Autoscript): return announceText
    else: return announceString
@@ -1540,38 +1490,21 @@ def InflictX(Autoscript, announceText, card, targetCards = None, notification =
    if DMG and Automations['Damage']: #The actual effects happen only if the Damage automation switch is ON. It should be ON by default.
       if DMGwarn and localDMGwarn:
          localDMGwarn = False # We don't want to warn the player for every point of damage.
+         flushAnnouncements() # This warning goes out before the confirmation, so anything announced before it has to go first.
          if targetPL != me: notify(":::ATTENTION::: {} is about to inflict {} {} Damage to {}!".format(me,DMG,action.group(3),targetPL))
          if not confirm(":::Warning::: You are about to inflict automatic damage!\
                        \nBefore you do that, please make sure that your target is not currently manipulating their hand or this might cause the game to crash.\
                      \n\nImportant: Before proceeding, ask your target to activate any cards they want that add protection against this type of damage. If this is yourself, please make sure you do this before you activate damage effects.\
                      \n\nDo you want this warning message will to appear again next time you do damage? (Recommended)"): DMGwarn = False
-      if re.search(r'nonPreventable', Autoscript):
-         DMGprevented = 0
-         preventTXT = ' (Unpreventable)'
-      else: DMGprevented = findDMGProtection(DMG, action.group(3), targetPL)
-      if DMGprevented > 0:
-         preventTXT = ' ({} prevented)'.format(DMGprevented)
-         DMG -= DMGprevented
-      for DMGpt in range(DMG): #Start applying the damage
-         if len(targetPL.hand) == 0 or currentHandSize(targetPL) == 0:
-            notify(":::Warning:::{} has flatlined!".format(targetPL)) #If the target does not have any more cards in their hand, inform they've flatlined.
-            if targetPL != me: reportGame('FlatlineVictory') # In case of an effect like the Jinteki's ability
-            else: reportGame('Flatlined')
-            break
-         else: #Otherwise, warn the player doing it for the first time
-            whisper("+++ Applying damage {} of {}...".format(DMGpt+1,DMG))
-            DMGcard = targetPL.hand.random() # Pick a random card from their hand
-            if targetPL.getGlobalVariable('ds') == 'corp': DMGcard.moveTo(targetPL.piles['Archives(Hidden)']) # If they're a corp, move it to the hidden archive
-            else: DMGcard.moveTo(targetPL.piles['Heap/Archives(Face-up)']) #If they're a runner, move it to trash.
-            notify("--DMG: {} discarded".format(DMGcard))
-            if action.group(3) == 'Brain':
-               #targetPL.counters['Hand Size'].value -= 1 # If it's brain damage, also reduce the player's maximum handsize.
-               applyBrainDmg(targetPL)
+      preventable = not re.search(r'nonPreventable', Autoscript)
+      if not preventable: preventTXT = ' (Unpreventable)'
+      DMG, DMGprevented = resolveDamage(DMG, action.group(3), targetPL, preventable)
+      if DMGprevented > 0: preventTXT = ' ({} prevented)'.format(DMGprevented)
    if targetPL == me: targetPL = 'theirself' # Just changing the announcement to fit better.
    if re.search(r'isRequirement', Autoscript) and DMG < 1: failedRequirement = True # Requirement means that the cost is still paid but other clicks are not going to follow.
    if notification == 'Quick': announceString = "{} suffers {} {} damage{}".format(announceText,DMG,action.group(3),preventTXT)
    else: announceString = "{} inflict {} {} damage{} to {}{}".format(announceText,DMG,action.group(3),enhanceTXT,targetPL,preventTXT)
-   if notification and multiplier > 0: notify('--> {}.'.format(announceString))
+   if notification and multiplier > 0: announce('--> {}.'.format(announceString))
    debugNotify("<<< InflictX()", 3)
    return announceString
 
@@ -1600,14 +1533,12 @@ def RetrieveX(Autoscript, announceText, card, targetCards = None, notification =
    multiplier = per(Autoscript, card, n, targetCards, notification)
    if source != targetPL.piles['Heap/Archives(Face-up)']: # The discard pile is anyway visible.
       debugNotify("### Turning Pile Face Up", 2)
-      cover = table.create("ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b",0,0,1,True) # Creating a dummy card to cover that player's source pile
-      cover.moveTo(source) # Moving that dummy card on top of their source pile
+      cover = getCover(pile = source) # Putting a dummy card on top of their source pile
       for c in source: c.isFaceUp = True # We flip all cards in the player's deck face up so that we can grab their properties
-      rnd(1,100) # Small delay to allow OCTGN to read properties
+      if len(source): waitFor(lambda: c.Type != '?', 10, 2, label = 'RetrieveX') # Small delay to allow OCTGN to read properties. We check the last card we flipped.
    elif source == targetPL.piles['Heap/Archives(Face-up)'] and re.search(r'-fromArchives', Autoscript): # If we're flipping the
       debugNotify("### Turning Hidden Archives Face Up", 2)
-      cover = table.create("ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b",0,0,1,True)
-      cover.moveTo(targetPL.piles['Archives(Hidden)'])
+      cover = getCover(pile = targetPL.piles['Archives(Hidden)'])
       for c in targetPL.piles['Archives(Hidden)']: c.isFaceUp = True
    restrictions = prepareRestrictions(Autoscript, seek = 'type')
    cardList = []
@@ -1641,9 +1572,9 @@ def RetrieveX(Autoscript, announceText, card, targetCards = None, notification =
          cardList.remove(cardChoices[choice])
    else: chosenCList = cardList
    debugNotify("### chosenCList: {}".format(chosenCList), 2)
+   if destination == table: placeCards(chosenCList) # We place all the retrieved cards in one go, before going through their install effects.
    for c in chosenCList:
       if destination == table:
-         placeCard(c)
          if c.Type == 'Program':
             MUtext = chkRAM(c)
             for targetLookup in table: # We check if we're targeting a daemon to install the program in.
@@ -1659,12 +1590,12 @@ def RetrieveX(Autoscript, announceText, card, targetCards = None, notification =
    if source != targetPL.piles['Heap/Archives(Face-up)']:
       debugNotify("### Turning Pile Face Down", 2)
       for c in source: c.isFaceUp = False # We hide again the source pile cards.
-      rnd(1,100) # Small delay to allow OCTGN to finish
-      cover.moveTo(shared.exile) # we cannot delete cards so we just hide it.
+      waitFor(None, 1, label = 'RetrieveX facedown') # One round trip so that the pile is face down on the server before its cover goes away.
+      releaseCover(cover) # we cannot delete cards so we just hide it until we need a cover again.
    debugNotify("### About to announce.", 2)
    if len(chosenCList) == 0: announceString = "{} attempts to {} a card {}, but there were no valid targets.".format(announceText, destiVerb, sourcePath)
    else: announceString = "{} {} {} {}{}.".format(announceText, destiVerb, [c.name for c in chosenCList], sourcePath,MUtext)
-   if notification and multiplier > 0: notify(':> {}.'.format(announceString))
+   if notification and multiplier > 0: announce(':> {}.'.format(announceString))
    debugNotify("<<< RetrieveX()", 3)
    return announceString
 
@@ -1673,15 +1604,15 @@ def UseCustomAbility(Autoscript, announceText, card, targetCards = None, notific
       targetPL = findOpponent()
       global reversePlayerChk
       reversePlayerChk = True # We reverse for which player the reduce effects work, because we want cards which pay for the opponent's credit cost to take effect now.
-      reduction = reduceCost(card, 'FORCE', 3, True) # We use a dry-run to see if they have a card which card reduce the tollbooth cost such as stimhack
+      costPlan = planCost(card, 'FORCE', 3) # We plan the cost first to see if they have a card which card reduce the tollbooth cost such as stimhack
+      reduction = costPlan['reduction']
       reversePlayerChk = False
       if reduction > 0: extraText = " (reduced by {})".format(uniCredit(reduction))
       elif reduction < 0: extraText = " (increased by {})".format(uniCredit(abs(reduction)))
       else: extraText = ''
       if targetPL.Credits >= 3 - reduction:
-         reversePlayerChk = True
-         targetPL.Credits -= 3 - reduceCost(card, 'FORCE', 3)
-         reversePlayerChk = False
+         commitCostPlan(costPlan)
+         targetPL.Credits -= 3 - reduction
          announceString = announceText + ' force {} to pay {}{}'.format(targetPL,uniCredit(3),extraText)
       else:
          jackOut(silent = True)
@@ -1694,7 +1625,7 @@ def UseCustomAbility(Autoscript, announceText, card, targetCards = None, notific
       shuffle(me.piles['R&D/Stack'])
       if re.search(r'no valid targets',retrieveResult): announceString = "{} tries to use their replicator to create a copy of {}, but they run out of juice.".format(me,targetC.name) # If we couldn't find a copy of the played card to replicate, we inform of this
       else: announceString = "{} uses their replicator to create a copy of {}".format(me,targetC.name)
-      notify(announceString)
+      announce(announceString)
    if fetchProperty(card, 'name') == "Data Hound":
       count = askInteger("By which amount of trace strength did you exceeded the runner's link strength?",1)
       if not count: return 'ABORT'
@@ -1702,18 +1633,17 @@ def UseCustomAbility(Autoscript, announceText, card, targetCards = None, notific
       targetPL = findOpponent()
       cardList = list(targetPL.piles['R&D/Stack'].top(count)) # We make a list of the top cards the corp can look at.
       debugNotify("### Turning Runner's Stack Face Up", 2)
-      cover = table.create("ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b",0,0,1,True)
-      cover.moveTo(targetPL.piles['R&D/Stack'])
+      cover = getCover(pile = targetPL.piles['R&D/Stack'])
       for c in targetPL.piles['R&D/Stack']: c.isFaceUp = True
-      rnd(1,100) # Delay to be able to read card info
+      if len(targetPL.piles['R&D/Stack']): waitFor(lambda: c.Type != '?', 10, 2, label = 'Data Hound') # Delay to be able to read card info. We check the last card we flipped.
       if len(cardList) > 1:
          choice = SingleChoice("Choose card to trash", makeChoiceListfromCardList(cardList), type = 'button')
          trashedC = cardList.pop(choice)
       else: trashedC = cardList.pop(0)
       debugNotify("### Trashing {}".format(trashedC), 2)
       trashedC.moveTo(targetPL.piles['Heap/Archives(Face-up)'])
-      if len(cardList) > 1: notify("{}'s Data Hound has sniffed out and trashed {} and is now reorganizing {}'s Stack".format(me,trashedC,targetPL))
-      else: notify("{} has sniffed out and trashed {}".format(me,trashedC))
+      if len(cardList) > 1: announce("{}'s Data Hound has sniffed out and trashed {} and is now reorganizing {}'s Stack".format(me,trashedC,targetPL))
+      else: announce("{} has sniffed out and trashed {}".format(me,trashedC))
       idx = 0 # The index where we're going to be placing each card.
       while len(cardList) > 0:
          if len(cardList) == 1: choice = 0
@@ -1722,9 +1652,9 @@ def UseCustomAbility(Autoscript, announceText, card, targetCards = None, notific
          movedC.moveTo(targetPL.piles['R&D/Stack'],idx + 1) # If there's only one card left, we put it in the last available index location in the Stack. We always put the card one index position deeper, because the first card is the cover.
          idx += 1
       debugNotify("### Turning Pile Face Down", 2)
-      rnd(1,100) # Delay to be able to announce names.
+      waitFor(None, 1, label = 'Data Hound') # One round trip so that the cards are reordered on the server before we turn them face down again.
       for c in targetPL.piles['R&D/Stack']: c.isFaceUp = False # We hide again the source pile cards.
-      cover.moveTo(shared.exile) # we cannot delete cards so we just hide it.
+      releaseCover(cover) # we cannot delete cards so we just hide it until we need a cover again.
       announceString = ':=> Sniff'
          #      __
          # (___()'`;   *Sniff*
@@ -1733,208 +1663,293 @@ def UseCustomAbility(Autoscript, announceText, card, targetCards = None, notific
          # Pity the chatbox does not support formatting :(
    return announceString
 
+CustomScripts = {} # A dictionary which holds the handler function for each (card model, action) pair that has a custom script. Filled by the @customScript() decorator below.
+CustomScriptModels = set() # A set with all the card models which have at least one custom script registered. Used to avoid probing CustomScript() for every other card.
+
+def customScript(model, *actions): # A decorator which registers the decorated function as the custom script of a card model for the specified actions.
+   def register(func):
+      for action in actions:
+         CustomScripts[(model, action)] = func
+      CustomScriptModels.add(model)
+      return func
+   return register
+
+def customScriptModels(): # Returns a list of all the card models which have custom code attached to them.
+   return sorted(CustomScriptModels)
+
 def CustomScript(card, action = 'PLAY'): # Scripts that are complex and fairly unique to specific cards, not worth making a whole generic function for them.
-   global ModifyDraw, secretCred
    debugNotify(">>> CustomScript() with action: {}".format(action)) #Debug
-   trash = me.piles['Heap/Archives(Face-up)']
-   arcH = me.piles['Archives(Hidden)']
-   deck = me.piles['R&D/Stack']
    #confirm("Customscript") # Debug
-   if card.model == '23473bd3-f7a5-40be-8c66-7d35796b6031' and action == 'USE': # Virus Scan Special Ability
-      clickCost = useClick(count = 3)
-      if clickCost == 'ABORT': return
-      for c in table:
-         foundMarker = findMarker(c,'Virus')
-         if foundMarker: c.markers[foundMarker] = 0
-      notify("{} to clean all viruses from their corporate grid".format(clickCost))
-   elif card.model == '71a89203-94cd-42cd-b9a8-15377caf4437' and action == 'USE': # Technical Difficulties Special Ability
-      knownMarkers = []
-      for marker in card.markers:
-         if marker[0] in markerRemovals: # If the name of the marker exists in the markerRemovals dictionary it means it can be removed and has a specific cost.
-            knownMarkers.append(marker)
-      if len(knownMarkers) == 0:
-         whisper("No known markers with ability to remove")
-         return
-      elif len(knownMarkers) == 1: selectedMarker = knownMarkers[0]
-      else:
-         selectTXT = 'Please select a marker to remove\n\n'
-         iter = 0
-         for choice in knownMarkers:
-            selectTXT += '{}: {} ({} {} and {})\n'.format(iter,knownMarkers[iter][0],markerRemovals[choice[0]][0],uniClick(),markerRemovals[choice[0]][1])
-            iter += 1
-         sel = askInteger(selectTXT,0)
-         selectedMarker = knownMarkers[sel]
-      aCost = markerRemovals[selectedMarker[0]][0] # The first field in the tuple for the entry with the same name as the selected marker, in the markerRemovals dictionary. All clear? Good.
-      cost = markerRemovals[selectedMarker[0]][1]
-      clickCost = useClick(count = aCost)
-      if clickCost == 'ABORT': return
-      creditCost = payCost(cost)
-      if creditCost == 'ABORT':
-         me.Clicks += aCost # If the player can't pay the cost after all and aborts, we give him his clicks back as well.
-         return
-      card.markers[selectedMarker] -= 1
-      notify("{} to remove {} for {}.".format(clickCost,selectedMarker[0],creditCost))
-   elif fetchProperty(card, 'name') == 'Accelerated Beta Test' and action == 'SCORE':
-      if not confirm("Would you like to initiate an accelerated beta test?"): return
+   handler = CustomScripts.get((card.model, action))
+   if handler: result = handler(card, action)
+   else:
+      result = None
+      if action == 'USE': useCard(card)
+   debugNotify("<<< CustomScript()", 3) #Debug
+   return result
+
+@customScript('23473bd3-f7a5-40be-8c66-7d35796b6031', 'USE') # Virus Scan Special Ability
+def virusScanCS(card, action):
+   clickCost = useClick(count = 3)
+   if clickCost == 'ABORT': return
+   for c in table:
+      foundMarker = findMarker(c,'Virus')
+      if foundMarker: c.markers[foundMarker] = 0
+   announce("{} to clean all viruses from their corporate grid".format(clickCost))
+
+@customScript('71a89203-94cd-42cd-b9a8-15377caf4437', 'USE') # Technical Difficulties Special Ability
+def technicalDifficultiesCS(card, action):
+   knownMarkers = []
+   for marker in card.markers:
+      if marker[0] in markerRemovals: # If the name of the marker exists in the markerRemovals dictionary it means it can be removed and has a specific cost.
+         knownMarkers.append(marker)
+   if len(knownMarkers) == 0:
+      whisper("No known markers with ability to remove")
+      return
+   elif len(knownMarkers) == 1: selectedMarker = knownMarkers[0]
+   else:
+      selectTXT = 'Please select a marker to remove\n\n'
       iter = 0
-      for c in deck.top(3):
-         c.moveTo(arcH)
-         loopChk(c,'Type')
-         if c.type == 'ICE':
-            placeCard(c,'InstallRezzed')
-            c.orientation ^= Rot90
-            iter +=1
-            notify(" -- {} Beta Tested!".format(c))
-            autoscriptOtherPlayers('CardInstall',c)
-            autoscriptOtherPlayers('CardRezzed',c)
-      if iter: # If we found any ice in the top 3
-         notify("{} initiates an Accelerated Beta Test and reveals {} Ice from the top of their R&D. These Ice are automatically installed and rezzed".format(me, iter))
-      else: notify("{} initiates a Accelerated Beta Test but their beta team was incompetent.".format(me))
-   elif fetchProperty(card, 'name') == 'Infiltration' and action == 'PLAY':
-      tCards = [c for c in table if c.targetedBy and c.targetedBy == me and c.isFaceUp == False]
-      if tCards: expose(tCards[0]) # If the player has any face-down cards currently targeted, we assume he wanted to expose them.
-      elif confirm("Do you wish to gain 2 credits?\
-                \n\nIf you want to expose a target, simply ask the corp to use the 'Expose' option on the table.\
-                \n\nHowever if you have a target selected when you play this card, we will also announce that for you."):
-         me.Credits += 2
-         notify("--> {} gains {}".format(me,uniCredit(2)))
-   elif fetchProperty(card, 'name') == "Rabbit Hole" and action == 'INSTALL':
-      if not confirm("Would you like to extend the rabbit hole?"):
-         return
-      cardList = [c for c in deck]
-      reduction = 0
-      rabbits = 0
-      totalCost = 0
-      for c in cardList: c.moveTo(arcH)
-      rnd(1,100)
-      debugNotify("Entering rabbit search loop", 2)
-      for c in cardList:
-         if c.model == "bc0f047c-01b1-427f-a439-d451eda01039":
-            debugNotify("found rabbit!", 2)
-            storeProperties(c)
-            reduction += reduceCost(c, action, num(c.Cost)) #Checking to see if the cost is going to be reduced by cards we have in play.
-            rc = payCost(num(c.Cost) - reduction, "not free")
-            if rc == "ABORT": break
-            else: totalCost += (num(c.Cost) - reduction)
-            placeCard(c, action)
-            rabbits += 1
-            cardList.remove(c)
-            if not confirm("Rabbit Hole extended! Would you like to dig deeper?"): break
-      for c in cardList: c.moveTo(deck)
-      rnd(1,10)
-      shuffle(deck)
-      if rabbits: # If the player managed to find and install some extra rabbit holes...
-         if reduction > 0: extraText = " (reduced by {})".format(uniCredit(reduction)) #If it is, make sure to inform.
-         elif reduction < 0: extraText = " (increased by {})".format(uniCredit(abs(reduction)))
-         else: extraText = ''
-         me.counters['Base Link'].value += rabbits
-         notify("{} has extended the Rabbit Hole by {} {} by paying {}{}".format(me,rabbits,uniLink(),uniCredit(totalCost),extraText))
-      else: notify("{} does not find enough rabbits.".format(me))
-   elif fetchProperty(card, 'name') == 'Snowflake' and action == 'USE':
-      if secretCred == None:
-         secretCred = askInteger("How many credits do you want to secretly spend?\n\nOnce you have selected your total, ask your opponent to spend their own amount visibly, then re-use this card.",0)
-         while secretCred and (secretCred > me.Credits) or (secretCred > 2):
-            if secretCred > me.Credits and confirm("You do not have that many credits to spend. Bypass?"): break
-            if secretCred > 2: warn = ":::ERROR::: You cannot spend more than 2 credits!\n"
-            else: warn = ''
-            secretCred = askInteger("{}How many credits do you want to secretly spend?".format(warn),0)
-         if secretCred != None: notify("{} has spent a hidden amount of credits for {}. Runner must now declare how many credits to spend".format(me,card))
-      else:
-         notify("{} has spent {} in secret for {}'s subroutine".format(me,uniCredit(secretCred),card))
-         me.Credits -= secretCred
-         secretCred = None
-   elif fetchProperty(card, 'name') == 'Bullfrog' and action == 'USE':
-      choice = SingleChoice('Select Ability to use', ['Spend/Reveal 0-2 Credits','Move Bullfrog and runner to another server and continue run from there'], type = 'button')
-      if choice == 0:
-         if secretCred == None:
-            secretCred = askInteger("How many credits do you want to secretly spend?\n\nOnce you have selected your total, ask your opponent to spend their own amount visibly, then re-use this card.",0)
-            while secretCred and (secretCred > me.Credits) or (secretCred > 2):
-               if secretCred > me.Credits and confirm("You do not have that many credits to spend. Bypass?"): break
-               if secretCred > 2: warn = ":::ERROR::: You cannot spend more than 2 credits!\n"
-               else: warn = ''
-               secretCred = askInteger("{}How many credits do you want to secretly spend?".format(warn),0)
-            if secretCred != None: notify("{} has spent a hidden amount of credits for {}. Runner must now declare how many credits to spend".format(me,card))
-         else:
-            notify("{} has spent {} in secret for {}'s subroutine".format(me,uniCredit(secretCred),card))
-            me.Credits -= secretCred
-            secretCred = None
-      else:
-         choice = SingleChoice("Which server are you going to redirect the run at?", ['Remote Server','HQ','R&D','Archives'])
-         if choice != None: # Just in case the player didn't just close the askInteger window.
-            if choice == 0: targetServer = 'Remote'
-            elif choice == 1: targetServer = 'HQ'
-            elif choice == 2: targetServer = 'R&D'
-            elif choice == 3: targetServer = 'Archives'
-            else: return 'ABORT'
+      for choice in knownMarkers:
+         selectTXT += '{}: {} ({} {} and {})\n'.format(iter,knownMarkers[iter][0],markerRemovals[choice[0]][0],uniClick(),markerRemovals[choice[0]][1])
+         iter += 1
+      sel = askInteger(selectTXT,0)
+      selectedMarker = knownMarkers[sel]
+   aCost = markerRemovals[selectedMarker[0]][0] # The first field in the tuple for the entry with the same name as the selected marker, in the markerRemovals dictionary. All clear? Good.
+   cost = markerRemovals[selectedMarker[0]][1]
+   clickCost = useClick(count = aCost)
+   if clickCost == 'ABORT': return
+   creditCost = payCost(cost)
+   if creditCost == 'ABORT':
+      me.Clicks += aCost # If the player can't pay the cost after all and aborts, we give him his clicks back as well.
+      return
+   card.markers[selectedMarker] -= 1
+   announce("{} to remove {} for {}.".format(clickCost,selectedMarker[0],creditCost))
+
+@customScript('bc0f047c-01b1-427f-a439-d451eda01055', 'SCORE') # Accelerated Beta Test
+def acceleratedBetaTestCS(card, action):
+   arcH = me.piles['Archives(Hidden)']
+   deck = me.piles['R&D/Stack']
+   if not confirm("Would you like to initiate an accelerated beta test?"): return
+   iter = 0
+   for c in deck.top(3):
+      c.moveTo(arcH)
+      loopChk(c,'Type')
+      if c.type == 'ICE':
+         placeCard(c,'InstallRezzed')
+         c.orientation ^= Rot90
+         iter +=1
+         announce(" -- {} Beta Tested!".format(c))
+         autoscriptOtherPlayers('CardInstall',c)
+         autoscriptOtherPlayers('CardRezzed',c)
+   if iter: # If we found any ice in the top 3
+      announce("{} initiates an Accelerated Beta Test and reveals {} Ice from the top of their R&D. These Ice are automatically installed and rezzed".format(me, iter))
+   else: announce("{} initiates a Accelerated Beta Test but their beta team was incompetent.".format(me))
+
+@customScript('bc0f047c-01b1-427f-a439-d451eda01049', 'PLAY') # Infiltration
+def infiltrationCS(card, action):
+   tCards = [c for c in table if c.targetedBy and c.targetedBy == me and c.isFaceUp == False]
+   if tCards: expose(tCards[0]) # If the player has any face-down cards currently targeted, we assume he wanted to expose them.
+   elif confirm("Do you wish to gain 2 credits?\
+             \n\nIf you want to expose a target, simply ask the corp to use the 'Expose' option on the table.\
+             \n\nHowever if you have a target selected when you play this card, we will also announce that for you."):
+      me.Credits += 2
+      announce("--> {} gains {}".format(me,uniCredit(2)))
+
+@customScript('bc0f047c-01b1-427f-a439-d451eda01039', 'INSTALL') # Rabbit Hole
+def rabbitHoleCS(card, action):
+   arcH = me.piles['Archives(Hidden)']
+   deck = me.piles['R&D/Stack']
+   if not confirm("Would you like to extend the rabbit hole?"):
+      return
+   cardList = [c for c in deck]
+   reduction = 0
+   rabbits = 0
+   totalCost = 0
+   for c in cardList: c.moveTo(arcH)
+   waitFor(None, 1, label = 'Rabbit Hole') # One round trip so that the cards are in the archives on the server before we start installing rabbits out of them.
+   debugNotify("Entering rabbit search loop", 2)
+   for c in cardList:
+      if c.model == "bc0f047c-01b1-427f-a439-d451eda01039":
+         debugNotify("found rabbit!", 2)
+         storeProperties(c)
+         reduction += reduceCost(c, action, num(c.Cost)) #Checking to see if the cost is going to be reduced by cards we have in play.
+         rc = payCost(num(c.Cost) - reduction, "not free")
+         if rc == "ABORT": break
+         else: totalCost += (num(c.Cost) - reduction)
+         placeCard(c, action)
+         rabbits += 1
+         cardList.remove(c)
+         if not confirm("Rabbit Hole extended! Would you like to dig deeper?"): break
+   for c in cardList: c.moveTo(deck)
+   waitFor(None, 1, label = 'Rabbit Hole shuffle') # One round trip so that all the cards are back in the stack on the server before it's shuffled.
+   shuffle(deck)
+   if rabbits: # If the player managed to find and install some extra rabbit holes...
+      if reduction > 0: extraText = " (reduced by {})".format(uniCredit(reduction)) #If it is, make sure to inform.
+      elif reduction < 0: extraText = " (increased by {})".format(uniCredit(abs(reduction)))
+      else: extraText = ''
+      me.counters['Base Link'].value += rabbits
+      chkCloud() # After we modify player link, we check for enabled cloud connections.
+      announce("{} has extended the Rabbit Hole by {} {} by paying {}{}".format(me,rabbits,uniLink(),uniCredit(totalCost),extraText))
+   else: announce("{} does not find enough rabbits.".format(me))
+
+def spendSecretCredits(card): # Snowflake and Bullfrog allow the corp to spend up to 2 credits in secret.
+   global secretCred
+   if secretCred == None:
+      secretCred = askInteger("How many credits do you want to secretly spend?\n\nOnce you have selected your total, ask your opponent to spend their own amount visibly, then re-use this card.",0)
+      while secretCred and (secretCred > me.Credits) or (secretCred > 2):
+         if secretCred > me.Credits and confirm("You do not have that many credits to spend. Bypass?"): break
+         if secretCred > 2: warn = ":::ERROR::: You cannot spend more than 2 credits!\n"
+         else: warn = ''
+         secretCred = askInteger("{}How many credits do you want to secretly spend?".format(warn),0)
+      if secretCred != None:
+         flushAnnouncements() # The runner has to see this right away, so anything we have buffered goes out first.
+         notify("{} has spent a hidden amount of credits for {}. Runner must now declare how many credits to spend".format(me,card))
+   else:
+      announce("{} has spent {} in secret for {}'s subroutine".format(me,uniCredit(secretCred),card))
+      me.Credits -= secretCred
+      secretCred = None
+
+@customScript('bc0f047c-01b1-427f-a439-d451eda02015', 'USE') # Snowflake
+def snowflakeCS(card, action):
+   spendSecretCredits(card)
+
+@customScript('bc0f047c-01b1-427f-a439-d451eda02073', 'USE') # Bullfrog
+def bullfrogCS(card, action):
+   choice = SingleChoice('Select Ability to use', ['Spend/Reveal 0-2 Credits','Move Bullfrog and runner to another server and continue run from there'], type = 'button')
+   if choice == 0: spendSecretCredits(card)
+   else:
+      choice = SingleChoice("Which server are you going to redirect the run at?", ['Remote Server','HQ','R&D','Archives'])
+      if choice != None: # Just in case the player didn't just close the askInteger window.
+         if choice == 0: targetServer = 'Remote'
+         elif choice == 1: targetServer = 'HQ'
+         elif choice == 2: targetServer = 'R&D'
+         elif choice == 3: targetServer = 'Archives'
          else: return 'ABORT'
-         setGlobalVariable('status','running{}'.format(targetServer)) # We change the global variable which holds on which server the runner is currently running on
-         if targetServer == 'Remote': announceText = 'a remote server'
-         else: announceText = 'the ' + targetServer
-         notify("Bullfrog's Ability triggers and redirects the runner to {}.".format(announceText))
-   elif fetchProperty(card, 'name') == 'Personal Workshop':
-      if action == 'USE':
-         targetList = [c for c in me.hand  # First we see if they've targeted a card from their hand
-                        if c.targetedBy
-                        and c.targetedBy == me
-                        and num(c.Cost) > 0
-                        and (c.Type == 'Program' or c.Type == 'Hardware')]
-         if len(targetList) > 0:
-            selectedCard = targetList[0]
-            actionCost = useClick(count = 1)
-            if actionCost == 'ABORT': return
-            hostCards = eval(getGlobalVariable('Host Cards'))
-            hostCards[selectedCard._id] = card._id # We set the Personal Workshop to be the card's host
-            setGlobalVariable('Host Cards',str(hostCards))
-            cardAttachementsNR = len([att_id for att_id in hostCards if hostCards[att_id] == card._id])
-            debugNotify("### About to move into position", 2) #Debug
-            storeProperties(selectedCard)
-            orgAttachments(card)
-            TokensX('Put1PersonalWorkshop-isSilent', "", selectedCard) # We add a Personal Workshop counter to be able to trigger the paying the cost ability
-            announceText = TokensX('Put1Power-perProperty{Cost}', "{} to activate {} in order to ".format(actionCost,card), selectedCard)
-            selectedCard.highlight = InactiveColor
-            notify(announceText)
-         else:
-            whisper(":::ERROR::: You need to target a program or hardware in your hand, with a cost of 1 or more, before using this action")
-            return
-      elif action == 'Start' and card.controller == me:
+      else: return 'ABORT'
+      setGlobalVariable('status','running{}'.format(targetServer)) # We change the global variable which holds on which server the runner is currently running on
+      if targetServer == 'Remote': announceText = 'a remote server'
+      else: announceText = 'the ' + targetServer
+      announce("Bullfrog's Ability triggers and redirects the runner to {}.".format(announceText))
+
+@customScript('bc0f047c-01b1-427f-a439-d451eda02049', 'USE', 'Start') # Personal Workshop
+def personalWorkshopCS(card, action):
+   if action == 'USE':
+      targetList = [c for c in me.hand  # First we see if they've targeted a card from their hand
+                     if c.targetedBy
+                     and c.targetedBy == me
+                     and num(c.Cost) > 0
+                     and (c.Type == 'Program' or c.Type == 'Hardware')]
+      if len(targetList) > 0:
+         selectedCard = targetList[0]
+         actionCost = useClick(count = 1)
+         if actionCost == 'ABORT': return
          hostCards = eval(getGlobalVariable('Host Cards'))
-         PWcards = [Card(att_id) for att_id in hostCards if hostCards[att_id] == card._id]
-         if len(PWcards) == 0: return # No cards are hosted in the PW, we're doing nothing
-         elif len(PWcards) == 1: selectedCard = PWcards[0] # If only one card is hosted in the PW, we remove a power from one of those.
-         else: # Else we have to ask which one to remove.
-            selectTXT = 'Personal Workshop: Please select one of your hosted cards from which to remove a power counter\n\n'
-            iter = 0
-            PWchoices = makeChoiceListfromCardList(PWcards)
-            choice = SingleChoice("Choose one of the Personal Workshop hosted cards from which to remove a power counter", PWchoices, type = 'button', default = 0)
-            selectedCard = PWcards[choice]
-         TokensX('Remove1Power', "Personal Workshop:",selectedCard)
-         notify("--> {}'s Personal Workshop removes 1 power marker from {}".format(me,selectedCard))
-         if selectedCard.markers[mdict['Power']] == 0: # Empty of power markers means the card can be automatically installed
-            host = chkHostType(selectedCard, seek = 'DemiAutoTargeted')
-            if host:
-               try:
-                  if host == 'ABORT':
-                     selectedCard.markers[mdict['Power']] += 1
-                     delayed_whisper("-- Undoing Personal Workshop build")
-                     return
-               except:
-                  extraTXT = ' and hosted on {}'.format(host) # If the card requires a valid host and we found one, we will mention it later.
-            else: extraTXT = ''
-            clearAttachLinks(selectedCard) # We unhost it from Personal Workshop so that it's not trashed if PW is trashed
-            placeCard(selectedCard, hostCard = host)
-            orgAttachments(card)
-            selectedCard.markers[mdict['PersonalWorkshop']] = 0
-            selectedCard.highlight = None
-            executePlayScripts(selectedCard,'INSTALL')
-            autoscriptOtherPlayers('CardInstall',selectedCard)
-            MUtext = chkRAM(selectedCard)
-            notify("--> {} has been built{} from {}'s Personal Workshop{}".format(selectedCard,extraTXT,identName,MUtext))
-   elif action == 'USE': useCard(card)
-   debugNotify("<<< CustomScript()", 3) #Debug
+         hostCards[selectedCard._id] = card._id # We set the Personal Workshop to be the card's host
+         setGlobalVariable('Host Cards',str(hostCards))
+         cardAttachementsNR = len([att_id for att_id in hostCards if hostCards[att_id] == card._id])
+         debugNotify("### About to move into position", 2) #Debug
+         storeProperties(selectedCard)
+         orgAttachments(card)
+         TokensX('Put1PersonalWorkshop-isSilent', "", selectedCard) # We add a Personal Workshop counter to be able to trigger the paying the cost ability
+         announceText = TokensX('Put1Power-perProperty{Cost}', "{} to activate {} in order to ".format(actionCost,card), selectedCard)
+         selectedCard.highlight = InactiveColor
+         notify(announceText)
+      else:
+         whisper(":::ERROR::: You need to target a program or hardware in your hand, with a cost of 1 or more, before using this action")
+         return
+   elif action == 'Start' and card.controller == me:
+      hostCards = eval(getGlobalVariable('Host Cards'))
+      PWcards = [cardHandle(att_id) for att_id in hostCards if hostCards[att_id] == card._id]
+      if len(PWcards) == 0: return # No cards are hosted in the PW, we're doing nothing
+      elif len(PWcards) == 1: selectedCard = PWcards[0] # If only one card is hosted in the PW, we remove a power from one of those.
+      else: # Else we have to ask which one to remove.
+         PWchoices = makeChoiceListfromCardList(PWcards)
+         choice = SingleChoice("Choose one of the Personal Workshop hosted cards from which to remove a power counter", PWchoices, type = 'button', default = 0)
+         selectedCard = PWcards[choice]
+      TokensX('Remove1Power', "Personal Workshop:",selectedCard)
+      announce("--> {}'s Personal Workshop removes 1 power marker from {}".format(me,selectedCard))
+      if selectedCard.markers[mdict['Power']] == 0: # Empty of power markers means the card can be automatically installed
+         host = chkHostType(selectedCard, seek = 'DemiAutoTargeted')
+         if host:
+            try:
+               if host == 'ABORT':
+                  selectedCard.markers[mdict['Power']] += 1
+                  delayed_whisper("-- Undoing Personal Workshop build")
+                  return
+            except:
+               extraTXT = ' and hosted on {}'.format(host) # If the card requires a valid host and we found one, we will mention it later.
+         else: extraTXT = ''
+         clearAttachLinks(selectedCard) # We unhost it from Personal Workshop so that it's not trashed if PW is trashed
+         placeCard(selectedCard, hostCard = host)
+         orgAttachments(card)
+         selectedCard.markers[mdict['PersonalWorkshop']] = 0
+         selectedCard.highlight = None
+         executePlayScripts(selectedCard,'INSTALL')
+         autoscriptOtherPlayers('CardInstall',selectedCard)
+         MUtext = chkRAM(selectedCard)
+         announce("--> {} has been built{} from {}'s Personal Workshop{}".format(selectedCard,extraTXT,identName,MUtext))
 #------------------------------------------------------------------------------
 # Helper Functions
 #------------------------------------------------------------------------------
 
+def abilityLabel(Autoscript): # Returns a nicely written menu option for a card ability, building it only the first time we see that ability.
+   label = CardsAALabels.get(Autoscript)
+   if label != None: return label
+   debugNotify(">>> abilityLabel(){}".format(extraASDebug(Autoscript))) #Debug
+   abilRegex = re.search(r"A([0-9]+)B([0-9]+)G([0-9]+)T([0-9]+):([A-Z][A-Za-z ]+)([0-9]*)([A-Za-z ]*)-?(.*)", Autoscript) # This regexp returns 3-4 groups, which we then reformat and put in the confirm dialogue in a better readable format.
+   if not abilRegex: return Autoscript # If it's not an ability with a cost, we can't do anything better than show the script itself.
+   debugNotify("### Choice Regex is {}".format(abilRegex.groups()), 2) # Debug
+   if abilRegex.group(1) != '0': abilCost = 'Use {} Clicks'.format(abilRegex.group(1))
+   else: abilCost = ''
+   if abilRegex.group(2) != '0':
+      if abilCost != '':
+         if abilRegex.group(3) != '0' or abilRegex.group(4) != '0': abilCost += ', '
+         else: abilCost += ' and '
+      abilCost += 'Pay {} Credits'.format(abilRegex.group(2))
+   if abilRegex.group(3) != '0':
+      if abilCost != '':
+         if abilRegex.group(4) != '0': abilCost += ', '
+         else: abilCost += ' and '
+      abilCost += 'Lose {} Agenda Points'.format(abilRegex.group(3))
+   if abilRegex.group(4) != '0':
+      if abilCost != '': abilCost += ' and '
+      if abilRegex.group(4) == '1': abilCost += 'Trash this card'
+      else: abilCost += 'Use (Once per turn)'
+   if abilRegex.group(1) == '0' and abilRegex.group(2) == '0' and abilRegex.group(3) == '0' and abilRegex.group(4) == '0':
+      if not re.search(r'-isCost', Autoscript):
+         abilCost = 'Activate'
+         connectTXT = ' to '
+      else:
+         abilCost = '' # If the ability claims to be a cost, then we need to put it as part of it, before the "to"
+         connectTXT = ''
+   else:
+      if not re.search(r'-isCost', Autoscript): connectTXT = ' to ' # If there isn't an extra cost, then we connect with a "to" clause
+      else: connectTXT = 'and '
+   if abilRegex.group(6):
+      if abilRegex.group(6) == '999': abilX = 'all'
+      else: abilX = abilRegex.group(6)
+   else: abilX = abilRegex.group(6)
+   if re.search(r'-isSubroutine', Autoscript):
+      if abilCost == 'Activate':  # IF there's no extra costs to the subroutine, we just use the "enter" glyph
+         abilCost = uniSubroutine()
+         connectTXT = ''
+      else: abilCost = '{} '.format(uniSubroutine()) + abilCost # If there's extra costs to the subroutine, we prepend the "enter" glyph to the rest of the costs.
+   label = '{}{}{} {} {}'.format(abilCost, connectTXT, abilRegex.group(5), abilX, abilRegex.group(7))
+   if abilRegex.group(5) == 'Put' or abilRegex.group(5) == 'Remove' or abilRegex.group(5) == 'Refill': label += ' counter' # If it's putting a counter, we clarify that.
+   if abilRegex.group(8): # If the autoscript has an 8th group, then it means it has subconditions. Such as "per Marker" or "is Subroutine"
+      subconditions = abilRegex.group(8).split('$$') # These subconditions are always separated by dashes "-", so we use them to split the string
+      for idx2 in range(len(subconditions)):
+         if re.search(r'isCost', Autoscript) and idx2 == 1: label += ' to' # The extra costs of an action are always at the first part (i.e. before the $$)
+         elif idx2 > 0: label += ' and'
+         for subaddition in subconditions[idx2].split('-'):
+            if re.search(r'warn[A-Z][A-Za-z0-9 ]+', subaddition): continue # Don't mention warnings.
+            if subaddition in IgnoredModulators: continue # We ignore modulators which are internal to the engine.
+            label += ' {}'.format(subaddition) #  Then we iterate through each distinct subcondition and display it without the dashes between them.
+   CardsAALabels[Autoscript] = label
+   debugNotify("<<< abilityLabel() by returning: {}".format(label), 3)
+   return label
+
 def chkNoisy(card): # Check if the player successfully used a noisy icebreaker, and if so, give them the consequences...
    debugNotify(">>> chkNoisy()") #Debug
    if re.search(r'Noisy', fetchProperty(card, 'Keywords')) and re.search(r'Icebreaker', fetchProperty(card, 'Keywords')):
@@ -1952,10 +1967,8 @@ def penaltyNoisy(card):
       if NoisyCost:
          total = 0
          cost = num(NoisyCost.group(1))
-         stealthCards = [c for c in table
-                        if c.controller == me
-                        and c.isFaceUp
-                        and re.search(r'Stealth',getKeywords(c))
+         stealthCards = [c for c in queryTable(controller = me, rezzed = True)
+                        if re.search(r'Stealth',getKeywords(c))
                         and c.markers[mdict['Credits']]]
          debugNotify("{} cards found".format(len(stealthCards)), 2)
          for Scard in sortPriority(stealthCards):
@@ -1964,7 +1977,7 @@ def penaltyNoisy(card):
                Scard.markers[mdict['Credits']] -= 1
                cost -= 1
                total += 1
-      notify("--> {}'s {} has destroyed a total of {} credits on stealth cards".format(me,card,total))
+      announce("--> {}'s {} has destroyed a total of {} credits on stealth cards".format(me,card,total))
    debugNotify("<<< penaltyNoisy()", 3) #Debug
 
 def autoscriptCostUndo(card, Autoscript): # Function for undoing the cost of an autoscript.
@@ -1975,7 +1988,7 @@ def autoscriptCostUndo(card, Autoscript): # Function for undoing the cost of an
    me.counters['Credits'].value += num(actionCost.group(2))
    me.counters['Agenda Points'].value += num(actionCost.group(3))
    if re.search(r"T2:", Autoscript):
-      random = rnd(10,5000) # A little wait...
+      waitFor(None, 1, label = 'autoscriptCostUndo') # One round trip so that the card is turned on the server before we turn it back.
       card.orientation = Rot0
 
 def findTarget(Autoscript, fromHand = False, card = None): # Function for finding the target of an autoscript
@@ -1986,32 +1999,26 @@ def findTarget(Autoscript, fromHand = False, card = None): # Function for findin
       foundTargets = []
       if re.search(r'Targeted', Autoscript):
          requiredAllegiances = []
-         targetGroups = prepareRestrictions(Autoscript)
+         targeting = compileTargeting(Autoscript)
+         targetGroups = targeting['groups']
          debugNotify("### About to start checking all targeted cards.\n### targetGroups:{}".format(targetGroups), 2) #Debug
-         for targetLookup in group: # Now that we have our list of restrictions, we go through each targeted card on the table to check if it matches.
-            if (targetLookup.targetedBy and targetLookup.targetedBy == me) or (re.search(r'AutoTargeted', Autoscript) and targetLookup.highlight != DummyColor and targetLookup.highlight != RevealedColor and targetLookup.highlight != InactiveColor):
-            # OK the above target check might need some decoding:
-            # Look through all the cards on the group and start checking only IF...
-            # * Card is targeted and targeted by the player OR target search has the -AutoTargeted modulator and it is NOT highlighted as a Dummy, Inactive or Revealed.
-            # * The player who controls this card is supposed to be me or the enemy.
-               debugNotify("### Checking {}".format(targetLookup), 2)
-               if not checkSpecialRestrictions(Autoscript,targetLookup): continue
-               if re.search(r'-onHost',Autoscript):
-                  debugNotify("### Looking for Host", 2)
-                  if not card: continue # If this targeting script targets only a host and we have not passed what the attachment is, we cannot find the host, so we abort.
-                  debugNotify("### Attachment is: {}".format(card), 2)
-                  hostCards = eval(getGlobalVariable('Host Cards'))
-                  isHost = False
-                  for attachment in hostCards:
-                     if attachment == card._id and hostCards[attachment] == targetLookup._id:
-                        debugNotify("### Host found! {}".format(targetLookup), 2)
-                        isHost = True
-                  if not isHost: continue
-               if checkCardRestrictions(gatherCardProperties(targetLookup,Autoscript), targetGroups):
-                  if not targetLookup in foundTargets:
-                     debugNotify("### About to append {}".format(targetLookup), 3) #Debug
-                     foundTargets.append(targetLookup) # I don't know why but the first match is always processed twice by the for loop.
-               else: debugNotify("### findTarget() Rejected {}".format(targetLookup), 3)# Debug
+         if targeting['onHost']:
+            if card: # If this targeting script targets only a host and we have not passed what the attachment is, we cannot find the host.
+               hostCards = eval(getGlobalVariable('Host Cards'))
+               hostID = hostCards.get(card._id,None)
+            else: hostID = None
+         for targetLookup in targetCandidates(Autoscript, group): # Now that we have our list of restrictions, we go through each possible target to check if it matches.
+            debugNotify("### Checking {}".format(targetLookup), 2)
+            if not checkSpecialRestrictions(Autoscript,targetLookup): continue
+            if targeting['onHost']:
+               debugNotify("### Looking for Host", 2)
+               if not hostID or hostID != targetLookup._id: continue
+               debugNotify("### Host found! {}".format(targetLookup), 2)
+            if checkCardRestrictions(gatherCardProperties(targetLookup,Autoscript), targetGroups):
+               if not targetLookup in foundTargets:
+                  debugNotify("### About to append {}".format(targetLookup), 3) #Debug
+                  foundTargets.append(targetLookup) # I don't know why but the first match is always processed twice by the for loop.
+            else: debugNotify("### findTarget() Rejected {}".format(targetLookup), 3)# Debug
          debugNotify("### Finished seeking. foundTargets List = {}".format([T.name for T in foundTargets]), 2)
          if re.search(r'DemiAutoTargeted', Autoscript):
             debugNotify("### Checking DemiAutoTargeted switches", 2)# Debug
@@ -2043,7 +2050,7 @@ def findTarget(Autoscript, fromHand = False, card = None): # Function for findin
                if len(mergedList) > 0: targetsText += "not {}".format(mergedList)
                if targetsText.endswith(' and '): targetsText = targetsText[:-len(' and ')]
             debugNotify("### About to chkPlayer()", 2)# Debug
-            if not chkPlayer(Autoscript, targetLookup.controller, False, True):
+            if not chkPlayer(Autoscript, me, False, True): # If the script cannot target our own cards, then we mention the allegiance it requires.
                allegiance = re.search(r'by(Opponent|Me)', Autoscript)
                requiredAllegiances.append(allegiance.group(1))
             if len(requiredAllegiances) > 0: targetsText += "\n00 Valid Target Allegiance: {}.".format(requiredAllegiances)
@@ -2069,6 +2076,41 @@ def findTarget(Autoscript, fromHand = False, card = None): # Function for findin
       return foundTargets
    except: notify("!!!ERROR!!! on findTarget()")
 
+def compileTargeting(Autoscript): # Parses the targeting restrictions of a script only once, so that findTarget() can prefilter its candidates cheaply.
+   if CompiledTargeting.has_key(Autoscript): return CompiledTargeting[Autoscript]
+   targetGroups = prepareRestrictions(Autoscript)
+   requiredTypes = set() # The card types a target can possibly have. A candidate needs to have one of them in order to match any of the restriction groups.
+   for restrictionsGroup in targetGroups:
+      groupTypes = [restriction for restriction in restrictionsGroup[0] if restriction in CorporationCardTypes or restriction in RunnerCardTypes]
+      if not groupTypes: # If any of the groups doesn't require a specific type, then we cannot filter by type at all.
+         requiredTypes = None
+         break
+      requiredTypes.add(groupTypes[0])
+   if re.search(r'isRezzed',Autoscript): rezzed = True
+   elif re.search(r'isUnrezzed',Autoscript): rezzed = False
+   else: rezzed = None
+   CompiledTargeting[Autoscript] = {'groups' : targetGroups, # The output of prepareRestrictions()
+                                    'types'  : requiredTypes or None, # The possible card types of the target, or None if it can be anything.
+                                    'rezzed' : rezzed, # True/False if the target needs to be rezzed/unrezzed, None otherwise
+                                    'auto'   : bool(re.search(r'AutoTargeted', Autoscript)),
+                                    'onHost' : bool(re.search(r'-onHost',Autoscript))}
+   return CompiledTargeting[Autoscript]
+
+def targetCandidates(Autoscript, group): # Returns the cards in a group that findTarget() needs to examine for a script.
+# Cards targeted by the player are always candidates.
+# For -AutoTargeted scripts, we also take any card which is not highlighted as a Dummy, Inactive or Revealed,
+# but we discard beforehand those whose rez status or stored type cannot possibly match, so that we don't gather their properties for nothing.
+   targeting = compileTargeting(Autoscript)
+   candidates = []
+   for c in group:
+      if c.targetedBy and c.targetedBy == me: candidates.append(c)
+      elif targeting['auto'] and c.highlight != DummyColor and c.highlight != RevealedColor and c.highlight != InactiveColor:
+         if targeting['rezzed'] != None and c.isFaceUp != targeting['rezzed']: continue
+         if targeting['types'] and Stored_Type.get(c._id,'?') != '?' and Stored_Type[c._id] not in targeting['types']: continue # Cards whose type we haven't stored yet are always checked fully.
+         candidates.append(c)
+   debugNotify("### targetCandidates() found {} candidates".format(len(candidates)), 3)
+   return candidates
+
 def gatherCardProperties(card,Autoscript = ''):
    debugNotify(">>> gatherCardProperties()") #Debug
    storeProperties(card) # We store the card properties so that we don't start flipping the cards over each time.
@@ -2294,68 +2336,71 @@ def ofwhom(Autoscript, controller = me):
    if debugVerbosity >= 3:  notify("<<< ofwhom() returning {}".format(targetPL.name))
    return targetPL
 
+def compilePer(Autoscript): # Parses the per<Something> part of a script only once and stores the result, so that per() doesn't have to regex the script every time.
+   if CompiledPer.has_key(Autoscript): return CompiledPer[Autoscript]
+   perRegex = re.search(r'\b(per|upto)(Target|Host|Every)?([A-Z][^-]*)-?', Autoscript) # We're searching for the word per, and grabbing all after that, until the first dash "-" as the variable.
+   if not perRegex: compiled = None
+   else:
+      perWhat = perRegex.group(3)
+      if perWhat == 'X': source = ('X', None)
+      elif re.search(r'Marker',perWhat): source = ('Marker', re.search(r'Marker{([\w ]+)}',perWhat).group(1)) # I don't understand why I had to make the curly brackets optional, but it seens atTurnStart/End completely eats them when it parses the CardsAS.get(card.model,'')
+      elif re.search(r'Property',perWhat): source = ('Property', re.search(r'Property{([\w ]+)}',perWhat).group(1))
+      elif re.search(r'Counter',perWhat):
+         if re.search(r'MyCounter',perWhat): source = ('MyCounter', re.search(r'Counter{([\w ]+)}',perWhat).group(1))
+         else: source = ('Counter', re.search(r'Counter{([\w ]+)}',perWhat).group(1))
+      else: source = (None, None)
+      ignS = re.search(r'-ignore([0-9]+)',Autoscript)
+      divS = re.search(r'-div([0-9]+)',Autoscript)
+      compiled = {'type'   : perRegex.group(2), # Target, Host, Every or None
+                  'source' : source, # A tuple of what we're multiplying with (Marker, Property, Counter etc) and its name.
+                  'ignore' : ignS and num(ignS.group(1)) or 0,
+                  'div'    : divS and num(divS.group(1)) or 1}
+   CompiledPer[Autoscript] = compiled
+   return compiled
+
 def per(Autoscript, card = None, count = 0, targetCards = None, notification = None): # This function goes through the autoscript and looks for the words "per<Something>". Then figures out what the card multiplies its effect with, and returns the appropriate multiplier.
    debugNotify(">>> per(){}".format(extraASDebug(Autoscript))) #Debug
    if targetCards is None: targetCards = []
    div = 1
    ignore = 0
-   per = re.search(r'\b(per|upto)(Target|Host|Every)?([A-Z][^-]*)-?', Autoscript) # We're searching for the word per, and grabbing all after that, until the first dash "-" as the variable.
+   per = compilePer(Autoscript)
    if per: # If the  search was successful...
       multiplier = 0
-      debugNotify("Groups: {}. Count: {}".format(per.groups(),count), 2) #Debug
-      if per.group(2) and (per.group(2) == 'Target' or per.group(2) == 'Every'): # If we're looking for a target or any specific type of card, we need to scour the requested group for targets.
+      perType = per['type']
+      source, sourceName = per['source']
+      debugNotify("Compiled per: {}. Count: {}".format(per,count), 2) #Debug
+      if perType == 'Target' or perType == 'Every': # If we're looking for a target or any specific type of card, we need to scour the requested group for targets.
          debugNotify("Checking for Targeted per", 2)
-         if per.group(2) == 'Target' and len(targetCards) == 0:
+         if perType == 'Target' and len(targetCards) == 0:
             delayed_whisper(":::ERROR::: Script expected a card targeted but found none! Exiting with 0 multiplier.")
             # If we were expecting a target card and we have none we shouldn't even be in here. But in any case, we return a multiplier of 0
-         elif per.group(2) == 'Every' and len(targetCards) == 0: pass #If we looking for a number of cards and we found none, then obviously we return 0
+         elif perType == 'Every' and len(targetCards) == 0: pass #If we looking for a number of cards and we found none, then obviously we return 0
          else:
-            if per.group(2) == 'Host':
-               debugNotify("Checking for perHost", 2)
-               hostCards = eval(getGlobalVariable('Host Cards'))
-               hostID = hostCards.get(card._id,None)
-               if hostID: # If we do not have a parent, then we do nothing and return 0
-                  targetCards = [Card(hostID)] # if we have a host, we make him the only one in the list of cards to process.
             for perCard in targetCards:
                debugNotify("perCard = {}".format(perCard), 2)
-               if re.search(r'Marker',per.group(3)):
-                  markerName = re.search(r'Marker{([\w ]+)}',per.group(3)) # I don't understand why I had to make the curly brackets optional, but it seens atTurnStart/End completely eats them when it parses the CardsAS.get(card.model,'')
-                  marker = findMarker(perCard, markerName.group(1))
+               if source == 'Marker':
+                  marker = findMarker(perCard, sourceName)
                   if marker: multiplier += perCard.markers[marker]
-               elif re.search(r'Property',per.group(3)):
-                  property = re.search(r'Property{([\w ]+)}',per.group(3))
-                  multiplier += num(perCard.properties[property.group(1)])
+               elif source == 'Property': multiplier += num(perCard.properties[sourceName])
                else: multiplier += 1 # If there's no special conditions, then we just add one multiplier per valid (auto)target. Ef. "-perEvery-AutoTargeted-onICE" would give 1 multiplier per ICE on the table
       else: #If we're not looking for a particular target, then we check for everything else.
          debugNotify("### Doing no table lookup", 2) # Debug.
-         if per.group(3) == 'X': multiplier = count # Probably not needed and the next elif can handle alone anyway.
+         if source == 'X': multiplier = count # Probably not needed and the next elif can handle alone anyway.
          elif count: multiplier = num(count) * chkPlayer(Autoscript, card.controller, False) # All non-special-rules per<somcething> requests use this formula.
                                                                                               # Usually there is a count sent to this function (eg, number of favour purchased) with which to multiply the end result with
                                                                                               # and some cards may only work when a rival owns or does something.
-         elif re.search(r'Marker',per.group(3)):
-            markerName = re.search(r'Marker{([\w ]+)}',per.group(3)) # I don't understand why I had to make the curly brackets optional, but it seens atTurnStart/End completely eats them when it parses the CardsAS.get(card.model,'')
-            marker = findMarker(card, markerName.group(1))
+         elif source == 'Marker':
+            marker = findMarker(card, sourceName)
             if marker: multiplier = card.markers[marker]
             else: multiplier = 0
-         elif re.search(r'Property',per.group(3)):
-            property = re.search(r'Property{([\w ]+)}',per.group(3))
-            multiplier = num(card.properties[property.group(1)])
-         elif re.search(r'Counter',per.group(3)):
+         elif source == 'Property': multiplier = num(card.properties[sourceName])
+         elif source == 'MyCounter' or source == 'Counter':
             debugNotify("### Checking perCounter", 2) # Debug.
-            counter = re.search(r'Counter{([\w ]+)}',per.group(3))
-            if re.search(r'MyCounter',per.group(3)):
-               if card.controller == me: player = me
-               else: player = findOpponent()
-            else:
-               if card.controller == me: player = findOpponent()
-               else: player = me
-            multiplier = player.counters[counter.group(1)].value
-      debugNotify("### Checking ignore", 2) # Debug.
-      ignS = re.search(r'-ignore([0-9]+)',Autoscript)
-      if ignS: ignore = num(ignS.group(1))
-      debugNotify("### Checking div", 2) # Debug.
-      divS = re.search(r'-div([0-9]+)',Autoscript)
-      if divS: div = num(divS.group(1))
+            if (source == 'MyCounter') == (card.controller == me): player = me
+            else: player = findOpponent()
+            multiplier = player.counters[sourceName].value
+      ignore = per['ignore']
+      div = per['div']
    else: multiplier = 1
    debugNotify("<<< per() with Multiplier: {}".format((multiplier - ignore) / div), 2) # Debug
    return (multiplier - ignore) / div
@@ -2364,18 +2409,17 @@ def ifHave(Autoscript,controller = me,silent = False):
 # A functions that checks if a player has a specific property at a particular level or not and returns True/False appropriately
    debugNotify(">>> ifHave(){}".format(extraASDebug(Autoscript))) #Debug
    Result = True
-   ifHave = re.search(r"\bif(I|Opponent)(Have|Hasn't)([0-9]+)([A-Za-z ]+)",Autoscript)
+   if not CompiledIfHave.has_key(Autoscript): # We only parse each script once.
+      ifHaveRegex = re.search(r"\bif(I|Opponent)(Have|Hasn't)([0-9]+)([A-Za-z ]+)",Autoscript)
+      if ifHaveRegex: CompiledIfHave[Autoscript] = (ifHaveRegex.group(1), ifHaveRegex.group(2), num(ifHaveRegex.group(3)), ifHaveRegex.group(4))
+      else: CompiledIfHave[Autoscript] = None
+   ifHave = CompiledIfHave[Autoscript]
    if ifHave:
-      debugNotify("### ifHave groups: {}".format(ifHave.groups()), 3)
-      if ifHave.group(1) == 'I':
-         if controller == me: player = me
-         else: player = findOpponent()
-      else:
-         if controller == me: player = findOpponent()
-         else: player = me
-      count = num(ifHave.group(3))
-      property = ifHave.group(4)
-      if ifHave.group(2) == 'Have': # 'Have' means that we're looking for a counter value that is equal or higher than the count
+      debugNotify("### ifHave compiled: {}".format(ifHave), 3)
+      whose, condition, count, property = ifHave
+      if (whose == 'I') == (controller == me): player = me
+      else: player = findOpponent()
+      if condition == 'Have': # 'Have' means that we're looking for a counter value that is equal or higher than the count
          if not player.counters[property].value >= count:
             Result = False # If we're looking for the player having their counter at a specific level and they do not, then we return false
             if not silent: delayed_whisper(":::ERROR::: You need at least {} {} to use this effect".format(property,count))
@@ -2406,12 +2450,12 @@ def chkPlayer(Autoscript, controller, manual, targetChk = False): # Function for
 # This will probably make no sense when I read it in 10 years...
    debugNotify(">>> chkPlayer(). Controller is: {}".format(controller)) #Debug
    try:
-      if targetChk: # If set to true, it means we're checking from the findTarget() function, which needs a different keyword in case we end up with two checks on a card's controller on the same script
-         byOpponent = re.search(r'targetOpponents', Autoscript)
-         byMe = re.search(r'targetMine', Autoscript)
-      else:
-         byOpponent = re.search(r'(byOpponent|duringOpponentTurn|forOpponent)', Autoscript)
-         byMe = re.search(r'(byMe|duringMyTurn|forMe)', Autoscript)
+      if not CompiledPlayerChk.has_key((Autoscript,targetChk)): # We only parse each script once.
+         if targetChk: # If set to true, it means we're checking from the findTarget() function, which needs a different keyword in case we end up with two checks on a card's controller on the same script
+            CompiledPlayerChk[(Autoscript,targetChk)] = (bool(re.search(r'targetOpponents', Autoscript)), bool(re.search(r'targetMine', Autoscript)))
+         else:
+            CompiledPlayerChk[(Autoscript,targetChk)] = (bool(re.search(r'(byOpponent|duringOpponentTurn|forOpponent)', Autoscript)), bool(re.search(r'(byMe|duringMyTurn|forMe)', Autoscript)))
+      byOpponent, byMe = CompiledPlayerChk[(Autoscript,targetChk)]
       if manual or len(players) == 1: # If there's only one player, we always return true for debug purposes.
          debugNotify("### Succeeded at Manual/Debug", 2)
          validPlayer = 1 #manual means that the clicks was called by a player double clicking on the card. In which case we always do it.
@@ -78,6 +78,10 @@ place = dict( # A table holding tuples with the original location various card t
             Asset =                 (-10, 248, -30, 13, -1), # Temporary.
             Agenda =                (-10, 248, -30, 13, -1) # Temporary.
             )
+placeShared = dict( # Card types which take their placement slots from the same row as another type.
+            Asset =                 'Agenda', # camouflage until I create function to install them on specific Server, via targeting.
+            Upgrade =               'Agenda'
+            )
                
 markerRemovals = { # A dictionary which holds the costs to remove various special markers.
                        # The costs are in a tuple. First is clicks cost and then is credit cost.
@@ -21,7 +21,7 @@
 # * [Card Placement] Are dealing with placing or figuring where to place cards on the table
 ###=================================================================================================================###
 
-import re
+import re, random
 
 try:
     import os
@@ -41,6 +41,14 @@ Stored_Keywords = {}
 Stored_Cost = {}
 Stored_AutoActions = {}
 Stored_AutoScripts = {}
+ModelProperties = {} # The printed (Name, Cost, Type, Keywords) of each card model we've already read once. See storePileProperties()
+
+CoverGUID = "ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b" # The model of the dummy card we use to hide face-down cards and piles while we peek at them.
+CoverPool = [] # The IDs of our cover cards which are currently hidden in the exile pile and can be reused.
+WaitMetrics = {'calls' : 0, 'roundTrips' : 0, 'immediate' : 0, 'timeouts' : 0} # How many times we've called waitFor(), how many round trips it made, how many times the data was already there and how many times we gave up.
+LiveCovers = [] # The IDs of our cover cards which are currently covering something on the table or on a pile.
+CardSampler = random.Random() # The random generator we pick random cards with. See sampleCards()
+CompiledTraceEffects = {} # The (success, failure) effects we've already compiled out of each trace script. See compileTraceEffects()
 
 #---------------------------------------------------------------------------
 # Custom Windows Forms
@@ -493,19 +501,11 @@ def storeProperties(card, forced = False): # Function that grabs a cards importa
          if not card.isFaceUp and card.group == table:
             debugNotify("### Adding Cover", 2)
             x,y = card.position
-            cover = table.create("ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b",x,y,1,False)
-            cover.moveToTable(x,y,False)
+            cover = getCover(x,y)
             if card.orientation == Rot90: cover.orientation = Rot90
             coverExists = True
             card.isFaceUp = True
-            loopcount = 0
-            while card.name == 'Card':
-               debugNotify("### Loop {} while searching for properties".format(loopcount), 4)
-               rnd(1,10)
-               loopcount += 1
-               if loopcount == 5:
-                  whisper(":::Error::: Card properties can't be grabbed. Aborting!")
-                  break
+            if not waitFor(lambda: card.name != 'Card', label = 'storeProperties'): whisper(":::Error::: Card properties can't be grabbed. Aborting!")
       if Stored_Type.get(card._id,'?') == '?' or (Stored_Name.get(card._id,'?') != card.Name and card.Name != '?') or forced:
          debugNotify("### {} not stored. Storing...".format(card), 3)
          Stored_Name[card._id] = card.Name
@@ -519,11 +519,27 @@ def storeProperties(card, forced = False): # Function that grabs a cards importa
          debugNotify("### Removing Cover", 2)
          card.isFaceUp = False
          if card.controller == me: card.peek()
-         rnd(1,10) # To give time to the card facedown automation to complete.
-         cover.moveTo(shared.exile) # now destorying cover card
+         waitFor(None, 1, label = 'storeProperties facedown') # One round trip so that the card is face down on the server before its cover goes away. Its local state turns face down at once, so there's nothing we can check for that.
+         releaseCover(cover) # now putting the cover card back in our pool
       debugNotify("<<< storeProperties()", 3)
    except: notify("!!!ERROR!!! In storeProperties()")
 
+def storePileProperties(cards): # Stores the properties of a batch of cards which are not on the table, reading each card model only once.
+# Cards in piles have no markers to modify their keywords and cannot be face-down on the table, so their printed properties are all we need and every copy of a model shares them.
+   debugNotify(">>> storePileProperties(){}".format(extraASDebug())) #Debug
+   global Stored_Name, Stored_Cost, Stored_Type, Stored_Keywords, Stored_AutoActions, Stored_AutoScripts
+   for card in cards:
+      if Stored_Type.get(card._id,'?') != '?': continue # Already stored.
+      properties = ModelProperties.get(card.model,None)
+      if not properties:
+         if card.Name == '?': continue # We cannot see this card, so we leave it for storeProperties() to grab later.
+         properties = (card.Name, card.Cost, card.Type, '-'.join([KW.strip() for KW in card.Keywords.split('-') if KW.strip()]))
+         ModelProperties[card.model] = properties
+      Stored_Name[card._id], Stored_Cost[card._id], Stored_Type[card._id], Stored_Keywords[card._id] = properties
+      Stored_AutoActions[card._id] = CardsAA.get(card.model,'')
+      Stored_AutoScripts[card._id] = CardsAS.get(card.model,'')
+   debugNotify("<<< storePileProperties(). Models known: {}".format(len(ModelProperties)), 3)
+
 def fetchProperty(card, property): 
    mute()
    coverExists = False
@@ -540,8 +556,7 @@ def fetchProperty(card, property):
       if not card.isFaceUp and card.group == table:
          debugNotify("### Need to flip card up to read its properties.", 3) #Debug
          x,y = card.position
-         cover = table.create("ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b",x,y,1,False)
-         cover.moveToTable(x,y,False)
+         cover = getCover(x,y)
          if card.orientation == Rot90: cover.orientation = Rot90
          coverExists = True
          card.isFaceUp = True
@@ -555,16 +570,42 @@ def fetchProperty(card, property):
    if coverExists: 
       card.isFaceUp = False
       if card.controller == me: card.peek()
-      rnd(1,10) # To give time to the card facedown automation to complete.
-      cover.moveTo(shared.exile) # now destorying cover card
+      waitFor(None, 1, label = 'fetchProperty facedown') # One round trip so that the card is face down on the server before its cover goes away. Its local state turns face down at once, so there's nothing we can check for that.
+      releaseCover(cover) # now putting the cover card back in our pool
    debugNotify("<<< fetchProperty() by returning: {}".format(currentValue), 3)
    if not currentValue: currentValue = ''
    return currentValue
 
-def clearCovers(): # Functions which goes through the table and clears any cover cards
+#---------------------------------------------------------------------------
+# Cover Cards
+#---------------------------------------------------------------------------
+
+def getCover(x = 0, y = 0, pile = None): # Returns a cover card placed at x,y on the table or on top of the given pile, reusing one of our old covers when we have one.
+   debugNotify(">>> getCover(){}".format(extraASDebug())) #Debug
+   global CoverPool, LiveCovers
+   cover = None
+   while len(CoverPool) > 0 and not cover:
+      cover = Card(CoverPool.pop())
+      if cover.group != shared.exile or cover.controller != me: cover = None # If someone else moved or took over our spare cover, we forget about it.
+   if not cover: cover = table.create(CoverGUID,x,y,1,True) # We only create a new cover if there's none left in the pool. It has to be persistent, or it would be destroyed when we hide it in the exile for reuse.
+   else: cover.orientation = Rot0 # A reused cover might still have the rotation of the card it last covered.
+   if pile != None: cover.moveTo(pile)
+   else: cover.moveToTable(x,y,False)
+   LiveCovers.append(cover._id)
+   debugNotify("<<< getCover() with cover ID {}. Pooled covers: {}".format(cover._id,len(CoverPool)), 3) #Debug
+   return cover
+
+def releaseCover(cover): # Hides a cover card we're done with and puts it back in the pool so that it can be reused.
+   debugNotify(">>> releaseCover(){}".format(extraASDebug())) #Debug
+   global CoverPool, LiveCovers
+   cover.moveTo(shared.exile) # We cannot delete cards so we just hide it in the exile deck that nobody looks at.
+   if cover._id in LiveCovers: LiveCovers.remove(cover._id)
+   if cover._id not in CoverPool: CoverPool.append(cover._id)
+   debugNotify("<<< releaseCover()", 3) #Debug
+
+def clearCovers(): # Functions which goes through our live cover cards and clears them
    debugNotify(">>> clearCovers()") #Debug
-   for cover in table:
-      if cover.model == 'ac3a3d5d-7e3a-4742-b9b2-7f72596d9c1b': cover.moveTo(shared.exile)
+   for coverID in list(LiveCovers): releaseCover(Card(coverID))
 
 def findOpponent():
    # Just a quick function to make the code more readable
@@ -572,13 +613,9 @@ def findOpponent():
    
 def loopChk(card,property = 'Type'):
    debugNotify(">>> loopChk(){}".format(extraASDebug())) #Debug
-   loopcount = 0
-   while card.properties[property] == '?':
-      rnd(1,10)
-      loopcount += 1
-      if loopcount == 5:
-         whisper(":::Error::: Card property can't be grabbed. Aborting!")
-         return 'ABORT'
+   if not waitFor(lambda: card.properties[property] != '?', label = 'loopChk'):
+      whisper(":::Error::: Card property can't be grabbed. Aborting!")
+      return 'ABORT'
    debugNotify("<<< loopChk()", 4) #Debug
    return 'OK'         
    
@@ -614,12 +651,75 @@ def oncePerTurn(card, x = 0, y = 0, silent = False, act = 'manual'):
          if not silent and act != 'dryRun': notify('{} activates the once-per-turn ability of {} another time'.format(me, card))
    else:
       if not silent and act != 'dryRun': notify('{} activates the once-per-turn ability of {}'.format(me, card))
-   if act != 'dryRun': card.orientation = Rot90
+   if act != 'dryRun': exhaustCard(card)
    debugNotify("<<< oncePerTurn() exit OK", 3) #Debug
 
-def delayed_whisper(text): # Because whispers for some reason execute before notifys
-   rnd(1,10)
-   whisper(text)   
+def exhaustCard(card): # Turns a card sideways to show its once-per-turn ability has been used, and records it so that only such cards are refreshed at the start/end of turn.
+# Each player records the cards they exhausted in their own player variable, so that two clients never overwrite each other's records.
+   card.orientation = Rot90
+   exhaustedCards = eval(me.getGlobalVariable('Exhausted Cards'))
+   if card._id not in exhaustedCards:
+      exhaustedCards.append(card._id)
+      me.setGlobalVariable('Exhausted Cards',str(exhaustedCards))
+
+def delayed_whisper(text): # Because whispers for some reason execute before notifys, we queue them to be sent in order at the end of the action.
+   queueMessage(text)
+
+def waitFor(predicate, maxRoundTrips = 5, backoff = 1, label = ''):
+# Waits until predicate() returns True, by forcing server round trips with rnd() only while it doesn't, so that we don't pay for them when the data has already arrived.
+# After every check that fails, the round trips before the next check are multiplied by backoff. A predicate of None just forces maxRoundTrips round trips.
+# Returns True when the predicate came true, or False if we gave up after maxRoundTrips.
+   WaitMetrics['calls'] += 1
+   roundTrips = 0
+   batch = 1
+   while predicate == None or not predicate():
+      if roundTrips >= maxRoundTrips:
+         if predicate != None:
+            WaitMetrics['timeouts'] += 1
+            WaitMetrics['roundTrips'] += roundTrips # The round trips we spent before giving up still count.
+            debugNotify("### waitFor({}) gave up after {} round trips".format(label,roundTrips), 2)
+            return False
+         break
+      for iter in range(min(batch, maxRoundTrips - roundTrips)): rnd(1,10)
+      roundTrips += min(batch, maxRoundTrips - roundTrips)
+      batch = max(1, int(batch * backoff))
+   if roundTrips == 0: WaitMetrics['immediate'] += 1
+   WaitMetrics['roundTrips'] += roundTrips
+   debugNotify("### waitFor({}) took {} round trips".format(label,roundTrips), 4)
+   return True
+
+def seedSampler(seed = None): # Seeds the generator of sampleCards(), so that its picks can be repeated. A seed of None reseeds it from the system.
+   CardSampler.seed(seed)
+
+def sampleCards(group, count): # Picks count different cards at random out of a group, or all of them if it doesn't have as many.
+# We pick them all in one go out of a snapshot of the group, instead of asking the group for a random card every time we move one out of it.
+   cards = list(group)
+   if count > len(cards): count = len(cards)
+   if count <= 0: return []
+   return CardSampler.sample(cards, count)
+
+#---------------------------------------------------------------------------
+# Trace Records
+#---------------------------------------------------------------------------
+
+def compileTraceEffects(Autoscript): 
+# Returns the (success, failure) effects of a trace script. Each one is a list of the alternative script chains ('||'), and each chain a list of the scripts it runs ('++').
+# We only parse each script once, so starting the same trace again doesn't need to search for its effects again.
+   if not CompiledTraceEffects.has_key(Autoscript):
+      traceEffects = re.search(r'-traceEffects<(.*?),(.*?)>', Autoscript)
+      compiled = []
+      for effect in (traceEffects and traceEffects.groups()) or ('None','None'):
+         if effect == 'None': compiled.append([])
+         else: compiled.append([autoS.split('++') for autoS in effect.split('||')])
+      CompiledTraceEffects[Autoscript] = tuple(compiled)
+   return CompiledTraceEffects[Autoscript]
+
+def traceRecord(cardID = None, base = 0, Autoscript = ''): # Returns a new trace record: The card which started the trace, its base strength, the corp's bid and the precompiled success and failure effects.
+   success, failure = compileTraceEffects(Autoscript)
+   return {'card' : cardID, 'base' : base, 'bid' : 0, 'success' : success, 'failure' : failure}
+
+def traceSucceeds(record, link): # Returns True if the trace of this record beats the runner's total link.
+   return record['base'] + record['bid'] > link
 #---------------------------------------------------------------------------
 # Card Placement functions
 #---------------------------------------------------------------------------
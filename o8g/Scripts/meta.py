@@ -57,6 +57,15 @@ turn = 0 # used during game reporting to report how many turns the game lasted
 
 CardsAA = {} # Dictionary holding all the AutoAction scripts for all cards
 CardsAS = {} # Dictionary holding all the AutoScript scripts for all cards
+CardsAALabels = {} # Dictionary holding the ability menu label for each AutoAction script, so that we don't have to rebuild it every time a card is used.
+TableIndex = {} # A dictionary holding the IDs of the cards on the table, grouped in sets by card type. See queryTable()
+TableIndexTypes = {} # The reverse of the above. Which type each indexed card has been filed under.
+TableIndexOwners = {} # Which player ID controlled each indexed card when we last looked, so that queryTable() can tell when control has moved without us.
+CloudPrograms = {} # The IDs of the programs in play, along with the Base Link they require to be put in the cloud, or None if they can't be. See chkCloud()
+CloudLinkChecked = {} # The Base Link value each player had the last time we checked their cloud programs.
+SpecialsCache = {} # For each player ID, the specialCards string we last read from them along with the Card objects it points to. See getSpecial()
+CardHandles = {} # The Card objects we've already created, by their ID, so that we can reuse them. See cardHandle()
+placeGeometry = {} # The place tuples with the card width already worked into each type's spacing, so that we only measure a card once. See slotPosition()
 
 
 #---------------------------------------------------------------------------
@@ -196,13 +205,20 @@ def storeSpecial(card):
          specialCards[card.name] = card._id # The central servers we find via name
       else: specialCards[card.Type] = card._id
       me.setGlobalVariable('specialCards', str(specialCards))
+      SpecialsCache.pop(me._id,None) # Our specials have changed, so the next getSpecial() needs to read them again.
    except: notify("!!!ERROR!!! In storeSpecial()")
 
 def getSpecial(cardType,player = me):
 # Functions takes as argument the name of a special card, and the player to whom it belongs, and returns the card object.
+# We only eval the player's specialCards when they've been changed by storeSpecial(). We can't be told when the opponent does that, so we also compare the string we last read.
    debugNotify(">>> getSpecial() for player: {}".format(me.name)) #Debug
-   specialCards = eval(player.getGlobalVariable('specialCards'))
-   card = Card(specialCards[cardType])
+   specialsString = player.getGlobalVariable('specialCards')
+   cachedSpecials = SpecialsCache.get(player._id,None)
+   if not cachedSpecials or cachedSpecials[0] != specialsString:
+      specialCards = eval(specialsString)
+      cachedSpecials = (specialsString, dict([(special, cardHandle(specialCards[special])) for special in specialCards]))
+      SpecialsCache[player._id] = cachedSpecials
+   card = cachedSpecials[1][cardType]
    debugNotify("### Stored_Type = {}".format(Stored_Type.get(card._id,'NULL')), 2)
    if Stored_Type.get(card._id,'NULL') == 'NULL':
       #if card.owner == me: delayed_whisper(":::DEBUG::: {} was NULL. Re-storing as an attempt to fix".format(cardType)) # Debug
@@ -212,12 +228,20 @@ def getSpecial(cardType,player = me):
    debugNotify("<<< getSpecial() by returning: {}".format(card), 3)
    return card
 
+def cardHandle(cardID): # Returns the Card object for a card ID, creating it only the first time we're asked for it.
+   card = CardHandles.get(cardID,None)
+   if not card:
+      card = Card(cardID)
+      CardHandles[cardID] = card
+   return card
+
 def chkRAM(card, action = 'INSTALL', silent = False):
    debugNotify(">>> chkRAM(){}".format(extraASDebug())) #Debug
    MUreq = num(fetchProperty(card,'Requirement'))
    hostCards = eval(getGlobalVariable('Host Cards'))
-   if hostCards.has_key(card._id): hostC = Card(hostCards[card._id])
+   if hostCards.has_key(card._id): hostC = cardHandle(hostCards[card._id])
    else: hostC = None
+   if action == 'UNINSTALL': CloudPrograms.pop(card._id,None) # A program leaving play doesn't need to be checked for the cloud anymore.
    if (MUreq > 0
          and not (card.markers[mdict['DaemonMU']] and not re.search(r'Daemon',getKeywords(card)))
          and not findMarker(card,'Daemon Hosted MU')
@@ -242,27 +266,62 @@ def chkRAM(card, action = 'INSTALL', silent = False):
    debugNotify("<<< chkRAM() by returning: {}".format(MUtext), 3)
    return MUtext
 
-def chkCloud(cloudCard = None): # A function which checks the table for cards which can be put in the cloud and thus return their used MUs
+def chkCloud(cloudCard = None): # A function which checks the cloud programs in play and returns or takes away their used MUs according to their controller's Base Link
+# When we pass a card, it's a program entering play, so we file it in the cloud index if it can go to the cloud and check only that card.
+# Otherwise we only re-check the players whose Base Link has changed since the last time, and only their cloud programs.
+# As each client keeps its own index, we first file any program which entered play without going through us (e.g. on the other client, or before a reconnect).
    debugNotify(">>> chkCloud(){}".format(extraASDebug())) #Debug
-   if not cloudCard: cards = [c for c in table if c.Type == 'Program']
-   else: cards = [cloudCard] # If we passed a card as a variable, we just check the cloud status of that card
-   for card in cards:
-      debugNotify("### Cloud Checking {} with AS = {}".format(card,fetchProperty(card, 'AutoScripts')), 2) #Debug
-      cloudRegex = re.search(r'Cloud([0-9]+)Link',fetchProperty(card, 'AutoScripts'))
-      if cloudRegex:
-         linkRequired = num(cloudRegex.group(1))
-         debugNotify("### Found Cloud Regex. linkRequired = {}".format(linkRequired), 2) #Debug
-         if linkRequired <= card.controller.counters['Base Link'].value and not card.markers[mdict['Cloud']]:
-            card.markers[mdict['Cloud']] = 1
-            card.controller.MU += num(card.Requirement)
-            notify("-- {}'s {} has been enabled for cloud computing".format(me,card))            
-         if linkRequired > card.controller.counters['Base Link'].value and card.markers[mdict['Cloud']] and card.markers[mdict['Cloud']] >= 1:
-            card.markers[mdict['Cloud']] = 0
-            card.controller.MU -= num(card.Requirement)
-            notify("-- {}'s {} has lost connection to the cloud.".format(me,card))
-            if card.controller.MU < 0: 
-               notify(":::Warning:::{}'s loss of cloud connection means that their programs require more memory than they have available. They must trash enough programs to bring their available Memory to at least 0".format(card.controller))
+   if cloudCard:
+      cloudRegex = re.search(r'Cloud([0-9]+)Link',fetchProperty(cloudCard, 'AutoScripts'))
+      if not cloudRegex: 
+         debugNotify("<<< chkCloud() - Not a cloud program", 3)
+         return
+      CloudPrograms[cloudCard._id] = num(cloudRegex.group(1))
+      debugNotify("### Indexed {} as a cloud program. linkRequired = {}".format(cloudCard,CloudPrograms[cloudCard._id]), 2) #Debug
+      cardIDs = [cloudCard._id]
+   else: 
+      syncCloudIndex()
+      cardIDs = [cardID for cardID in CloudPrograms if CloudPrograms[cardID] != None]
+   MUchanges = {} # We gather the MU adjustments per player so that we modify their MU only once.
+   for cardID in cardIDs:
+      card = cardHandle(cardID)
+      if card.group != table: # The program has left play.
+         del CloudPrograms[cardID]
+         continue
+      player = card.controller
+      baseLink = player.counters['Base Link'].value
+      if not cloudCard and CloudLinkChecked.get(player._id,None) == baseLink: continue # Nothing has changed for this player.
+      if not MUchanges.has_key(player): MUchanges[player] = 0
+      if CloudPrograms[cardID] <= baseLink and not card.markers[mdict['Cloud']]:
+         card.markers[mdict['Cloud']] = 1
+         MUchanges[player] += num(card.Requirement)
+         notify("-- {}'s {} has been enabled for cloud computing".format(player,card))            
+      if CloudPrograms[cardID] > baseLink and card.markers[mdict['Cloud']] and card.markers[mdict['Cloud']] >= 1:
+         card.markers[mdict['Cloud']] = 0
+         MUchanges[player] -= num(card.Requirement)
+         notify("-- {}'s {} has lost connection to the cloud.".format(player,card))
+   for player in MUchanges:
+      if not cloudCard: CloudLinkChecked[player._id] = player.counters['Base Link'].value # We only mark the player as checked once we've gone through all their cloud programs.
+      if MUchanges[player]: 
+         player.MU += MUchanges[player]
+         if MUchanges[player] < 0 and player.MU < 0: 
+            notify(":::Warning:::{}'s loss of cloud connection means that their programs require more memory than they have available. They must trash enough programs to bring their available Memory to at least 0".format(player))
    debugNotify("<<< chkCloud()", 3)
+
+def rebuildCloudIndex(): # Recreates the cloud program index from the programs on the table.
+   CloudPrograms.clear()
+   CloudLinkChecked.clear()
+   syncCloudIndex()
+
+def syncCloudIndex(): # Files the programs on the table which aren't in the cloud index yet and forgets the ones which have left. The ones which can't go to the cloud are filed too, so that we don't look at their scripts again.
+   programIDs = set()
+   for card in queryTable(type = 'Program'):
+      programIDs.add(card._id)
+      if CloudPrograms.has_key(card._id): continue
+      cloudRegex = re.search(r'Cloud([0-9]+)Link',CardsAS.get(card.model,''))
+      if cloudRegex: CloudPrograms[card._id] = num(cloudRegex.group(1))
+      else: CloudPrograms[card._id] = None
+   for cardID in [cardID for cardID in CloudPrograms if cardID not in programIDs]: del CloudPrograms[cardID]
             
    
 def chkHostType(card, seek = 'Targeted'):
@@ -301,6 +360,8 @@ def scanTable(group = table, x=0,y=0):
       storeProperties(c)
       iter += 1
    for c in me.hand: storeProperties(c)
+   rebuildTableIndex()
+   rebuildCloudIndex()
    notify("{} has re-scanned the table and refreshed their internal variables.".format(me))
  
 def checkUnique (card):
@@ -344,11 +405,11 @@ def clearAttachLinks(card):
       hostCardSnapshot = dict(hostCards)
       for attachment in hostCardSnapshot:
          if hostCardSnapshot[attachment] == card._id:
-            if Card(attachment) in table: intTrashCard(Card(attachment),0,cost = "host removed")
+            if cardHandle(attachment) in table: intTrashCard(cardHandle(attachment),0,cost = "host removed")
             del hostCards[attachment]
    debugNotify("### Checking if the card is attached to unlink.", 2)      
    if hostCards.has_key(card._id):
-      hostCard = Card(hostCards[card._id])
+      hostCard = cardHandle(hostCards[card._id])
       if re.search(r'Daemon',getKeywords(hostCard)) and hostCard.group == table: 
          if card.markers[mdict['DaemonMU']] and not re.search(r'Daemon',getKeywords(card)):
             hostCard.markers[mdict['DaemonMU']] += card.markers[mdict['DaemonMU']] # If the card was hosted by a Daemon, we return any Daemon MU's used.
@@ -366,7 +427,7 @@ def clearAttachLinks(card):
 
 def resetAll(): # Clears all the global variables in order to start a new game.
    global Stored_Name, Stored_Type, Stored_Cost, Stored_Keywords, Stored_AutoActions, Stored_AutoScripts
-   global installedCount, debugVerbosity, newturn,endofturn, currClicks, turn, autoRezFlags
+   global debugVerbosity, newturn,endofturn, currClicks, turn, autoRezFlags
    debugNotify(">>> resetAll(){}".format(extraASDebug())) #Debug
    mute()
    me.counters['Credits'].value = 5
@@ -380,9 +441,17 @@ def resetAll(): # Clears all the global variables in order to start a new game.
    Stored_Keywords.clear()
    Stored_AutoActions.clear()
    Stored_AutoScripts.clear()
-   installedCount.clear()
-   setGlobalVariable('CurrentTraceEffect','None')
-   setGlobalVariable('CorpTraceValue','None')
+   installedSlots.clear()
+   setGlobalVariable('Trace','None')
+   me.setGlobalVariable('Exhausted Cards','[]')
+   TempMarkedCards.clear()
+   del PlayedEvents[:]
+   setGlobalVariable('Remote Servers','[]')
+   setGlobalVariable('Ambush','None')
+   CloudPrograms.clear()
+   CloudLinkChecked.clear()
+   SpecialsCache.clear()
+   CardHandles.clear()
    newturn = False 
    endofturn = False
    currClicks = 0
@@ -393,6 +462,89 @@ def resetAll(): # Clears all the global variables in order to start a new game.
    elif debugVerbosity != -1 and confirm("Reset Debug Verbosity?"): debugVerbosity = -1    
    debugNotify("<<< resetAll()") #Debug   
 #---------------------------------------------------------------------------
+# Table Index
+#---------------------------------------------------------------------------
+
+def indexCard(card, controller = None): # Adds a card that has been put on the table to the table index, under its type, and records its controller. Also used to refile a card whose controller just changed.
+   if not controller: controller = card.controller
+   cType = Stored_Type.get(card._id,'?')
+   if cType == '?': cType = card.Type # If we haven't stored the card's type yet, we try to read it directly. Unreadable face-down cards end up under '?'
+   unindexCard(card)
+   TableIndexTypes[card._id] = cType
+   TableIndex.setdefault(cType,set()).add(card._id)
+   TableIndexOwners[card._id] = controller._id
+
+def unindexCard(card): # Removes a card which has left the table from the table index.
+   cType = TableIndexTypes.pop(card._id,None)
+   if cType != None: TableIndex[cType].discard(card._id)
+   TableIndexOwners.pop(card._id,None)
+
+def rebuildTableIndex(): # Recreates the table index from a full scan of the table.
+   debugNotify(">>> rebuildTableIndex()") #Debug
+   TableIndex.clear()
+   TableIndexTypes.clear()
+   TableIndexOwners.clear()
+   for card in table: indexCard(card)
+   debugNotify("<<< rebuildTableIndex() with {} cards".format(len(TableIndexTypes)), 3) #Debug
+
+def syncTableIndex(): # Brings the table index up to date after cards have been added or removed without us noticing (e.g. by the opponent), by only filing the cards which changed.
+   debugNotify(">>> syncTableIndex()") #Debug
+   tableIDs = set()
+   for card in table:
+      tableIDs.add(card._id)
+      if not TableIndexTypes.has_key(card._id): indexCard(card)
+   for cID in [cID for cID in TableIndexTypes if cID not in tableIDs]: unindexCard(cardHandle(cID))
+   debugNotify("<<< syncTableIndex() with {} cards".format(len(TableIndexTypes)), 3) #Debug
+
+def queryTable(controller = None, type = None, active = None, rezzed = None, marked = None):
+# Returns the cards on the table which match all the conditions we've been given.
+# type is looked up through the index, so only the cards of that type (or cards whose type we couldn't read) are examined.
+# controller, active (i.e. not highlighted as inactive or revealed), rezzed and marked (i.e. has any markers) are checked live, as the other client takes control of cards and players change the rest by hand.
+# If we find that the controller of a card has changed without us, the other client has been moving things around, so we sync the whole index before answering.
+   debugNotify(">>> queryTable() with controller: {}, type: {}, active: {}, rezzed: {}, marked: {}".format(controller,type,active,rezzed,marked)) #Debug
+   if len(TableIndexTypes) != len(table): syncTableIndex() # If cards have been added or removed without us noticing (e.g. by the opponent), we file just those.
+   if type: cardIDs = TableIndex.get(type,set()) | TableIndex.get('?',set())
+   else: cardIDs = TableIndexTypes.keys()
+   results = []
+   drifted = False
+   for cID in cardIDs:
+      card = cardHandle(cID)
+      if card.group != table: # The card has left the table and another one has taken its place without going through our scripts.
+         syncTableIndex()
+         return queryTable(controller, type, active, rezzed, marked)
+      if card.controller._id != TableIndexOwners.get(cID,None):
+         TableIndexOwners[cID] = card.controller._id
+         drifted = True
+      if type and TableIndexTypes[cID] == '?' and card.Type != type: continue
+      if controller and card.controller != controller: continue
+      if active != None and (card.highlight != InactiveColor and card.highlight != RevealedColor) != active: continue
+      if rezzed != None and card.isFaceUp != rezzed: continue
+      if marked != None and bool(card.markers) != marked: continue
+      results.append(card)
+   if drifted: # Cards may also have been swapped on the table without its size changing, so we bring the index up to date and ask again.
+      syncTableIndex()
+      return queryTable(controller, type, active, rezzed, marked)
+   if debugVerbosity >= 4: chkTableIndex(None)
+   debugNotify("<<< queryTable() returning {} cards".format(len(results)), 3) #Debug
+   return results
+
+def chkTableIndex(group = table, x = 0, y = 0): # Compares the table index against a full scan of the table and reports (and fixes) any drift.
+   drift = []
+   scannedIDs = set()
+   for card in table:
+      scannedIDs.add(card._id)
+      if not TableIndexTypes.has_key(card._id): drift.append("{} is on the table but not indexed".format(card))
+   for cID in TableIndexTypes:
+      if cID not in scannedIDs: drift.append("{} is indexed but not on the table".format(cID))
+      elif TableIndexTypes[cID] != '?' and cID not in TableIndex.get(TableIndexTypes[cID],set()): drift.append("{} is missing from its type group".format(cID))
+      elif TableIndexOwners.get(cID,None) != cardHandle(cID).controller._id: drift.append("{} is filed under the wrong controller".format(cardHandle(cID)))
+   if drift:
+      notify(":::WARNING::: Table index has drifted:\n{}".format('\n'.join(drift)))
+      rebuildTableIndex()
+   elif group == table: whisper("The table index matches the table ({} cards).".format(len(TableIndexTypes))) # Only when a player asked for the check from the menu.
+   return drift
+
+#---------------------------------------------------------------------------
 # Card Placement
 #---------------------------------------------------------------------------
 
@@ -420,7 +572,6 @@ def placeCard(card, action = 'INSTALL', hostCard = None):
       if card.name != 'Parasite': # Parasites we want on top of the host ICE, so that the counters can be seen
          card.sendToBack()
    else:
-      global installedCount
       type = fetchProperty(card, 'Type')
       if action != 'INSTALL' and type == 'Agenda':
          if ds == 'corp': type = 'scoredAgenda'
@@ -428,28 +579,47 @@ def placeCard(card, action = 'INSTALL', hostCard = None):
       if action == 'INSTALL' and re.search(r'Console',card.Keywords): type = 'Console'
       if action == 'INSTALL' and type in CorporationCardTypes: CfaceDown = True
       else: CfaceDown = False
-      debugNotify("### Setting installedCount. Type is: {}, CfaceDown: {}".format(type, str(CfaceDown)), 3) #Debug
-      if installedCount.get(type,None) == None: installedCount[type] = 0
-      else: installedCount[type] += 1
-      debugNotify("### installedCount is: {}. Setting loops...".format(installedCount[type]), 2) #Debug
-      loopsNR = installedCount[type] / (place[type][3]) 
-      loopback = place[type][3] * loopsNR 
-      if loopsNR and place[type][3] != 1: offset = 15 * (loopsNR % 3) # This means that in one loop the offset is going to be 0 and in another 15.
-      else: offset = 0
-      debugNotify("### installedCount[type] is: {}.\nLoopsNR is: {}.\nLoopback is: {}\nOffset is: {}".format(installedCount[type],offset, loopback, offset), 3) #Debug
-      card.moveToTable(place[type][0] + (((cwidth(card,0) + place[type][2]) * (installedCount[type] - loopback)) + offset) * place[type][4],place[type][1],CfaceDown) 
-      # To explain the above, we place the card at: Its original location
-      #                                             + the width of the card
-      #                                             + a predefined distance from each other times the number of other cards of the same type
-      #                                             + the special offset in case we've done one or more loops
-      #                                             And all of the above, multiplied by +1/-1 (place[type][4]) in order to direct the cards towards the left or the right
-      #                                             And finally, the Y axis is always the same in ANR.
-      if type == 'Agenda' or type == 'Upgrade' or type == 'Asset': # camouflage until I create function to install them on specific Server, via targeting.
-         installedCount['Agenda'] = installedCount[type]
-         installedCount['Asset'] = installedCount[type]
-         installedCount['Upgrade'] = installedCount[type]
+      debugNotify("### Allocating slot. Type is: {}, CfaceDown: {}".format(type, str(CfaceDown)), 3) #Debug
+      x,y = slotPosition(card, type, allocateSlot(card, type))
+      card.moveToTable(x,y,CfaceDown) 
       if not card.isFaceUp: card.peek() # Added in octgn 3.0.5.47
+   indexCard(card)
    debugNotify("<<< placeCard()", 3) #Debug
+
+def placeCards(cards, action = 'INSTALL', hostCard = None): # Places a batch of cards on the table one after the other, each in the first free slot of its type. Returns the placeCard() result of each card.
+   debugNotify(">>> placeCards() with {} cards".format(len(cards))) #Debug
+   results = [placeCard(card, action, hostCard) for card in cards]
+   debugNotify("<<< placeCards()", 3) #Debug
+   return results
+
+def allocateSlot(card, type): 
+# Returns the first free placement slot of a card type and reserves it for the card. 
+# A slot is free when the card which had it has been released with releaseSlot() or has left the table behind our backs.
+   releaseSlot(card) # If the card is being moved to another row (e.g. agendas being scored), it gives up its old slot.
+   slots = installedSlots.setdefault(placeShared.get(type,type),{})
+   slotNR = 0
+   while slots.has_key(slotNR) and cardHandle(slots[slotNR]).group == table: slotNR += 1
+   slots[slotNR] = card._id
+   debugNotify("### Allocated slot {} of {} to {}".format(slotNR,type,card), 3) #Debug
+   return slotNR
+
+def releaseSlot(card): # Frees the placement slot of a card which is leaving the table, so that the next card of its type can take its place.
+   for slots in installedSlots.itervalues():
+      for slotNR in slots.keys():
+         if slots[slotNR] == card._id: del slots[slotNR]
+
+def slotPosition(card, type, slotNR):
+# Returns the x,y coordinates of a placement slot. Once we've done a loop of place[type][3] slots, we start again from the first position, slightly offset so as not to hide the previous ones completely.
+   if not placeGeometry: # We only need to measure a card once, as they're all the same size.
+      cardWidth = cwidth(card,0)
+      for placeType in place: 
+         x, y, spacing, loopLimit, direction = place[placeType]
+         placeGeometry[placeType] = (x, y, cardWidth + spacing, loopLimit, direction)
+   x, y, step, loopLimit, direction = placeGeometry[type]
+   loopsNR = slotNR / loopLimit
+   if loopsNR and loopLimit != 1: offset = 15 * (loopsNR % 3) # This means that in one loop the offset is going to be 0 and in another 15.
+   else: offset = 0
+   return (x + ((step * (slotNR - loopLimit * loopsNR)) + offset) * direction, y)
    
 def orgAttachments(card):
 # This function takes all the cards attached to the current card and re-places them so that they are all visible
@@ -467,15 +637,26 @@ def orgAttachments(card):
       xAlg = 0 # The Default placement on the X axis, is to place the attachments at the same X as their parent
       yAlg =  -(cwidth(card) / 4 * playerside) # Defaults
    hostCards = eval(getGlobalVariable('Host Cards'))
-   cardAttachements = [Card(att_id) for att_id in hostCards if hostCards[att_id] == card._id]
+   cardAttachements = [cardHandle(att_id) for att_id in hostCards if hostCards[att_id] == card._id]
    x,y = card.position
-   for attachment in cardAttachements:
-      attachment.moveToTable(x + (xAlg * attNR), y + (yAlg * attNR))
-      attachment.setIndex(len(cardAttachements) - attNR) # This whole thing has become unnecessary complicated because sendToBack() does not work reliably
-      debugNotify("### {} index = {}".format(attachment,attachment.getIndex), 4) # Debug
+   moves = 0
+   for attachment in cardAttachements: # First we put every attachment in its final position, leaving alone those already there.
+      attPos = (x + (xAlg * attNR), y + (yAlg * attNR))
+      if attachment.position != attPos:
+         attachment.moveToTable(attPos[0], attPos[1])
+         moves += 1
       attNR += 1
-      debugNotify("### Moving {}, Iter = {}".format(attachment,attNR), 4)
-   card.sendToFront() # Because things don't work as they should :(
+   # Then the z-order. The host goes on top and each attachment goes under the previous one. We only touch the indices if that's not already the case.
+   # We do the indices ourselves, because sendToBack() does not work reliably.
+   indices = [attachment.getIndex for attachment in cardAttachements]
+   if indices != sorted(indices, reverse = True) or len(set(indices)) != len(indices):
+      for iter in range(len(cardAttachements)): cardAttachements[iter].setIndex(len(cardAttachements) - 1 - iter)
+      indices = [attachment.getIndex for attachment in cardAttachements]
+      moves += len(cardAttachements)
+   if len(indices) and card.getIndex <= max(indices): 
+      card.sendToFront() # Because things don't work as they should :(
+      moves += 1
+   debugNotify("### Reorganized {} attachments with {} moves".format(len(cardAttachements),moves), 3) # Debug
    if debugVerbosity >= 4: # Checking Final Indices
       for attachment in cardAttachements: notify("### {} index = {}".format(attachment,attachment.getIndex)) # Debug
    debugNotify("<<< orgAttachments()", 3) #Debug      
@@ -528,6 +709,7 @@ def switchUniCode(group,x=0,y=0,command = 'Off'):
    else:
       whisper("Credits and Clicks will now be displayed as Unicode.".format(me))
       UniCode = True
+   CardsAALabels.clear() # The subroutine glyph in the ability labels depends on the UniCode setting, so we let them be rebuilt.
 
 def ImAProAtThis(group = table, x=0, y=0):
    debugNotify(">>> ImAProAtThis(){}".format(extraASDebug())) #Debug
@@ -574,9 +756,11 @@ def BUTTON_NoRez(group = None,x=0,y=0):
    notify("--- {} does not rez approached ICE".format(me))
 
 def BUTTON_OK(group = None,x=0,y=0):
+   if getGlobalVariable('Ambush') != 'None': setGlobalVariable('Ambush','OK') # If the runner is waiting on us to decide about an ambush, this lets them carry on.
    notify("--- {} has no further reactions.".format(me))
 
 def BUTTON_Wait(group = None,x=0,y=0):  
+   if getGlobalVariable('Ambush') != 'None': setGlobalVariable('Ambush','Wait')
    notify("--- Wait! {} wants to react.".format(me))
 #------------------------------------------------------------------------------
 #  Online Functions
@@ -667,7 +851,9 @@ def initGame(): # A function which prepares the game for online submition
    debugNotify("<<< initGame()", 3) #Debug
    
 def reportGame(result = 'AgendaVictory'): # This submits the game results online.
+   flushAnnouncements() # The line announcing how the game was won has to go out before we submit it.
    delayed_whisper("Please wait. Submitting Game Stats...")     
+   flushMessages() # The submission can take a while, so we want the player to see this now.
    debugNotify(">>> reportGame()") #Debug
    GUID = getGlobalVariable('gameGUID')
    if GUID == 'None' and debugVerbosity < 0: return # If we don't have a GUID, we can't submit. But if we're debugging, we go through.
@@ -811,6 +997,15 @@ def fetchCardScripts(group = table, x=0, y=0): # Creates 2 dictionaries with all
       Split_Scripts = Split_Details[2].split('+++++') # List item [1] always holds the two scripts. AutoScripts and AutoActions.
       CardsAS[Split_Details[1].strip()] = Split_Scripts[0].strip()
       CardsAA[Split_Details[1].strip()] = Split_Scripts[1].strip()
+   CardsAALabels.clear() # The scripts might have changed, so we rebuild the ability labels from scratch
+   CompiledAccess.clear()
+   for model in CardsAA:
+      if CardsAA[model] == '': continue
+      for autoS in CardsAA[model].split('||'): abilityLabel(autoS)
+   if debugVerbosity >= 2: # Debug
+      for model in CardsAS:
+         if re.search(r'CustomScript', CardsAS[model] + CardsAA[model]) and model not in customScriptModels():
+            notify("### {} calls CustomScript but has no custom script registered".format(model))
    if turn > 0: whisper("+++ All card scripts refreshed!")
    if debugVerbosity >= 4: # Debug
       notify("CardsAS Dict:\n{}".format(str(CardsAS)))
@@ -914,7 +1109,8 @@ def ShowDicts():
    notify("Stored_Keywords: {}".format(str(Stored_Keywords)))
    debugNotify("Stored_AA: {}".format(str(Stored_AutoActions)), 4)
    debugNotify("Stored_AS: {}".format(str(Stored_AutoScripts)), 4)
-   notify("installedCounts: {}".format(str(installedCount)))
+   notify("installedSlots: {}".format(str(installedSlots)))
+   notify("waitFor metrics: {}".format(str(WaitMetrics)))
 
 def DebugCard(card, x=0, y=0):
    whisper("Stored Card Properties\
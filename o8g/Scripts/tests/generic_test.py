@@ -35,6 +35,45 @@ class NumOrderTests(unittest.TestCase):
         # These are incorrect conversions and should fail
         self.assertNotEqual('1st', generic.numOrder(1))
 
+class SampleCardsTests(unittest.TestCase):
+
+    def test_distinct_cards(self):
+        """Test that the sampled cards are different cards of the group."""
+        hand = list(range(10))
+        sample = generic.sampleCards(hand, 5)
+        self.assertEqual(5, len(sample))
+        self.assertEqual(5, len(set(sample)))
+        self.assertTrue(set(sample) <= set(hand))
+
+        # Asking for more cards than there are returns them all
+        self.assertEqual(sorted(hand), sorted(generic.sampleCards(hand, 20)))
+
+    def test_seeded(self):
+        """Test that the same seed picks the same cards."""
+        hand = list(range(10))
+        generic.seedSampler(42)
+        first = generic.sampleCards(hand, 3)
+        generic.seedSampler(42)
+        self.assertEqual(first, generic.sampleCards(hand, 3))
+
+class TraceRecordTests(unittest.TestCase):
+
+    def test_compiled_effects(self):
+        """Test that trace effects are split into their script chains."""
+        record = generic.traceRecord(1, 3, 'onRez:Trace3-traceEffects<Gain1Tags++Inflict1MeatDamage||Lose2Credits,None>')
+        self.assertEqual([['Gain1Tags', 'Inflict1MeatDamage'], ['Lose2Credits']], record['success'])
+        self.assertEqual([], record['failure'])
+
+        # A trace without effects compiles to nothing
+        self.assertEqual(([], []), generic.compileTraceEffects('onPlay:Trace2'))
+
+    def test_trace_result(self):
+        """Test that the trace must beat the runner's link."""
+        record = generic.traceRecord(base = 3)
+        record['bid'] = 2
+        self.assertTrue(generic.traceSucceeds(record, 4))
+        self.assertFalse(generic.traceSucceeds(record, 5))
+
 def main():
     unittest.main()
 